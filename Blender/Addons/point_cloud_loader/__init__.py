@@ -0,0 +1,24 @@
+bl_info = {
+    "name": "Point Cloud Loader",
+    "author": "Short Notion (Mark van de Korput)",
+    "version": (0, 1),
+    "blender": (2, 75, 0),
+    "location": "View3D > T-panel > Object Tools",
+    "description": "Generate point cloud from data files",
+    "warning": "",
+    "wiki_url": "",
+    "tracker_url": "",
+    "category": "Add Mesh"}
+
+# The addon is this package (installed as a whole, for example from a zip of the point_cloud_loader
+# directory): the blender parts are in addon.py, the blender-independent point cloud data files
+# stuff is in point_cloud_data.py. Outside blender only the latter is usable, for example:
+#
+#   python -m point_cloud_loader.point_cloud_data convert out33/
+try:
+  import bpy
+except ImportError:
+  bpy = None
+
+if bpy != None:
+  from .addon import register, unregister
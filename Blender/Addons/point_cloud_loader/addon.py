@@ -0,0 +1,1382 @@
+# system stuff
+import collections
+import logging
+import math
+import operator
+import time
+# blender stuff
+import bpy
+from bpy.app.handlers import persistent
+import bmesh
+import os.path
+import mathutils
+# point cloud data stuff (blender-independent, see point_cloud_data.py)
+from .point_cloud_data import PointCloudFrameFile, PointCloudFrameCache, PointCloudFramePrefetcher, PointCloudProfiler, PointCloudAdaptiveDecimation, NO_STAGE, bakeSequence, openSequenceFile, closeSequenceFiles, sequenceFramePath, splitSequenceFramePath, sequenceIndex, directoryChangeListeners, flatCoordinates, writeCoordinateRows, triangleLoops, frustumPlanes, cullPoints, cullTriangles, QUANTIZED_TYPE_NAMES
+
+logger = logging.getLogger(__name__)
+
+# loads upcoming frames in the background (see PointCloudLoader.prefetch)
+prefetcher = PointCloudFramePrefetcher()
+# loaded frames, shared by all point cloud objects
+frameCache = PointCloudFrameCache()
+# frame update timings of objects with profiling enabled
+profiler = PointCloudProfiler()
+# the frame file last loaded into each object's mesh (by object name); to find
+# out which vertices changed with the next frame (see PointCloudFrameFile.changedPositions)
+loadedFrames = {}
+# the coordinates last uploaded into the meshes of objects playing back sequence files (by object name, flat, see
+# flatCoordinates); delta frames only write their changed rows into it before it gets uploaded in one go
+vertexBuffers = {}
+# frames being loaded in the background for objects with asyncLoad enabled; object name -> (frame file,
+# cache key, path, level of detail). Only the latest request per object is kept (see applyLoadedFrames)
+pendingLoads = {}
+ASYNC_POLL_INTERVAL = 0.02 # seconds between checks for finished background loads
+# objects whose frames are preloaded (pinned in the frameCache, see PointCloudLoaderPreloadOperator); object
+# name -> (fileName, automatically determined number of files, preloaded point cloud frame numbers). Lets ObjectFileManager find
+# the preloaded frames without looking at the disk
+preloadedSequences = {}
+# the viewport skip points used for preloaded objects that were downsampled to fit the preload limit; object name ->
+# skip points. Kept apart from the objects' skipPoints setting, so releasing the preload restores the original detail
+preloadSkipPoints = {}
+PRELOAD_POLL_INTERVAL = 0.1 # seconds between progress updates while preloading
+# the viewport skip levels of objects with adaptive decimation enabled; object name -> PointCloudAdaptiveDecimation
+adaptiveLevels = {}
+
+# times a stage of an object's frame update, if profiling is enabled for the object
+def profileStage(obj, stage):
+  if obj.pointCloudLoaderConfig.profile == True:
+    return profiler.stage(obj.name, stage)
+  return NO_STAGE
+
+# multiplies mathutils matrices (or a matrix and a vector); blender 2.80 changed that from * to @
+def _matrixProduct(a, b):
+  if bpy.app.version >= (2, 80, 0):
+    return operator.matmul(a, b)
+  return a * b
+
+# gives the object's adaptive decimation level, updated with its current config
+def adaptiveDecimation(obj):
+  config = obj.pointCloudLoaderConfig
+  skip = viewportSkipPoints(obj)
+  level = adaptiveLevels.get(obj.name)
+  if level == None:
+    level = adaptiveLevels[obj.name] = PointCloudAdaptiveDecimation(config.adaptiveBudget / 1000.0, minSkip=skip)
+
+  level.budget = config.adaptiveBudget / 1000.0
+  level.minSkip = skip
+  level.maxSkip = config.adaptiveMaxSkip
+  return level
+
+# the skip points of the object's viewport frames; more than its skipPoints setting while it's preloaded downsampled
+def viewportSkipPoints(obj):
+  return preloadSkipPoints.get(obj.name, obj.pointCloudLoaderConfig.skipPoints)
+
+# the object's world matrix at the specified frame. At frame_change_pre blender hasn't evaluated the new frame's
+# animation yet, so the transform channels animated by the object's (and its parents') action get evaluated here.
+# Objects with constraints, parented to something else than an object, or animated otherwise (NLA, drivers)
+# keep the matrix of the latest scene update; so do delta transforms of animated objects
+def evaluatedMatrixWorld(obj, frame):
+  if len(obj.constraints) > 0 or (obj.parent != None and obj.parent_type != 'OBJECT'):
+    return obj.matrix_world
+
+  action = obj.animation_data.action if obj.animation_data != None else None
+  if action == None and obj.parent == None:
+    return obj.matrix_world
+
+  basis = _actionMatrixBasis(obj, action, frame) if action != None else obj.matrix_basis
+  if obj.parent == None:
+    return basis
+  return _matrixProduct(_matrixProduct(evaluatedMatrixWorld(obj.parent, frame), obj.matrix_parent_inverse), basis)
+
+# the object's location, rotation and scale at the specified frame (as far as the action animates them) as matrix
+def _actionMatrixBasis(obj, action, frame):
+  channels = {'location': list(obj.location), 'rotation_euler': list(obj.rotation_euler), 'rotation_quaternion': list(obj.rotation_quaternion), 'rotation_axis_angle': list(obj.rotation_axis_angle), 'scale': list(obj.scale)}
+  for curve in action.fcurves:
+    if curve.data_path in channels and curve.mute != True:
+      channels[curve.data_path][curve.array_index] = curve.evaluate(frame)
+
+  if obj.rotation_mode == 'QUATERNION':
+    rotation = mathutils.Quaternion(channels['rotation_quaternion']).to_matrix().to_4x4()
+  elif obj.rotation_mode == 'AXIS_ANGLE':
+    angle, x, y, z = channels['rotation_axis_angle']
+    rotation = mathutils.Matrix.Rotation(angle, 4, mathutils.Vector((x, y, z)))
+  else:
+    rotation = mathutils.Euler(channels['rotation_euler'], obj.rotation_mode).to_matrix().to_4x4()
+
+  scale = mathutils.Matrix.Identity(4)
+  for axis in range(3):
+    scale[axis][axis] = channels['scale'][axis]
+  return _matrixProduct(_matrixProduct(mathutils.Matrix.Translation(channels['location']), rotation), scale)
+
+# forgets about all preloaded frames; playback reads the frame files again (at the objects' own skip points)
+def releasePreload():
+  frameCache.unpinAll()
+  preloadedSequences.clear()
+  preloadSkipPoints.clear()
+
+# Scene updates
+class PointCloudLoader:
+  lastFrame = None # the scene frame of the previous loadFrame call, to determine the playback direction
+  rendering = False # True while blender is rendering (see renderPreHandler); objects use their render level of detail
+
+  def __init__(self, scene=None):
+    self.scene=scene
+    
+    if self.scene == None: # default to currently active scene
+      self.scene = bpy.context.scene 
+
+  # gives all objects in the scene for who the pointCloudLoaderConfig is enabled (through the panel)
+  def enabledObjects(self):
+    return [obj for obj in self.scene.objects if obj.pointCloudLoaderConfig.enabled == True]
+
+  # loads the current frame for all point-cloud-enabled objects in the scene
+  def loadFrame(self, force=False):
+    objs = self.enabledObjects()
+    logger.debug("Number of point cloud objects: %d", len(objs))
+
+    if len(objs) > 0:
+      frameCache.setBudget(max([obj.pointCloudLoaderConfig.cacheSize for obj in objs]) * 1024 * 1024)
+
+    # load point clouds for the current frame for all point-cloud-enabled objects in the scene; objects
+    # with the same frame file and load settings share it, so every distinct frame file is loaded once
+    shared = {}
+    for obj in objs:
+      ObjectPointObjectLoader(obj, scene=self.scene, force=force, shared=shared).loadFrame()
+
+    self.prefetch(objs)
+
+  # starts loading the frame files of the next prefetchDepth frames (in the current
+  # playback direction) in the background, for all specified objects
+  def prefetch(self, objs):
+    frame = self.scene.frame_current
+    direction = -1 if PointCloudLoader.lastFrame != None and frame < PointCloudLoader.lastFrame else 1
+    PointCloudLoader.lastFrame = frame
+
+    if len(objs) > 0:
+      prefetcher.setWorkers(max([obj.pointCloudLoaderConfig.prefetchWorkers for obj in objs]))
+
+    keys = []
+    for obj in objs:
+      loader = ObjectPointObjectLoader(obj, scene=self.scene)
+      fileManager = ObjectFileManager(obj)
+
+      if obj.name in pendingLoads:
+        keys.append(pendingLoads[obj.name][0].cacheKey())
+
+      for i in range(1, obj.pointCloudLoaderConfig.prefetchDepth+1):
+        path = fileManager.frameFilePath(frame + i * direction)
+        if path == None:
+          break
+
+        file = loader.frameFile(path)
+        if frameCache.isPinned(file.cacheKey()) or frameCache.contains(frameCache.key(file)):
+          continue # no need to load, it's already in the cache
+
+        keys.append(file.cacheKey())
+        prefetcher.prefetch(file)
+
+    # forget about prefetched frames that aren't coming up anymore
+    prefetcher.retain(keys)
+# end of class PointCloudLoader
+
+
+# Object updater
+class ObjectPointObjectLoader:
+  def __init__(self, obj, scene=None, force=False, shared=None):
+    self.obj = obj
+    self.config = obj.pointCloudLoaderConfig
+    self.force=force
+    # frames applied to objects during the current frame change (see PointCloudLoader.loadFrame);
+    # frame file cache key -> (frame file, points)
+    self.shared = shared
+
+    self.scene=scene
+    if self.scene == None: # default to currently active scene
+      self.scene = bpy.context.scene 
+
+  # load point cloud for the current frame for the specified object
+  def loadFrame(self):
+    start = time.perf_counter()
+    with profileStage(self.obj, 'frame'):
+      applied = self._loadFrame()
+
+    if applied == True and self.levelOfDetail() == 'ADAPTIVE':
+      adaptiveDecimation(self.obj).record(time.perf_counter() - start)
+
+  def _loadFrame(self):
+    logger.debug("Loading point cloud for object: %s", self.obj.name)
+
+    # get file path, create file parser instance
+    path = ObjectFileManager(self.obj).frameFilePath(self.scene.frame_current)
+    if path == None:
+      logger.info("Couldn't find point cloud frame file for object %s, aborting", self.obj.name)
+      return
+
+    levelOfDetail = self.levelOfDetail()
+    # with culling, a moved camera (or changed camera settings) means different points of the same frame
+    if self.force != True and self.config.currentFrameLoaded == path and self.config.currentLevelOfDetailLoaded == levelOfDetail and self.config.currentCullLoaded == self._cullKey(self._cullFrustum()):
+      logger.debug("Current point cloud frame already loaded, aborting")
+      pendingLoads.pop(self.obj.name, None) # back at the frame that's shown; whatever was loading is stale
+      return
+
+    with profileStage(self.obj, 'load'):
+      file = self.frameFile(path)
+      fresh = False
+
+      if self.shared != None and file.cacheKey() in self.shared:
+        # another object got the same frame file (with the same settings) during this frame change
+        file = self.shared[file.cacheKey()][0]
+      else:
+        # preloaded frames are used as they are; no need to check if the file changed
+        cacheKey = None
+        cached = frameCache.getPinned(file.cacheKey())
+        if cached == None:
+          cacheKey = frameCache.key(file)
+          cached = frameCache.get(cacheKey)
+
+        if cached == None and self.loadsAsync():
+          self._requestFrame(file, cacheKey, path, levelOfDetail)
+          return
+
+        if cached != None:
+          file = cached
+        else:
+          # use the prefetched file if it's there, so we only have to put its points in the mesh
+          file = (prefetcher.take(file.cacheKey()) or file).load()
+          frameCache.put(cacheKey, file)
+          fresh = True
+
+      # this load supersedes any frame still loading in the background
+      pendingLoads.pop(self.obj.name, None)
+
+    self.applyFrame(file, path, levelOfDetail, fresh=fresh)
+    return True
+
+  # frames load in the background (and get applied to the mesh by applyLoadedFrames) when the object has asyncLoad
+  # enabled; not while rendering (every rendered frame needs its points) or when loading is forced (operators)
+  def loadsAsync(self):
+    return self.config.asyncLoad == True and PointCloudLoader.rendering != True and self.force != True and canLoadAsync()
+
+  # starts loading a frame in the background; the previous frame stays visible until it's done
+  def _requestFrame(self, file, cacheKey, path, levelOfDetail):
+    pending = pendingLoads.get(self.obj.name)
+    if pending == None or pending[0].cacheKey() != file.cacheKey(): # otherwise it's already on its way
+      logger.debug("Loading point cloud frame in the background for object: %s", self.obj.name)
+      # replaces the object's previous request; that one gets dropped by prefetcher.retain when it's still waiting
+      pendingLoads[self.obj.name] = (file, cacheKey, path, levelOfDetail)
+      prefetcher.prefetch(file)
+
+    # (again, when blender cancelled the operator that was applying the frames)
+    if PointCloudLoaderApplyLoadedOperator.running != True:
+      windowManager = bpy.context.window_manager
+      window = bpy.context.window or windowManager.windows[0] # handlers don't always have a window in their context
+      bpy.ops.object.apply_loaded_point_clouds({'window': window, 'screen': window.screen}, 'INVOKE_DEFAULT')
+
+  # puts the points of a loaded frame file in the object's mesh (fresh when the file was
+  # loaded for this, instead of taken from the cache)
+  def applyFrame(self, file, path, levelOfDetail, fresh=True):
+    if fresh == True and self.config.profile == True:
+      # parsing and transforming happened in PointCloudFrameFile (possibly in a prefetch thread)
+      for stage, start, duration in file.timings:
+        profiler.record(self.obj.name, stage, start, duration)
+
+    if self.shared != None and file.cacheKey() in self.shared:
+      points = self.shared[file.cacheKey()][1]
+    else:
+      # quantized points are turned back into floats (in one go) right before they go into the mesh
+      with profileStage(self.obj, 'dequantize') if file.quantize != None else NO_STAGE:
+        points = file.get_points()
+      if self.shared != None:
+        self.shared[file.cacheKey()] = (file, points)
+
+    triangles = file.triangles
+    frustum = self._cullFrustum()
+    if frustum != None:
+      with profileStage(self.obj, 'cull'):
+        points, triangles = self._cull(points, triangles, frustum)
+
+    # create mesh generator instance, feed it the points form the file parser
+    pcofl = PointCloudObjectFrameLoader(self.obj, points, scene=self.scene)
+    changed = None
+    # the mesh of a sequence file frame can be updated with the next (delta) frame's changes
+    tracked = False
+    
+    if self.obj.pointCloudLoaderConfig.skin == True:
+      pcofl.removeExisting()
+    elif file.triangles is None and self.config.cull != True:
+      tracked = splitSequenceFramePath(path)[1] != None
+      if self.force != True:
+        # frames of delta sequences only need the vertices that changed since the previous frame updated
+        changed = file.changedPositions(loadedFrames.get(self.obj.name))
+      
+    # pcofl.removeFaces()
+
+    pcofl.createPoints(changed=changed, triangles=triangles, tracked=tracked)
+    loadedFrames[self.obj.name] = file
+    # "skin" the mesh if the skin flag is enabled
+    if self.obj.pointCloudLoaderConfig.skin == True:
+      with profileStage(self.obj, 'skin'):
+        self._skinObject(pcofl.getContainerObject())
+
+      if self.config.materialName != None and self.config.materialName != '':
+        with profileStage(self.obj, 'material'):
+          materialiser = PointCloudMeshMaterialiser(obj=pcofl.getContainerObject(), materialName=self.config.materialName)
+          materialiser.applyMaterial()
+
+    # done, store the path to the point-cloud-data file in the object's config, so
+    # we know we don't have to load it again if the same file is specified
+    self.obj.pointCloudLoaderConfig.currentFrameLoaded = path
+    self.obj.pointCloudLoaderConfig.currentLevelOfDetailLoaded = levelOfDetail
+    self.obj.pointCloudLoaderConfig.currentCullLoaded = self._cullKey(frustum)
+
+  # the scene camera's view in the space of the points (the object's; the container object isn't moved), as
+  # (frustum corners, near ones first, or None for panoramic cameras, camera position). None when the object
+  # doesn't cull or the scene camera isn't a camera. The camera's pose is the one of the current frame (see
+  # evaluatedMatrixWorld); its lens and clip values are the ones of the latest scene update
+  def _cullFrustum(self):
+    if self.config.cull != True:
+      return None
+    camera = self.scene.camera
+    if camera == None or camera.type != 'CAMERA':
+      return None
+
+    frame = self.scene.frame_current
+    toPoints = _matrixProduct(evaluatedMatrixWorld(self.obj, frame).inverted(), evaluatedMatrixWorld(camera, frame))
+    corners = None
+    if camera.data.type in ('PERSP', 'ORTHO'):
+      corners = []
+      for clip in (camera.data.clip_start, camera.data.clip_end):
+        for corner in camera.data.view_frame(scene=self.scene):
+          if camera.data.type == 'ORTHO':
+            corner = mathutils.Vector((corner.x, corner.y, -clip))
+          else:
+            corner = corner * (clip / -corner.z)
+          corners.append(tuple(_matrixProduct(toPoints, corner)))
+    return corners, tuple(toPoints.to_translation())
+
+  # identifies the points a frame keeps with the specified (see _cullFrustum) frustum; "" without culling
+  def _cullKey(self, frustum):
+    if frustum == None:
+      return ""
+    corners, eye = frustum
+    values = [value for corner in (corners or []) + [eye] for value in corner]
+    return " ".join(["{0:.4f}".format(value) for value in values + [self.config.cullMargin, self.config.cullMaxDistance]])
+
+  # leaves out the points outside the specified (see _cullFrustum) frustum (widened by cullMargin) and further
+  # than cullMaxDistance from the camera, right before they'd become vertices; gives (points, triangles)
+  def _cull(self, points, triangles, frustum):
+    corners, eye = frustum
+    planes = frustumPlanes(corners) if corners != None else None
+    maxDistance = self.config.cullMaxDistance if self.config.cullMaxDistance > 0 else None
+    points, keep = cullPoints(points, planes, self.config.cullMargin, eye, maxDistance)
+    return points, cullTriangles(triangles, keep)
+
+  # 'RENDER' while blender is rendering and the object has a separate render level of detail enabled,
+  # 'ADAPTIVE' when not rendering and the object has adaptive decimation enabled (and isn't preloaded), 'VIEWPORT' otherwise
+  def levelOfDetail(self):
+    if PointCloudLoader.rendering == True:
+      return 'RENDER' if self.config.lod == True else 'VIEWPORT'
+    if self.config.adaptive == True and ObjectFileManager(self.obj).bake != True and self.obj.name not in preloadedSequences:
+      # baked frames have their skip applied already; preloaded frames are pinned at the viewport level, a
+      # different skip would read the frame files again
+      return 'ADAPTIVE'
+    return 'VIEWPORT'
+
+  # creates a (not yet loaded) frame file instance for the specified path, configured using the
+  # object's config (for the specified, by default the current, level of detail). Config values
+  # are copied, so the instance can be loaded in another thread. With bake=False the load-time settings
+  # get applied also when the object plays back a bake (to bake the frames again)
+  def frameFile(self, path, levelOfDetail=None, bake=True):
+    if bake == True and ObjectFileManager(self.obj).bake == True:
+      # baked frames have all load-time settings applied already
+      return self._memorySettings(PointCloudFrameFile(path=path, gridMesh=self.config.gridMesh, gridMaxEdge=self.config.gridMaxEdge))
+
+    levelOfDetail = levelOfDetail or self.levelOfDetail()
+    render = levelOfDetail == 'RENDER'
+    skip = self.config.renderSkipPoints if render else viewportSkipPoints(self.obj)
+    if levelOfDetail == 'ADAPTIVE':
+      skip = adaptiveDecimation(self.obj).skipPoints()
+
+    file = PointCloudFrameFile(path=path, skip=skip)
+    if self.config.bounds == True:
+      file.minBounds = tuple(self.config.boundsMin)
+      file.maxBounds = tuple(self.config.boundsMax)
+
+    if self.config.modify:
+      file.offset = tuple(self.config.vertOffset)
+      file.multiply = tuple(self.config.vertMultiply)
+
+    if (self.config.renderVoxelize if render else self.config.voxelize):
+      file.voxelSize = self.config.renderVoxelSize if render else self.config.voxelSize
+      file.voxelMode = self.config.voxelMode
+
+    if self.config.gridMesh == True:
+      file.gridMesh = True
+      file.gridMaxEdge = self.config.gridMaxEdge
+
+    return self._memorySettings(file)
+
+  # applies the settings that limit the memory a frame takes; streaming it in chunks
+  # (sampled down to maxPoints) and keeping its points quantized
+  def _memorySettings(self, file):
+    if self.config.streaming == True:
+      file.chunkSize = self.config.chunkSize
+      file.maxPoints = self.config.maxPoints if self.config.maxPoints > 0 else None
+    file.quantize = QUANTIZED_TYPE_NAMES.get(self.config.quantize.lower())
+    return file
+
+  def removeExisting(self):
+    loadedFrames.pop(self.obj.name, None)
+    vertexBuffers.pop(self.obj.name, None)
+    PointCloudObjectFrameLoader(self.obj, scene=self.scene).removeExisting()
+
+  def canSkin(self):
+    return hasattr(self.scene, 'CONFIG_PointCloudSkinner')
+
+  def _skinObject(self, obj):
+    if self.canSkin() != True:
+      logger.warning("Can't skin point cloud mesh; scene doesn't have CONFIG_PointCloudSkinner attribute. "
+        "Please install and enable Point Cloud Skinner addon. See http://sourceforge.net/projects/pointcloudskin/")
+      return
+
+    logger.debug("Skinning mesh")
+
+    originalSkinObject = self.scene.CONFIG_PointCloudSkinner.target_object # remember for later restore
+    self.scene.CONFIG_PointCloudSkinner.target_object = obj.name
+    bpy.ops.scene.point_cloud_skinner_skin()
+    self.scene.CONFIG_PointCloudSkinner.target_object = originalSkinObject # restore
+# end of class ObjectPointObjectLoader
+
+
+# manages point-cloud data frame files
+class ObjectFileManager:
+  # with bake=False, the frames are always the fileName files, also when the object plays back a bake
+  def __init__(self, obj, bake=True):
+    self.obj = obj
+    self.config = obj.pointCloudLoaderConfig
+    self.bake = bake == True and self.config.useBake == True and self.config.bakeFile != ''
+
+  # the file name (pattern) of the frame files; the bake file when the object plays back a bake
+  def fileName(self):
+    if self.bake == True:
+      return self.config.bakeFile
+    return self.config.fileName
+
+  def getPointCloudFrameNumber(self, sceneFrameNumber):
+    # first see if they pointCloudFrame config property
+    # is set to a valid point cloud frame number, if so, return that
+    pointCloudFrame = self._pointCloudFrameAt(sceneFrameNumber)
+    if pointCloudFrame != -1:
+      return pointCloudFrame
+
+    total = self.numberOfFiles()
+    if total == 0:
+      return None
+
+    # calculate the PC data frame number using the frameRatio config property
+    return int(sceneFrameNumber*self.config.frameRatio) % total
+
+  # gives the value of the (key-frameable) pointCloudFrame config property at the specified scene frame;
+  # the property itself only has the value for the frame the animation was last evaluated for
+  def _pointCloudFrameAt(self, sceneFrameNumber):
+    animationData = getattr(self.obj, 'animation_data', None)
+    if animationData != None and animationData.action != None:
+      fcurve = animationData.action.fcurves.find('pointCloudLoaderConfig.pointCloudFrame')
+      if fcurve != None:
+        return int(round(fcurve.evaluate(sceneFrameNumber)))
+    return self.config.pointCloudFrame
+
+  # returns the file path of the file that contains
+  # the point-cloud data for the specified scene frame
+  def frameFilePath(self, sceneFrameNumber):
+    fnumber = self.getPointCloudFrameNumber(sceneFrameNumber)
+
+    if fnumber != None and self.isSequence() and fnumber >= self.autoNumberOfFiles():
+      return None # past the end of the sequence file (or it isn't there)
+
+    if fnumber != None and not self.isSequence() and not self.isPreloaded(fnumber):
+      index = self.sequenceIndex()
+      if index != None and not index.hasFrame(fnumber):
+        return None # frame missing from the sequence
+
+    return self.pathForPointCloudFrame(fnumber)
+
+  # True when the specified point cloud frame was preloaded (with the current fileName)
+  def isPreloaded(self, pointCloudFrameNumber):
+    preloaded = preloadedSequences.get(self.obj.name)
+    return preloaded != None and preloaded[0] == self.fileName() and pointCloudFrameNumber in preloaded[2]
+
+  # gives the (shared, cached) index of the frame files matching the
+  # fileName pattern, or None if the pattern can't be indexed
+  def sequenceIndex(self):
+    return sequenceIndex(self._absolutePath(self.fileName()))
+
+  # a file name without frame number placeholder (like "take33.pcs" instead of "out33/frame%d.txt")
+  # refers to a single sequence file that contains all frames
+  def isSequence(self):
+    return '%' not in self.fileName()
+
+  def _absolutePath(self, path):
+    if path.startswith("//"): # relative to blender file, like the file browser gives
+      return bpy.path.abspath(path)
+    if path.startswith("/"): # absolute path?
+      return path
+    return bpy.path.abspath("//"+path) # relative path (must be relative to blender file)
+
+  # turns a point cloud frame number into a frame file path
+  def pathForPointCloudFrame(self, pointCloudFrameNumber):
+    if pointCloudFrameNumber == None:
+      return None
+
+    if self.isSequence():
+      return sequenceFramePath(self._absolutePath(self.fileName()), pointCloudFrameNumber)
+
+    return self._absolutePath(self.fileName() % pointCloudFrameNumber)
+
+  def numberOfFiles(self):
+    if self.isSequence():
+      # a sequence file has the number of frames in its header; numFiles can only use fewer of them
+      count = self.autoNumberOfFiles()
+      return min(count, self.config.numFiles) if self.config.numFiles > 0 else count
+
+    if self.config and self.config.numFiles > 0:
+      return self.config.numFiles
+
+    return self.autoNumberOfFiles()
+
+  # this method tries to determine the number of point cloud files automatically
+  def autoNumberOfFiles(self):
+    if hasattr(self, 'autoNumberOfFiles_cache'):
+      return self.autoNumberOfFiles_cache
+
+    preloaded = preloadedSequences.get(self.obj.name)
+    if preloaded != None and preloaded[0] == self.fileName():
+      self.autoNumberOfFiles_cache = preloaded[1] # counted when the frames were preloaded
+      return self.autoNumberOfFiles_cache
+
+    if self.isSequence():
+      # the number of frames in a sequence file is in its header
+      try:
+        self.autoNumberOfFiles_cache = openSequenceFile(self._absolutePath(self.fileName())).frameCount
+      except (IOError, ValueError):
+        self.autoNumberOfFiles_cache = 0
+      logger.debug("ObjectFileManager#autoNumberOfFiles - number of frames in sequence file: %d", self.autoNumberOfFiles_cache)
+      return self.autoNumberOfFiles_cache
+
+    index = self.sequenceIndex()
+    if index != None:
+      self.autoNumberOfFiles_cache = index.frameCount()
+      return self.autoNumberOfFiles_cache
+
+    # patterns that can't be indexed; find the first missing file
+    minN = 0
+    maxN = 0
+
+    while os.path.isfile(self.pathForPointCloudFrame(maxN)):
+      maxN+=1
+
+    self.autoNumberOfFiles_cache = maxN - minN
+    logger.debug("ObjectFileManager#autoNumberOfFiles - number of files detected: %d", self.autoNumberOfFiles_cache)
+    return self.autoNumberOfFiles_cache
+# end  of class ObjectFileManager
+
+
+# This class performas the actual mesh operations
+# (creating/removing/updating vertices and faces)
+class PointCloudObjectFrameLoader:
+  def __init__(self, obj, points = [], scene=None):
+    self.obj = obj
+    self.points = points
+    self.scene = scene
+
+    if self.scene == None:
+      self.scene = bpy.context.scene
+
+  def _existingMesh(self):
+    obj = self._existingContainerObject()
+    if obj == None:
+      logger.debug("Couldn't find existing container object")
+      return None
+    logger.debug("Found existing pointcloud mesh")
+    return obj.data
+
+  def _createMesh(self):
+    logger.debug("Creating new pointcloud mesh")
+    return bpy.data.meshes.new("pointscloudmesh")
+
+  def getMesh(self):
+    # this find existing container object,
+    # or creates one. In both cases, it returns a container object with mesh data
+    return self.getContainerObject().data
+
+  def _existingContainerObject(self):
+    # find first child whose name start with "pointcloud" and has mesh data
+    for child in self.obj.children:
+      if child.name.startswith("pointcloud") and child.data != None:
+        logger.debug("Found existing pointcloud container object")
+        return child
+
+    return None
+
+  def _createContainerObject(self): # uncached
+    logger.debug("creating pointcloud container object")
+    cobj = bpy.data.objects.new("pointcloud", self._createMesh())
+    cobj.parent = self.obj
+    # cobj.show_x_ray = True
+    self.scene.objects.link(cobj)
+    return cobj
+
+  # ty to get existing object, otherwise create one
+  def getContainerObject(self):
+    return self._existingContainerObject() or self._createContainerObject()
+
+  # vertices can't be removed from a mesh without going through edit mode and operators
+  # (which is slow, needs the object to be active and doesn't work in background mode),
+  # so instead this replaces the container object's mesh with a fresh one that has exactly
+  # the specified number of vertices. Materials are carried over to the new mesh
+  def _replaceMesh(self, containerObj, count):
+    logger.debug("Replacing pointcloud mesh with one of %d vertices", count)
+    oldMesh = containerObj.data
+    mesh = self._createMesh()
+    mesh.vertices.add(count)
+
+    for material in oldMesh.materials:
+      mesh.materials.append(material)
+
+    containerObj.data = mesh
+    name = oldMesh.name
+
+    if oldMesh.users == 0:
+      bpy.data.meshes.remove(oldMesh)
+      mesh.name = name
+
+    return mesh
+
+  def removeExisting(self):
+    logger.debug("Removing existing point cloud mesh and container object")
+    containerObject = self._existingContainerObject()
+    if containerObject != None:
+      self.scene.objects.unlink(containerObject)
+      bpy.data.objects.remove(containerObject)
+
+  # the removeFaces function isn't working... can't figure it out
+  def removeFaces(self):
+    containerObj = self.getContainerObject()
+    mesh = self.getMesh()
+    logger.debug("Removing all faces from mesh: %s", mesh.name)
+    
+    originalActive = self.scene.objects.active # remember currently active object, so we can restore at the end of this function
+    self.scene.objects.active = containerObj # make specified object the active object
+
+    # Get a BMesh representation
+    # bm = bmesh.from_edit_mesh(mesh)
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+
+    bpy.ops.object.mode_set(mode="EDIT")  # endter edit mode just for a deselect all
+    bpy.ops.mesh.select_all() #action='TOGGLE')
+    containerObj.select = True
+    bpy.ops.mesh.delete() #type='FACE')
+    # bmesh.update_edit_mesh(mesh, True)
+    bpy.ops.object.editmode_toggle() # back to OBJECT mode
+    bm.to_mesh(mesh)
+    bm.free()
+    self.scene.objects.active = originalActive
+
+  # changed optionally gives the positions of the points that changed since the points currently in the mesh
+  # (see PointCloudFrameFile.changedPositions); when there's none, the mesh is left as it is. Otherwise only those
+  # rows get written into the object's vertexBuffers entry, which then gets uploaded with a single foreach_set (that
+  # beats setting even a small fraction of the vertices one by one through RNA). With tracked the uploaded
+  # coordinates are kept in vertexBuffers for that. triangles optionally gives faces (rows of 3 point positions,
+  # see PointCloudFrameFile.gridMesh) to create
+  def createPoints(self, changed=None, triangles=None, tracked=False):
+    logger.debug("Creating point cloud for object: %s", self.obj.name)
+    # find existing mesh or creates a new one (inside a "pointcloud" container object)
+    mesh = self.getMesh()
+    config = self.obj.pointCloudLoaderConfig
+
+    buffer = vertexBuffers.pop(self.obj.name, None)
+    if changed is not None and buffer is not None and len(buffer) == len(self.points) * 3 and len(mesh.vertices) == len(self.points) and len(mesh.polygons) == 0:
+      vertexBuffers[self.obj.name] = buffer
+      if len(changed) == 0:
+        logger.debug("No vertices of pointcloud mesh changed")
+        return
+
+      logger.debug("Updating %d changed vertices of pointcloud mesh", len(changed))
+      with profileStage(self.obj, 'upload'):
+        writeCoordinateRows(buffer, self.points, changed)
+        mesh.vertices.foreach_set("co", buffer)
+        mesh.update()
+
+      with profileStage(self.obj, 'scene update'):
+        self.scene.update()
+      return
+
+    # first make sure the mesh has exactly the right amount of vertices
+    with profileStage(self.obj, 'resize'):
+      existingVertexCount = len(mesh.vertices)
+
+      if len(mesh.polygons) > 0:
+        # faces (of the previous grid mesh frame) can't be removed without edit mode either
+        mesh = self._replaceMesh(self.getContainerObject(), len(self.points))
+      elif existingVertexCount < len(self.points):
+        logger.debug("Adding %d vertices to pointcloud mesh", len(self.points) - existingVertexCount)
+        # add missing vertices
+        mesh.vertices.add(len(self.points) - existingVertexCount)
+      elif existingVertexCount > len(self.points):
+        # get rid of surplus vertices
+        mesh = self._replaceMesh(self.getContainerObject(), len(self.points))
+
+    # initialize all vertices of the mesh in one go (instead of
+    # assigning the coordinates of every vertex separately)
+    with profileStage(self.obj, 'upload'):
+      coordinates = flatCoordinates(self.points)
+      mesh.vertices.foreach_set("co", coordinates)
+      if triangles is None:
+        mesh.update()
+
+    if tracked == True:
+      # a copy; the coordinates can be the frame's points (which are cached)
+      vertexBuffers[self.obj.name] = coordinates.copy() if hasattr(coordinates, 'copy') else coordinates
+
+    if triangles is not None:
+      with profileStage(self.obj, 'faces'):
+        self._createFaces(mesh, triangles)
+
+    with profileStage(self.obj, 'scene update'):
+      self.scene.update()
+
+  # adds all triangles to the mesh in one go (its loops and polygons, the edges get calculated by blender)
+  def _createFaces(self, mesh, triangles):
+    logger.debug("Adding %d faces to pointcloud mesh", len(triangles))
+    vertexIndices, loopStarts, loopTotals = triangleLoops(triangles)
+    mesh.loops.add(len(vertexIndices))
+    mesh.polygons.add(len(triangles))
+    mesh.loops.foreach_set("vertex_index", vertexIndices)
+    mesh.polygons.foreach_set("loop_start", loopStarts)
+    mesh.polygons.foreach_set("loop_total", loopTotals)
+    mesh.update(calc_edges=True)
+# end of class PointCloudObjectFrameLoader
+
+# this class applies a specified existing material to a specified existing object
+class PointCloudMeshMaterialiser:
+  def __init__(self, obj=None, materialName=None):
+    self.obj = obj
+    self.materialName = materialName
+
+  def applyMaterial(self):
+    logger.debug("Applying material %s to object %s", self.materialName, self.obj.name)
+
+    materialIdx = bpy.data.materials.find(self.materialName)
+
+    if materialIdx == -1:
+      logger.warning("Material %s not found, aborting", self.materialName)
+      return
+
+    self.obj.data.materials.append(bpy.data.materials[materialIdx])
+
+
+# This class is in charge of the blender UI panel
+class PointCloudLoaderPanel(bpy.types.Panel):
+    """Creates a Point Cloud Loader Panel in the Object properties window"""
+    bl_label = "Point Cloud Loader"
+    bl_idname = "OBJECT_PT_point_cloud_loader"
+    bl_space_type = 'PROPERTIES'
+    bl_region_type = 'WINDOW'
+    bl_context = "object"
+
+    def draw_header(self, context):
+      layout = self.layout
+      config = context.object.pointCloudLoaderConfig
+      layout.prop(config, "enabled", text='')
+
+    def draw(self, context):
+        layout = self.layout
+        config = context.object.pointCloudLoaderConfig
+
+        if config.enabled == True:
+          layout.row().prop(config, "fileName")
+          layout.row().prop(config, "skipPoints")
+          layout.row().prop(config, "numFiles")
+
+          if config.numFiles == 0:
+            layout.row().label(text="Number of files will be auto-detected at runtime")
+
+          layout.row().operator("object.set_pointcloud_animation_length", text="Set animation length")
+          layout.row().prop(config, "frameRatio")
+          layout.row().prop(config, "pointCloudFrame")
+          layout.row().prop(config, "prefetchDepth")
+          layout.row().prop(config, "prefetchWorkers")
+          layout.row().prop(config, "asyncLoad", text="Load frames in the background")
+          if config.asyncLoad == True and canLoadAsync() != True:
+            layout.row().label(text="Background loading needs a blender window (not in background mode)")
+          layout.row().prop(config, "cacheSize")
+          layout.row().label(text="Frame cache: {0} frames, {1:.1f} MB, {2} hits, {3} misses".format(len(frameCache.entries), frameCache.bytes / (1024.0 * 1024.0), frameCache.hits, frameCache.misses))
+
+          layout.row().prop(config, "preloadLimit")
+          layout.row().prop(config, "preloadDownsample", text="Downsample to fit the preload limit")
+          row = layout.row()
+          row.operator("object.preload_point_cloud", text="Preload sequences")
+          row.operator("object.release_point_cloud_preload", text="Release preload")
+          if len(frameCache.pinned) > 0:
+            layout.row().label(text="Preloaded: {0} frames, {1:.1f} MB".format(len(frameCache.pinned), frameCache.pinnedBytes / (1024.0 * 1024.0)))
+          if context.object.name in preloadSkipPoints:
+            layout.row().label(text="Downsampled for the preload: skip points {0} until released".format(preloadSkipPoints[context.object.name]))
+
+          layout.row().prop(config, "skin")
+          layout.row().prop(config, "materialName")
+
+          if config.skin == True:
+            if ObjectPointObjectLoader(context.object).canSkin() != True:
+              layout.row().label(text="!! Please install/enable Point Cloud Skinner addon !!")
+
+          layout.row().prop(config, 'gridMesh', text="Mesh the recorder's depth image grid")
+          if config.gridMesh == True:
+            layout.row().prop(config, 'gridMaxEdge')
+
+          layout.row().prop(config, 'modify', text="Vertex load-time modifiers")
+
+          if config.modify == True:
+            layout.row().prop(config, 'vertMultiply')
+            layout.row().prop(config, 'vertOffset')
+
+          layout.row().prop(config, 'bounds', text="Enforce vertex bounds at load-time")
+          if config.bounds == True:
+            layout.row().prop(config, 'boundsMin')
+            layout.row().prop(config, 'boundsMax')
+
+          layout.row().prop(config, 'voxelize', text="Voxel-grid downsampling at load-time")
+          if config.voxelize == True:
+            layout.row().prop(config, 'voxelSize')
+            layout.row().prop(config, 'voxelMode')
+
+          layout.row().prop(config, 'cull', text="Cull points outside the camera's view")
+          if config.cull == True:
+            layout.row().prop(config, 'cullMargin')
+            layout.row().prop(config, 'cullMaxDistance')
+            if context.scene.camera == None or context.scene.camera.type != 'CAMERA':
+              layout.row().label(text="The scene has no camera; nothing gets culled")
+
+          layout.row().prop(config, 'streaming', text="Stream frames in chunks (for very large frames)")
+          if config.streaming == True:
+            layout.row().prop(config, 'chunkSize')
+            layout.row().prop(config, 'maxPoints')
+
+          layout.row().prop(config, 'quantize')
+          loaded = loadedFrames.get(context.object.name)
+          if config.quantize != 'NONE' and loaded != None and loaded.quantize != None:
+            layout.row().label(text="Quantization error of the current frame: {0:.6f}".format(loaded.quantizationError))
+
+          layout.row().prop(config, 'adaptive', text="Adaptive decimation (viewport)")
+          if config.adaptive == True:
+            layout.row().prop(config, 'adaptiveBudget')
+            layout.row().prop(config, 'adaptiveMaxSkip')
+            level = adaptiveLevels.get(context.object.name)
+            if context.object.name in preloadedSequences:
+              layout.row().label(text="Paused while the object's frames are preloaded")
+            elif level != None and level.lastDuration != None:
+              layout.row().label(text="Effective skip points: {0} (every {1}. point), last update {2:.1f} ms".format(level.skipPoints(), level.skipPoints() + 1, level.lastDuration * 1000))
+
+          layout.row().prop(config, 'lod', text="Separate render level of detail")
+          if config.lod == True:
+            layout.row().label(text="Viewport uses the settings above, rendering uses:")
+            layout.row().prop(config, 'renderSkipPoints')
+            layout.row().prop(config, 'renderVoxelize', text="Voxel-grid downsampling")
+            if config.renderVoxelize == True:
+              layout.row().prop(config, 'renderVoxelSize')
+
+          layout.row().prop(config, 'profile', text="Profile frame updates")
+          if config.profile == True:
+            for stage, count, mean, p95, maximum in profiler.stats(context.object.name):
+              layout.row().label(text="{0}: mean {1:.1f} ms, p95 {2:.1f} ms, max {3:.1f} ms ({4} samples)".format(stage, mean*1000, p95*1000, maximum*1000, count))
+            row = layout.row()
+            row.operator("object.export_point_cloud_trace", text="Export timing trace")
+            row.operator("object.clear_point_cloud_timings", text="Clear timings")
+
+          layout.row().prop(config, 'bakeFile')
+          row = layout.row()
+          row.operator("object.bake_point_cloud", text="Bake sequence")
+          row.prop(config, 'useBake', text="Play back bake")
+
+          layout.row().operator("object.reload_point_cloud", text="Reload point cloud")
+          layout.row().operator("object.load_point_cloud", text="Load point cloud now")
+
+        layout.row().operator("object.remove_point_cloud", text="Remove point cloud")
+# end of class PointCloudLoaderPanel
+
+
+# This class represents the config data (that the UI Panel interacts with)
+class PointCloudLoaderConfig(bpy.types.PropertyGroup):
+  @classmethod
+  def register(cls):
+    bpy.types.Object.pointCloudLoaderConfig = bpy.props.PointerProperty(
+      name="Point Cloud Loader Config",
+      description="Object-specific Point Cloud Loader properties",
+      type=cls)
+   
+    # Add in the properties
+    cls.enabled = bpy.props.BoolProperty(name="enabled", default=False, description="Enable point cloud for this object")
+    cls.fileName = bpy.props.StringProperty(name="Data Files", default="pointCloudData/frame%d.txt")
+    cls.skipPoints = bpy.props.IntProperty(name="Skip Points", default=0, soft_min=0)
+    cls.numFiles = bpy.props.IntProperty(name="Number of files", default=100, soft_min=0)
+    cls.frameRatio = bpy.props.FloatProperty(name="Frame ratio", default=1.0, soft_min=0.0, description="Point cloud frame / blender frame ratio")
+    cls.pointCloudFrame = bpy.props.IntProperty(name="Current Point Cloud Data Frame", default=-1, soft_min=-1, description="Key-frameable property to specify which ppoint cloud data frame to use. When -1, it will be ignored, and the frameRatio will be used to calculate the current point cloud data from from the current scene frame.")
+
+    cls.prefetchDepth = bpy.props.IntProperty(name="Prefetch frames", default=4, min=0, description="Number of upcoming point cloud frames to load in the background")
+    cls.prefetchWorkers = bpy.props.IntProperty(name="Prefetch workers", default=2, min=1, soft_max=16, description="Number of background threads that load upcoming point cloud frames (shared by all point cloud objects)")
+
+    cls.asyncLoad = bpy.props.BoolProperty(name="asyncLoad", default=False, description="Load frames in the background instead of blocking blender; the previous frame stays visible until the new one is loaded (rendering always loads synchronously)")
+
+    cls.cacheSize = bpy.props.IntProperty(name="Frame cache size (MB)", default=1024, min=0, description="Memory budget for keeping loaded point cloud frames around (shared by all point cloud objects, the largest setting is used)")
+    cls.preloadLimit = bpy.props.IntProperty(name="Preload limit (MB)", default=4096, min=0, description="Memory ceiling for preloading the frames of the scene's frame range (shared by all point cloud objects, the largest setting is used; 0 means no limit)")
+    cls.preloadDownsample = bpy.props.BoolProperty(name="preloadDownsample", default=False, description="When the preloaded frames are estimated to take more than the preload limit, load them with more skip points to make them fit, until the preload is released (instead of refusing to preload)")
+
+    cls.skin = bpy.props.BoolProperty(name="skin", default=False, description="Skin point cloud mesh using, Point Cloud Skinner addon")
+    cls.materialName = bpy.props.StringProperty(name="Material name", default="")
+
+    cls.gridMesh = bpy.props.BoolProperty(name="gridMesh", default=False, description="Connect neighbouring points of the Kinect recorder's depth image grid into faces at load time (a fast alternative to skinning; needs the recorder's point indices, so works best without skipping and voxel-grid downsampling)")
+    cls.gridMaxEdge = bpy.props.FloatProperty(name="Max edge length", default=5.0, min=0.0, description="Faces with a longer edge (depth discontinuities) are left out; 0 for no limit")
+
+    cls.modify = bpy.props.BoolProperty(name="modify", default=False, description="Modify point cloud vertices at load time")
+    try:
+      cls.vertOffset = bpy.props.FloatVectorProperty(name="Vertex Offset", description="The position of all vertices is offset with this vector at load-time", default=(1.0, 1.0, 1.0))
+      cls.vertMultiply = bpy.props.FloatVectorProperty(name="Vertex Multiply", description="The position of all vertices is multiplied by this vector at load-time", default=(1.0, 1.0, 1.0))
+    except: #(ValueError, AttributeError, NameError):
+      pass
+
+    cls.bounds = bpy.props.BoolProperty(name="bounds", default=False, description="Apply bounding box that rejects vertices at load time")
+    try:
+      cls.boundsMin = bpy.props.FloatVectorProperty(name="Bounds minimum vector", default=(-10.0, -10.0, -10.0))
+      cls.boundsMax = bpy.props.FloatVectorProperty(name="Bounds maximum vector", default=(10.0, 10.0, 10.0))
+    except:
+      pass
+
+    cls.voxelize = bpy.props.BoolProperty(name="voxelize", default=False, description="Reduce the points to one point per voxel at load time (after enforcing bounds)")
+    cls.voxelSize = bpy.props.FloatProperty(name="Voxel size", default=1.0, min=0.0001, soft_min=0.01, description="Size of the (cubic) voxels")
+    cls.voxelMode = bpy.props.EnumProperty(name="Voxel point", default='CENTROID', description="Point that represents all points in a voxel",
+      items=[('CENTROID', "Centroid", "Average position of the voxel's points"), ('FIRST', "First point", "The voxel's first point in the file")])
+
+    cls.cull = bpy.props.BoolProperty(name="cull", default=False, description="Leave out the points outside the scene camera's view (and beyond the max distance) before they become vertices; also when rendering")
+    cls.cullMargin = bpy.props.FloatProperty(name="Cull margin", default=0.5, min=0.0, description="Points up to this distance outside the camera's view are kept (in the point cloud's coordinates)")
+    cls.cullMaxDistance = bpy.props.FloatProperty(name="Max camera distance", default=0.0, min=0.0, description="Points further from the camera are left out (in the point cloud's coordinates); 0 for no limit")
+    cls.streaming = bpy.props.BoolProperty(name="streaming", default=False, description="Read frame files a chunk at a time, only keeping the accepted points; for frames that don't fit in memory (there's no rejected/non-active point data then)")
+    cls.chunkSize = bpy.props.IntProperty(name="Chunk size (points)", default=1000000, min=1, description="Number of points read (and processed) at a time")
+    cls.maxPoints = bpy.props.IntProperty(name="Max points", default=0, min=0, description="Keep a random sample of (at most) this number of the accepted points per frame; 0 for no limit")
+    cls.quantize = bpy.props.EnumProperty(name="Quantize points", default='NONE', description="Keep loaded (and cached) frames as integer coordinates with a per-frame scale and offset; 2-4x less memory, off by at most half a quantization step",
+      items=[('NONE', "None", "Keep float coordinates"), ('INT16', "16 bit", "65535 steps along the frame's largest dimension"), ('INT32', "32 bit", "For very large or detailed frames")])
+
+    cls.adaptive = bpy.props.BoolProperty(name="adaptive", default=False, description="Skip more (or fewer) points in the viewport to keep this object's frame updates within the time budget (never when rendering, and not for bakes)")
+    cls.adaptiveBudget = bpy.props.FloatProperty(name="Frame update budget (ms)", default=20.0, min=0.0, description="Time a frame update of this object may take (the scene's frame rate leaves 1000 / fps ms for all objects together)")
+    cls.adaptiveMaxSkip = bpy.props.IntProperty(name="Max adaptive skip points", default=50, min=0, description="Adaptive decimation doesn't skip more points than this")
+    cls.lod = bpy.props.BoolProperty(name="lod", default=False, description="Use different skip/voxel settings when rendering than in the viewport")
+    cls.renderSkipPoints = bpy.props.IntProperty(name="Render skip points", default=0, soft_min=0)
+    cls.renderVoxelize = bpy.props.BoolProperty(name="renderVoxelize", default=False, description="Reduce the points to one point per voxel at load time when rendering")
+    cls.renderVoxelSize = bpy.props.FloatProperty(name="Render voxel size", default=1.0, min=0.0001, soft_min=0.01, description="Size of the (cubic) voxels when rendering")
+    cls.bakeFile = bpy.props.StringProperty(name="Bake file", default="pointCloudBake.pcs", subtype='FILE_PATH', description="Sequence file the Bake sequence operator writes all (processed) frames to")
+    cls.useBake = bpy.props.BoolProperty(name="useBake", default=False, description="Read the frames from the bake file (which has the load-time settings applied already) instead of the data files")
+    cls.profile = bpy.props.BoolProperty(name="profile", default=False, description="Time the stages of this object's point cloud frame updates")
+    # not configurable; for internal use (optimilization)
+    cls.currentFrameLoaded = bpy.props.StringProperty(name="Currently Loaded Frame File", default="")
+    cls.currentLevelOfDetailLoaded = bpy.props.StringProperty(name="Currently Loaded Level of Detail", default="")
+    cls.currentCullLoaded = bpy.props.StringProperty(name="Currently Loaded Camera View", default="")
+
+  ## Unregister is causing errors and doesn't seem to be necessary
+  # @classmethod
+  # def unregister(cls):
+  #   print("Unreg: ")
+  #   print(dir(bpy.types.Object))
+  #   del bpy.types.Object.pointCloudLoaderConfig
+# end of class PointCloudLoaderConfig
+
+
+# Operation classes
+class PointCloudLoaderLoadOperator(bpy.types.Operator):
+    bl_idname = "object.load_point_cloud"
+    bl_label = "Load a point cloud (Point Cloud Loader)"
+    bl_description = "Load point cloud data from external files."
+
+    # @classmethod
+    # def poll(cls, context):
+    #     return True
+
+    def execute(self, context):
+      obj = context.object
+      if obj.pointCloudLoaderConfig.enabled == True:
+        ObjectPointObjectLoader(obj, force=True).loadFrame()
+      return {'FINISHED'}
+
+class PointCloudLoaderRemoveOperator(bpy.types.Operator):
+    bl_idname = "object.remove_point_cloud"
+    bl_label = "Remove point cloud (Point Cloud Loader)"
+    bl_description = "Remove loaded point cloud mesh"
+
+    # @classmethod
+    # def poll(cls, context):
+    #     return True
+
+    def execute(self, context):
+      obj = context.object
+      if obj.pointCloudLoaderConfig.enabled == True:
+        ObjectPointObjectLoader(obj, force=True).removeExisting()
+      return {'FINISHED'}
+
+class PointCloudLoaderReloadOperator(bpy.types.Operator):
+    bl_idname = "object.reload_point_cloud"
+    bl_label = "Remove point cloud (Point Cloud Loader)"
+    bl_description = "Remove loaded point cloud mesh"
+
+    # @classmethod
+    # def poll(cls, context):
+    #     return True
+
+    def execute(self, context):
+      closeSequenceFiles() # makes sure (re-)written sequence files get re-opened
+      frameCache.revalidate() # and the frames of changed files get loaded again
+      releasePreload() # preloaded frames don't notice changed files
+      bpy.ops.object.remove_point_cloud()
+      bpy.ops.object.load_point_cloud()
+      return {'FINISHED'}
+
+class PointCloudLoaderBakeOperator(bpy.types.Operator):
+    bl_idname = "object.bake_point_cloud"
+    bl_label = "Bake point cloud sequence (Point Cloud Loader)"
+    bl_description = "Load all point cloud frames (with the skip, bounds, modify and voxel settings; the render ones when enabled) into the bake file, and play back from there"
+
+    def execute(self, context):
+      obj = context.object
+      config = obj.pointCloudLoaderConfig
+      fileManager = ObjectFileManager(obj, bake=False)
+      loader = ObjectPointObjectLoader(obj, scene=context.scene)
+      levelOfDetail = 'RENDER' if config.lod == True else 'VIEWPORT'
+      count = fileManager.numberOfFiles()
+      dest = fileManager._absolutePath(config.bakeFile)
+
+      # frame files are created while baking, so only the one being written is in memory
+      def frameFiles():
+        for frame in range(count):
+          path = fileManager.pathForPointCloudFrame(frame)
+          yield loader.frameFile(path, levelOfDetail, bake=False) if os.path.isfile(splitSequenceFramePath(path)[0]) else None
+
+      closeSequenceFiles() # the previous bake file (if any) gets replaced
+      windowManager = context.window_manager
+      windowManager.progress_begin(0, count)
+      try:
+        size = bakeSequence(dest, frameFiles(), count, progress=windowManager.progress_update)
+      except (IOError, OSError, ValueError) as err:
+        self.report({'ERROR'}, "Baking point cloud failed: {0}".format(err))
+        return {'CANCELLED'}
+      finally:
+        windowManager.progress_end()
+        frameCache.revalidate(os.path.dirname(dest)) # frames of the previous bake are stale
+
+      self.report({'INFO'}, "Baked {0} point cloud frames into {1} ({2:.1f} MB)".format(count, dest, size / (1024.0 * 1024.0)))
+      config.useBake = True
+      ObjectPointObjectLoader(obj, scene=context.scene, force=True).loadFrame()
+      return {'FINISHED'}
+
+class PointCloudLoaderPreloadOperator(bpy.types.Operator):
+    bl_idname = "object.preload_point_cloud"
+    bl_label = "Preload point cloud sequences (Point Cloud Loader)"
+    bl_description = "Load the frames of the scene's frame range of all point cloud objects into memory (in the background, Esc cancels), so playback doesn't read any files"
+
+    def invoke(self, context, event):
+      releasePreload() # preloading again replaces the previous preload
+      scene = context.scene
+      objs = PointCloudLoader(scene=scene).enabledObjects()
+      if len(objs) == 0:
+        self.report({'WARNING'}, "No point cloud objects to preload")
+        return {'CANCELLED'}
+
+      limit = max([obj.pointCloudLoaderConfig.preloadLimit for obj in objs]) * 1024 * 1024
+      self._collect(scene, objs)
+
+      # a preload limit of 0 means no limit
+      if limit > 0 and self.estimate > limit and any([obj.pointCloudLoaderConfig.preloadDownsample for obj in objs]):
+        # skipping points shrinks the frames about proportionally (doesn't apply to bakes); the objects'
+        # skipPoints settings stay as they are, releasePreload goes back to them
+        factor = self.estimate / float(limit)
+        for obj in objs:
+          if ObjectFileManager(obj).bake != True:
+            preloadSkipPoints[obj.name] = int(math.ceil((obj.pointCloudLoaderConfig.skipPoints + 1) * factor)) - 1
+        self._collect(scene, objs)
+
+      if limit > 0 and self.estimate > limit:
+        preloadSkipPoints.clear()
+        self.report({'ERROR'}, "Preloading would take about {0:.1f} MB, more than the {1:.1f} MB preload limit".format(self.estimate / (1024.0 * 1024.0), limit / (1024.0 * 1024.0)))
+        return {'CANCELLED'}
+
+      # load all frames that aren't in memory yet in the background; modal pins them as they come in
+      self.preloader = PointCloudFramePrefetcher(workers=max([obj.pointCloudLoaderConfig.prefetchWorkers for obj in objs]))
+      self.keys = []
+      self.failed = 0
+      for key, file in self.files.items():
+        loaded = self.samples.get(key) or frameCache.get(frameCache.key(file))
+        if loaded != None:
+          frameCache.pin(loaded)
+        else:
+          self.preloader.prefetch(file)
+          self.keys.append(key)
+
+      self.area = context.area
+      windowManager = context.window_manager
+      windowManager.progress_begin(0, len(self.files))
+      self.timer = windowManager.event_timer_add(PRELOAD_POLL_INTERVAL, context.window)
+      windowManager.modal_handler_add(self)
+      return {'RUNNING_MODAL'}
+
+    # finds the frame files of the scene's frame range (at the viewport level of detail) of all objects, and
+    # estimates the memory they'll take from the first frame of each object (which gets loaded for that)
+    def _collect(self, scene, objs):
+      self.files = collections.OrderedDict() # frame file cache keys -> frame files, every distinct frame once
+      self.samples = {} # frame file cache keys -> the frame files loaded for the estimate
+      self.sequences = {} # object name -> (fileName, automatically determined number of files, {point cloud frame number: cache key})
+      self.estimate = 0
+
+      for obj in objs:
+        loader = ObjectPointObjectLoader(obj, scene=scene)
+        fileManager = ObjectFileManager(obj)
+        frames = {}
+        count = 0
+        sample = None
+
+        for sceneFrame in range(scene.frame_start, scene.frame_end+1):
+          path = fileManager.frameFilePath(sceneFrame)
+          if path == None:
+            continue
+          file = loader.frameFile(path, 'VIEWPORT')
+          frames[fileManager.getPointCloudFrameNumber(sceneFrame)] = file.cacheKey()
+          if file.cacheKey() in self.files:
+            continue # shared with another object, or a frame shown for multiple scene frames
+
+          self.files[file.cacheKey()] = file
+          count += 1
+          if sample == None:
+            try:
+              sample = self.samples[file.cacheKey()] = file.load()
+            except (IOError, OSError, ValueError) as err:
+              logger.warning("Couldn't load point cloud frame file %s: %s", path, err)
+
+        if sample != None:
+          self.estimate += sample.nbytes() * count
+        self.sequences[obj.name] = (fileManager.fileName(), fileManager.autoNumberOfFiles(), frames)
+
+    def modal(self, context, event):
+      if event.type == 'ESC':
+        return self._finish(context, cancelled=True)
+
+      if event.type != 'TIMER':
+        return {'PASS_THROUGH'}
+
+      for key in [key for key in self.keys if self.preloader.isDone(key)]:
+        self.keys.remove(key)
+        loaded = self.preloader.take(key)
+        if loaded != None:
+          frameCache.pin(loaded)
+        else:
+          self.failed += 1
+
+      done = len(self.files) - len(self.keys)
+      context.window_manager.progress_update(done)
+      self._status(context, "Preloading point cloud frames: {0}/{1}, {2:.1f} MB (Esc to cancel)".format(done, len(self.files), frameCache.pinnedBytes / (1024.0 * 1024.0)))
+
+      if len(self.keys) == 0:
+        return self._finish(context)
+      return {'PASS_THROUGH'}
+
+    def cancel(self, context):
+      self._finish(context, cancelled=True)
+
+    def _finish(self, context, cancelled=False):
+      windowManager = context.window_manager
+      windowManager.event_timer_remove(self.timer)
+      windowManager.progress_end()
+      self._status(context, None)
+      self.preloader.shutdown()
+      # the frames that made it in are used, also when cancelled (frames that didn't are read from the disk)
+      for name, (fileName, numberOfFiles, frames) in self.sequences.items():
+        preloadedSequences[name] = (fileName, numberOfFiles, set([fnumber for fnumber, key in frames.items() if frameCache.isPinned(key)]))
+
+      size = frameCache.pinnedBytes / (1024.0 * 1024.0)
+      if cancelled == True:
+        self.report({'WARNING'}, "Preloading cancelled; {0} of {1} point cloud frames in memory ({2:.1f} MB)".format(len(frameCache.pinned), len(self.files), size))
+        return {'CANCELLED'}
+
+      if self.failed > 0:
+        self.report({'WARNING'}, "Preloaded {0} point cloud frames ({1:.1f} MB), {2} failed to load".format(len(frameCache.pinned), size, self.failed))
+      else:
+        self.report({'INFO'}, "Preloaded {0} point cloud frames ({1:.1f} MB)".format(len(frameCache.pinned), size))
+      return {'FINISHED'}
+
+    # shows the text in the header of the area the preload was started from (None restores the header)
+    def _status(self, context, text):
+      if self.area == None:
+        return
+      if text == None:
+        self.area.header_text_set()
+      else:
+        self.area.header_text_set(text)
+
+class PointCloudLoaderReleasePreloadOperator(bpy.types.Operator):
+    bl_idname = "object.release_point_cloud_preload"
+    bl_label = "Release preloaded point cloud frames (Point Cloud Loader)"
+    bl_description = "Free the memory of the preloaded frames; playback reads the frame files again"
+
+    def execute(self, context):
+      releasePreload()
+      return {'FINISHED'}
+
+# started by ObjectPointObjectLoader._requestFrame, runs (one at a time) until all frames that are
+# loading in the background (see pendingLoads) have been applied to their objects
+class PointCloudLoaderApplyLoadedOperator(bpy.types.Operator):
+    bl_idname = "object.apply_loaded_point_clouds"
+    bl_label = "Apply point cloud frames loaded in the background (Point Cloud Loader)"
+    bl_description = "Put the point cloud frames that were loaded in the background into their objects' meshes"
+    bl_options = {'INTERNAL'}
+
+    running = False
+
+    def invoke(self, context, event):
+      if PointCloudLoaderApplyLoadedOperator.running == True:
+        return {'CANCELLED'}
+
+      PointCloudLoaderApplyLoadedOperator.running = True
+      self.timer = context.window_manager.event_timer_add(ASYNC_POLL_INTERVAL, context.window)
+      context.window_manager.modal_handler_add(self)
+      return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+      if event.type != 'TIMER':
+        return {'PASS_THROUGH'}
+
+      applyLoadedFrames()
+      if len(pendingLoads) == 0:
+        self._finish(context)
+        return {'FINISHED'}
+      return {'PASS_THROUGH'}
+
+    def cancel(self, context):
+      self._finish(context)
+
+    def _finish(self, context):
+      context.window_manager.event_timer_remove(self.timer)
+      PointCloudLoaderApplyLoadedOperator.running = False
+
+class PointCloudLoaderExportTraceOperator(bpy.types.Operator):
+    bl_idname = "object.export_point_cloud_trace"
+    bl_label = "Export point cloud timing trace (Point Cloud Loader)"
+    bl_description = "Save the recorded frame update timings as Chrome trace-format JSON (for chrome://tracing or https://ui.perfetto.dev)"
+
+    filepath = bpy.props.StringProperty(subtype="FILE_PATH", default="//point_cloud_trace.json")
+
+    def invoke(self, context, event):
+      context.window_manager.fileselect_add(self)
+      return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+      count = profiler.exportChromeTrace(bpy.path.abspath(self.filepath))
+      self.report({'INFO'}, "Exported {0} timing events to {1}".format(count, self.filepath))
+      return {'FINISHED'}
+
+class PointCloudLoaderClearTimingsOperator(bpy.types.Operator):
+    bl_idname = "object.clear_point_cloud_timings"
+    bl_label = "Clear point cloud timings (Point Cloud Loader)"
+    bl_description = "Forget all recorded frame update timings"
+
+    def execute(self, context):
+      profiler.clear()
+      return {'FINISHED'}
+
+class PointCloudLoaderSetPointcloudAnimationLengthOperator(bpy.types.Operator):
+    bl_idname = "object.set_pointcloud_animation_length"
+    bl_label = "Set animation length based on point cloud data length (Point Cloud Loader)"
+    bl_description = "Make blender's render animation length fit the number of point cloud data frames."
+
+    # @classmethod
+    # def poll(cls, context):
+    #     return True
+
+    def execute(self, context):
+      context.scene.frame_start = 0
+      context.scene.frame_end = ObjectFileManager(context.object).numberOfFiles()-1
+      return {'FINISHED'}
+      
+
+# Blender addon stuff, (un-)registerers and events handlers
+#
+# frames loaded in the background get applied by a modal operator (PointCloudLoaderApplyLoadedOperator),
+# which needs a window; in background mode (blender -b) everything loads synchronously
+def canLoadAsync():
+  windowManager = getattr(bpy.context, 'window_manager', None)
+  return windowManager != None and len(windowManager.windows) > 0
+
+# applies frames that finished loading in the background to their objects' meshes;
+# on blender's main thread, the only place where that can happen
+def applyLoadedFrames():
+  shared = {} # frames applied during this check; objects waiting for the same frame file all get it
+  for name in list(pendingLoads.keys()):
+    file, cacheKey, path, levelOfDetail = pendingLoads[name]
+    key = file.cacheKey()
+
+    if key not in shared:
+      if not prefetcher.isPrefetching(key):
+        prefetcher.prefetch(file) # the prefetcher was reset (different number of workers); try again
+        continue
+      if not prefetcher.isDone(key):
+        continue
+
+    del pendingLoads[name]
+    loaded = shared[key][0] if key in shared else prefetcher.take(key)
+    obj = bpy.data.objects.get(name)
+    if loaded == None or obj == None or obj.pointCloudLoaderConfig.enabled != True:
+      continue
+
+    frameCache.put(cacheKey, loaded)
+    start = time.perf_counter()
+    with profileStage(obj, 'frame'):
+      ObjectPointObjectLoader(obj, shared=shared).applyFrame(loaded, path, levelOfDetail, fresh=key not in shared)
+    if levelOfDetail == 'ADAPTIVE':
+      adaptiveDecimation(obj).record(time.perf_counter() - start)
+
+@persistent
+def frameHandler(scene):
+  logger.debug("-- PointCloudLoader frame update START --")
+  PointCloudLoader(scene=scene).loadFrame()
+  logger.debug("-- PointCloudLoader frame update END --")
+
+# switches point cloud objects to their render level of detail, before anything gets rendered.
+# render_pre/render_post are called for every frame of an animation render, so the
+# switch back happens when the whole render job is done (or cancelled)
+@persistent
+def renderPreHandler(scene):
+  if PointCloudLoader.rendering != True:
+    PointCloudLoader.rendering = True
+    PointCloudLoader(scene=scene).loadFrame()
+
+# switches point cloud objects back to their viewport level of detail once the render job is done (or cancelled)
+@persistent
+def renderEndHandler(scene):
+  if PointCloudLoader.rendering == True:
+    PointCloudLoader.rendering = False
+    PointCloudLoader(scene=scene).loadFrame()
+
+def register():
+  bpy.utils.register_module(__name__)
+  # frames of files that got replaced drop out of the cache when their directory's index notices
+  directoryChangeListeners.append(frameCache.revalidate)
+  bpy.app.handlers.frame_change_pre.append(frameHandler)
+  bpy.app.handlers.render_pre.append(renderPreHandler)
+  bpy.app.handlers.render_complete.append(renderEndHandler)
+  bpy.app.handlers.render_cancel.append(renderEndHandler)
+
+def unregister():
+  bpy.utils.unregister_module(__name__)
+  directoryChangeListeners.remove(frameCache.revalidate)
+  bpy.app.handlers.frame_change_pre.remove(frameHandler)
+  bpy.app.handlers.render_pre.remove(renderPreHandler)
+  bpy.app.handlers.render_complete.remove(renderEndHandler)
+  bpy.app.handlers.render_cancel.remove(renderEndHandler)
+  pendingLoads.clear() # PointCloudLoaderApplyLoadedOperator stops with nothing left to apply
+  prefetcher.shutdown()
+  releasePreload()
+  adaptiveLevels.clear()
+  vertexBuffers.clear()
@@ -0,0 +1,2210 @@
+# Point cloud data files; reading, writing and converting point cloud frames.
+#
+# This module doesn't depend on blender, so it's used by the Point Cloud Loader
+# addon (addon.py, in the same point_cloud_loader package) as well as from the
+# command-line (from the directory that contains the package), for example:
+#
+#   python -m point_cloud_loader.point_cloud_data convert out33/
+#   python -m point_cloud_loader.point_cloud_data pack out33/ take33.pcs
+#   python -m point_cloud_loader.point_cloud_data batch out33/ clean33/ --max 50 50 300 --workers 32
+#
+# Besides the Processing recorder's text files it reads binary PLY and PCD files and XYZ text
+# files (see registerReader), and its own binary frame and sequence files.
+# NumPy is optional; without it everything falls back to (much slower) pure python.
+
+# system stuff
+import argparse
+import array
+import collections
+import concurrent.futures
+import copy
+import io
+import itertools
+import json
+import logging
+import math
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import threading
+import time
+# optional stuff
+try:
+  import numpy
+except ImportError: # not every blender build ships with numpy
+  numpy = None
+
+logger = logging.getLogger(__name__)
+
+
+# The Processing KinectPointCloudRecorder writes one "idx, x, y, z" line per point,
+# with the coordinates in meters; these get multiplied by this factor at load-time
+TEXT_FRAME_SCALE = 100.0
+# the recorder writes every 4th pixel of the 640x480 depth image (160 columns of 120 rows), column
+# by column; the index of a point is column * RECORDER_GRID_ROWS + row (see gridTriangles)
+RECORDER_GRID_ROWS = 120
+
+# Binary frame files are a compact alternative to the recorder's text files.
+# Layout (all little-endian):
+#   magic "PCFB", version (uint8), coordinate type (char), index type (char), flags (uint8; see BINARY_FRAME_DELTA)
+#   point count (uint32)
+#   scale (float32); coordinates are multiplied by this factor at load-time
+#   only with the BINARY_FRAME_QUANTIZED flag (version 2); offset (3 float32), added to the coordinates after scaling
+# followed by <count> indices (padded to a multiple of 4 bytes)
+# and <count>*3 coordinates (x,y,z interleaved).
+# Type chars are struct/array-module type codes ('f' for float32, 'H' for uint16, 'I' for uint32,
+# 'h' and 'i' for int16 and int32 quantized coordinates, see QuantizedPoints)
+BINARY_FRAME_MAGIC = b"PCFB"
+BINARY_FRAME_VERSION = 2
+BINARY_FRAME_HEADER = struct.Struct("<4sBccBIf")
+BINARY_FRAME_OFFSET = struct.Struct("<3f")
+BINARY_FRAME_EXTENSION = ".pcb"
+BINARY_TYPE_SIZES = {'h': 2, 'H': 2, 'i': 4, 'I': 4, 'f': 4, 'd': 8}
+# flag of frames (inside delta sequences) that only contain the points that changed since the previous frame
+BINARY_FRAME_DELTA = 1
+# flag of frames with quantized (integer) coordinates and an offset
+BINARY_FRAME_QUANTIZED = 2
+# quantized coordinate types -> bits
+QUANTIZED_TYPES = {'h': 16, 'i': 32}
+QUANTIZED_TYPE_NAMES = {'int16': 'h', 'int32': 'i'}
+
+# Sequence files pack all frames of a recording into a single file. Layout (all little-endian):
+#   magic "PCFS", version (uint8), 3 reserved bytes, flags (uint32; see SEQUENCE_DELTA), frame count (uint32)
+#   frame offset table; <frame count>+1 uint64 file offsets (the last one marks the end of the last frame)
+# followed by the frames, stored back to back as binary frames (see above).
+# Frames inside a sequence file are addressed with paths like "take33.pcs#12" (see sequenceFramePath)
+#
+# Sequences with the SEQUENCE_DELTA flag are delta encoded: every now and then a keyframe (a complete
+# frame, sorted by point index) and in between delta frames (with the BINARY_FRAME_DELTA flag) that only
+# contain the points that appeared, moved or disappeared (those get coordinates 0,0,0) since the previous frame
+SEQUENCE_MAGIC = b"PCFS"
+SEQUENCE_VERSION = 1
+SEQUENCE_HEADER = struct.Struct("<4sBxxxII")
+SEQUENCE_EXTENSION = ".pcs"
+SEQUENCE_FRAME_SEPARATOR = "#"
+SEQUENCE_DELTA = 1
+
+
+# turns a file name pattern like "frame%d.txt" (or "frame%04d.txt")
+# into a regular expression that captures the frame number
+def patternRegex(pattern):
+  return re.compile('^' + re.sub(r'%0?\d*d', r'(\\d+)', re.escape(pattern)) + '$')
+
+def _padding(size):
+  return (4 - size % 4) % 4
+
+# unpacks <count> little-endian values of the specified type from data into a python list
+def _unpackList(data, typeCode, count, offset):
+  values = array.array(typeCode)
+  size = count * BINARY_TYPE_SIZES[typeCode]
+  values.frombytes(bytes(data[offset:offset+size]))
+  if sys.byteorder != 'little':
+    values.byteswap()
+  return values.tolist()
+
+def _packList(values, typeCode):
+  values = array.array(typeCode, values)
+  if sys.byteorder != 'little':
+    values.byteswap()
+  return values.tobytes()
+
+# Points stored as int16 ('h') or int32 ('i') codes plus a scale and an offset (per frame); the points are
+# code * scale + offset, so every coordinate is off by at most scale/2. Takes 2 (or 4) bytes per coordinate
+# instead of 4 (float32), or a python float. Points at 0,0,0 (the recorder's non-active points, or removed points
+# in delta frames) stay exactly 0,0,0; their x code is the type's minimum (which isn't used otherwise)
+class QuantizedPoints:
+  def __init__(self, points, typeCode='h'):
+    if typeCode not in QUANTIZED_TYPES:
+      raise ValueError("Unsupported quantized coordinate type: {0}".format(typeCode))
+    self.typeCode = typeCode
+    self.codes, self.scale, self.offset = quantizeCoordinates(points, typeCode)
+    self.error = self._error(points) # the largest difference of a dequantized coordinate from the original
+
+  def __len__(self):
+    return len(self.codes) if numpy != None else len(self.codes) // 3
+
+  def nbytes(self):
+    return self.codes.nbytes if numpy != None else len(self.codes) * self.codes.itemsize
+
+  # gives the points from start up to end; with NumPy they share this one's codes
+  def view(self, start, end):
+    view = copy.copy(self)
+    view.codes = self.codes[start:end] if numpy != None else self.codes[start*3:end*3]
+    return view
+
+  # gives the points as (N,3) float32 array (or list of tuples), in one go
+  def dequantize(self):
+    return dequantizeCoordinates(self.codes, self.scale, self.offset, self.typeCode)
+
+  def _error(self, points):
+    if numpy != None:
+      if len(self.codes) == 0:
+        return 0.0
+      return float(numpy.abs(self.dequantize() - numpy.asarray(points).reshape(-1,3)).max())
+    return max([abs(a - b) for decoded, original in zip(self.dequantize(), points) for a, b in zip(decoded, original)] or [0.0])
+# end of class QuantizedPoints
+
+# gives (codes, scale, offset) of the specified points (see QuantizedPoints); codes is an (N,3)
+# array with NumPy, a flat array.array of the specified type otherwise
+def quantizeCoordinates(points, typeCode):
+  levels = 2**(QUANTIZED_TYPES[typeCode]-1) - 1
+  zeroCode = -levels - 1
+
+  if numpy != None:
+    # float32 is precise enough for 16 bit codes
+    dtype = numpy.float32 if typeCode == 'h' else numpy.float64
+    coords = numpy.asarray(points).reshape(-1,3).astype(dtype, copy=False)
+    # (column by column; a lot faster than along axis 1 of an (N,3) array)
+    zero = (coords[:,0] == 0) & (coords[:,1] == 0) & (coords[:,2] == 0)
+    valid = coords[~zero] if zero.any() else coords
+    if len(valid) == 0:
+      scale, offset = 1.0, numpy.zeros(3, dtype=numpy.float32)
+    else:
+      low = numpy.array([valid[:,axis].min() for axis in range(3)], dtype=numpy.float64)
+      high = numpy.array([valid[:,axis].max() for axis in range(3)], dtype=numpy.float64)
+      # a single scale for all axes (the header has one), with a little room for rounding
+      scale = float(numpy.float32((high - low).max() / (2 * levels - 2))) or 1.0
+      offset = ((low + high) / 2).astype(numpy.float32)
+    codes = numpy.clip(numpy.rint((coords - offset.astype(dtype)) / dtype(scale)), -levels, levels).astype('<'+typeCode)
+    codes[zero] = (zeroCode, 0, 0)
+    return codes, scale, tuple(offset.tolist())
+
+  valid = [v for v in points if v[0] != 0 or v[1] != 0 or v[2] != 0]
+  if len(valid) == 0:
+    scale, offset = 1.0, (0.0, 0.0, 0.0)
+  else:
+    low = [min([v[i] for v in valid]) for i in range(3)]
+    high = [max([v[i] for v in valid]) for i in range(3)]
+    scale = struct.unpack("<f", struct.pack("<f", max([high[i] - low[i] for i in range(3)]) / (2 * levels - 2)))[0] or 1.0
+    offset = BINARY_FRAME_OFFSET.unpack(BINARY_FRAME_OFFSET.pack(*[(low[i] + high[i]) / 2 for i in range(3)]))
+
+  codes = array.array(typeCode)
+  for v in points:
+    if v[0] == 0 and v[1] == 0 and v[2] == 0:
+      codes.extend((zeroCode, 0, 0))
+    else:
+      codes.extend([min(levels, max(-levels, int(round((v[i] - offset[i]) / scale)))) for i in range(3)])
+  return codes, scale, offset
+
+# the opposite of quantizeCoordinates; codes can also be a list of (x,y,z) code tuples
+def dequantizeCoordinates(codes, scale, offset, typeCode):
+  zeroCode = -2**(QUANTIZED_TYPES[typeCode]-1)
+
+  if numpy != None:
+    codes = numpy.asarray(codes).reshape(-1,3)
+    # float32 can't hold every int32 code exactly
+    dtype = numpy.float32 if typeCode == 'h' else numpy.float64
+    coords = codes.astype(dtype) * dtype(scale) + numpy.array(offset, dtype=dtype)
+    coords = coords.astype(numpy.float32, copy=False)
+    zero = codes[:,0] == zeroCode
+    if zero.any():
+      coords[zero] = 0
+    return coords
+
+  if isinstance(codes, array.array):
+    codes = zip(codes[0::3], codes[1::3], codes[2::3])
+  return [(0.0, 0.0, 0.0) if x == zeroCode else (x*scale + offset[0], y*scale + offset[1], z*scale + offset[2]) for x, y, z in codes]
+
+# returns the bytes of a binary frame containing the specified indices and (x,y,z) coordinates. With a
+# quantized coordType ('h' or 'i') the (scaled) coordinates get quantized; coords can also be QuantizedPoints
+def packBinaryFrame(indices, coords, scale=1.0, coordType='f', indexType=None, flags=0):
+  offset = b''
+  if coordType in QUANTIZED_TYPES and not isinstance(coords, QuantizedPoints):
+    coords = QuantizedPoints(_scaledCoordinates(coords, scale), coordType)
+  if isinstance(coords, QuantizedPoints):
+    coordType = coords.typeCode
+    scale = coords.scale
+    offset = BINARY_FRAME_OFFSET.pack(*coords.offset)
+    flags |= BINARY_FRAME_QUANTIZED
+    coords = coords.codes
+
+  if numpy != None:
+    indices = numpy.asarray(indices).ravel()
+    coords = numpy.asarray(coords).reshape(-1,3)
+    count = len(indices)
+    if indexType == None:
+      indexType = 'H' if count == 0 or indices.max() < 2**16 else 'I'
+    indexData = indices.astype('<'+indexType).tobytes()
+    coordData = coords.astype('<'+coordType).tobytes()
+  else:
+    indices = [int(i) for i in indices]
+    count = len(indices)
+    if indexType == None:
+      indexType = 'H' if count == 0 or max(indices) < 2**16 else 'I'
+    indexData = _packList(indices, indexType)
+    coordData = _packList(coords if isinstance(coords, array.array) else [c for v in coords for c in v], coordType)
+
+  if len(coordData) != count * 3 * BINARY_TYPE_SIZES[coordType]:
+    raise ValueError("Number of indices and coordinates don't match")
+
+  # unquantized frames are written as version 1, so older versions of the loader can still read them
+  version = BINARY_FRAME_VERSION if flags & BINARY_FRAME_QUANTIZED else 1
+  header = BINARY_FRAME_HEADER.pack(BINARY_FRAME_MAGIC, version, coordType.encode(), indexType.encode(), flags, count, scale)
+  return header + offset + indexData + b'\0' * _padding(len(indexData)) + coordData
+
+def _scaledCoordinates(coords, scale):
+  if numpy != None:
+    return numpy.asarray(coords, dtype=numpy.float64).reshape(-1,3) * scale
+  return [(x*scale, y*scale, z*scale) for x, y, z in coords]
+
+def writeBinaryFrame(path, indices, coords, scale=1.0, coordType='f', indexType=None):
+  data = packBinaryFrame(indices, coords, scale=scale, coordType=coordType, indexType=indexType)
+  with open(path, 'wb') as f:
+    f.write(data)
+  return len(data)
+
+# parses a binary frame from a bytes-like object; returns (indices, coords, scale) of the points from start up to
+# end (by default all points). With NumPy the returned arrays are views on data, they don't copy anything
+def parseBinaryFrame(data, offset=0, start=0, end=None):
+  magic, version, coordType, indexType, flags, count, scale = BINARY_FRAME_HEADER.unpack_from(data, offset)
+  if magic != BINARY_FRAME_MAGIC:
+    raise ValueError("Not a binary point cloud frame")
+  if version > BINARY_FRAME_VERSION:
+    raise ValueError("Unsupported binary point cloud frame version: {0}".format(version))
+
+  coordType = coordType.decode()
+  indexType = indexType.decode()
+  indexPos = offset + BINARY_FRAME_HEADER.size
+  if flags & BINARY_FRAME_QUANTIZED:
+    coordOffset = BINARY_FRAME_OFFSET.unpack_from(data, indexPos)
+    indexPos += BINARY_FRAME_OFFSET.size
+  indexSize = count * BINARY_TYPE_SIZES[indexType]
+  coordPos = indexPos + indexSize + _padding(indexSize)
+
+  end = count if end == None else min(end, count)
+  indexPos += start * BINARY_TYPE_SIZES[indexType]
+  coordPos += start * 3 * BINARY_TYPE_SIZES[coordType]
+  count = max(0, end - start)
+
+  if numpy != None:
+    indices = numpy.frombuffer(data, dtype='<'+indexType, count=count, offset=indexPos)
+    coords = numpy.frombuffer(data, dtype='<'+coordType, count=count*3, offset=coordPos).reshape(count,3)
+  else:
+    indices = _unpackList(data, indexType, count, indexPos)
+    values = _unpackList(data, coordType, count*3, coordPos)
+    coords = [tuple(values[i:i+3]) for i in range(0, len(values), 3)]
+
+  if flags & BINARY_FRAME_QUANTIZED:
+    # the offset can't be applied by scaling at load-time; dequantize right away
+    return indices, dequantizeCoordinates(coords, scale, coordOffset, coordType), 1.0
+  return indices, coords, scale
+
+def readBinaryFrame(path):
+  with open(path, 'rb') as f:
+    data = f.read()
+  return parseBinaryFrame(data)
+
+# reads a binary frame file in chunks of (at most) chunkSize points (see readFrameChunks)
+def readBinaryFrameChunks(path, chunkSize):
+  with open(path, 'rb') as f:
+    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+  return _binaryFrameChunks(data, 0, chunkSize)
+
+def _binaryFrameChunks(data, offset, chunkSize):
+  count = BINARY_FRAME_HEADER.unpack_from(data, offset)[5]
+  step = chunkSize or max(count, 1)
+  for start in range(0, max(count, 1), step):
+    yield parseBinaryFrame(data, offset, start, start + step)
+
+# reads a recorder text file; returns (indices, coords, scale)
+def readTextFrame(path):
+  if numpy != None:
+    try:
+      with open(path) as f:
+        # the line-by-line parser stops at the first line that isn't "idx,x,y,z", so an empty first line (or
+        # file) means no points; numpy.loadtxt would warn about the missing data
+        if f.readline().strip() == '':
+          return numpy.zeros(0, dtype=numpy.uint32), numpy.zeros((0,3), dtype=numpy.float32), TEXT_FRAME_SCALE
+        f.seek(0)
+        # read all the idx,x,y,z lines in one go into an (N,4) array
+        data = numpy.loadtxt(f, delimiter=",", dtype=numpy.float32, ndmin=2)
+      if data.size == 0:
+        data = numpy.zeros((0,4), dtype=numpy.float32)
+      elif data.shape[1] != 4:
+        raise ValueError("Expected 4 values per line, got {0}".format(data.shape[1]))
+      return data[:,0].astype(numpy.uint32), data[:,1:4], TEXT_FRAME_SCALE
+    except ValueError:
+      # malformed line(s) somewhere in the file; the line-by-line
+      # parser knows how to deal with those (it stops reading at the first bad line)
+      logger.debug("readTextFrame - bulk parse of %s failed, falling back to line-by-line parsing", path)
+
+  indices = []
+  coords = []
+  f = open(path)
+
+  while f:
+    line = f.readline()
+    try:
+      idx,x,y,z = [float(v) for v in line.split(",")]
+    except ValueError:
+      break
+    indices.append(int(idx))
+    coords.append((x,y,z))
+
+  f.close()
+  return indices, coords, TEXT_FRAME_SCALE
+
+# reads a recorder text file in chunks of (at most) chunkSize lines (see readFrameChunks);
+# like readTextFrame it stops reading at the first malformed line
+def readTextFrameChunks(path, chunkSize):
+  if chunkSize == None:
+    yield readTextFrame(path)
+    return
+
+  with open(path) as f:
+    for lines in _lineChunks(f, chunkSize):
+      indices, coords, complete = _parseTextLines(lines)
+      yield indices, coords, TEXT_FRAME_SCALE
+      if complete != True:
+        return
+
+# parses "idx, x, y, z" lines; returns (indices, coords, False if it stopped at a malformed line)
+def _parseTextLines(lines):
+  if numpy != None:
+    if len(lines) == 0 or lines[0].strip() == '':
+      return numpy.zeros(0, dtype=numpy.uint32), numpy.zeros((0,3), dtype=numpy.float32), False # like readTextFrame
+    try:
+      data = numpy.loadtxt(lines, delimiter=",", dtype=numpy.float32, ndmin=2)
+      if data.size == 0:
+        data = numpy.zeros((0,4), dtype=numpy.float32)
+      elif data.shape[1] != 4:
+        raise ValueError("Expected 4 values per line, got {0}".format(data.shape[1]))
+      return data[:,0].astype(numpy.uint32), data[:,1:4], True
+    except ValueError:
+      pass # parsed line by line below, up to the malformed line
+
+  indices = []
+  coords = []
+  for line in lines:
+    try:
+      idx,x,y,z = [float(v) for v in line.split(",")]
+    except ValueError:
+      return indices, coords, False
+    indices.append(int(idx))
+    coords.append((x,y,z))
+  return indices, coords, True
+
+# splits lines (any iterable) into lists of (at most) chunkSize lines; when chunkSize is None the lines are one chunk
+def _lineChunks(lines, chunkSize):
+  if chunkSize == None:
+    yield lines
+    return
+
+  lines = iter(lines)
+  while True:
+    chunk = list(itertools.islice(lines, chunkSize))
+    if len(chunk) == 0:
+      return
+    yield chunk
+
+# writes a text file in the recorder's format; coordinates are divided
+# by scale, so loading the file gives back the specified coordinates
+def writeTextFrame(path, indices, coords, scale=TEXT_FRAME_SCALE):
+  with open(path, 'w') as f:
+    if numpy != None:
+      data = numpy.empty((len(indices), 4), dtype=numpy.float64)
+      data[:,0] = indices
+      data[:,1:4] = numpy.asarray(coords, dtype=numpy.float64).reshape(-1,3) / scale
+      numpy.savetxt(f, data, fmt=['%d', '%.8g', '%.8g', '%.8g'], delimiter=', ')
+    else:
+      for idx, coord in zip(indices, coords):
+        f.write("{0}, {1!r}, {2!r}, {3!r}\n".format(int(idx), coord[0] / scale, coord[1] / scale, coord[2] / scale))
+
+
+# Readers for other scanners' files; these have no point indices (the points get numbered in file order)
+# and coordinates in the file's own units (scale 1.0). Points with NaN coordinates (like the invalid points
+# of organized PCD clouds) get coordinates 0,0,0, so they're dropped like the recorder's points without depth
+PLY_TYPES = {'char': 'b', 'uchar': 'B', 'short': 'h', 'ushort': 'H', 'int': 'i', 'uint': 'I', 'float': 'f', 'double': 'd',
+  'int8': 'b', 'uint8': 'B', 'int16': 'h', 'uint16': 'H', 'int32': 'i', 'uint32': 'I', 'float32': 'f', 'float64': 'd'}
+PLY_BYTE_ORDERS = {'binary_little_endian': '<', 'binary_big_endian': '>'}
+PCD_TYPES = {('F', 4): 'f', ('F', 8): 'd', ('I', 1): 'b', ('I', 2): 'h', ('I', 4): 'i', ('I', 8): 'q',
+  ('U', 1): 'B', ('U', 2): 'H', ('U', 4): 'I', ('U', 8): 'Q'}
+
+# reads a PLY file's vertices; ascii, binary_little_endian or binary_big_endian
+def readPlyFrame(path):
+  return next(readPlyFrameChunks(path, None))
+
+def readPlyFrameChunks(path, chunkSize):
+  with open(path, 'rb') as f:
+    format, elements = _readPlyHeader(f)
+    offset = f.tell()
+
+    for name, count, properties in elements:
+      if name == 'vertex':
+        break
+      # skip the elements before the vertices
+      if format == 'ascii':
+        for i in range(count):
+          f.readline()
+        offset = f.tell()
+      elif None in [code for propertyName, code in properties]:
+        raise ValueError("PLY elements with list properties before the vertices aren't supported: " + path)
+      else:
+        offset += count * struct.calcsize('<' + ''.join([code for propertyName, code in properties]))
+    else:
+      raise ValueError("PLY file has no vertex element: " + path)
+
+    if None in [code for propertyName, code in properties]:
+      raise ValueError("PLY vertices with list properties aren't supported: " + path)
+
+    if format == 'ascii':
+      names = [propertyName for propertyName, code in properties]
+      lines = itertools.islice(io.TextIOWrapper(f, encoding='ascii'), count)
+      for chunk in _textColumnChunks(lines, chunkSize, [_fieldPosition(names, axis) for axis in 'xyz']):
+        yield chunk
+      return
+
+  if format not in PLY_BYTE_ORDERS:
+    raise ValueError("Unsupported PLY format: {0}".format(format))
+  for chunk in _binaryVertexChunks(path, offset, properties, count, PLY_BYTE_ORDERS[format], chunkSize):
+    yield chunk
+
+# gives the (format, [(element name, count, [(property name, type code or None for lists)])]) of a
+# PLY header, and leaves the file positioned right after the header
+def _readPlyHeader(f):
+  if f.readline().strip() != b"ply":
+    raise ValueError("Not a PLY file")
+
+  format = None
+  elements = []
+  while True:
+    line = f.readline()
+    if line == b"":
+      raise ValueError("PLY header has no end_header")
+
+    words = line.decode('ascii', 'replace').split()
+    if len(words) == 0 or words[0] in ('comment', 'obj_info'):
+      continue
+
+    if words[0] == 'format':
+      format = words[1]
+    elif words[0] == 'element':
+      elements.append((words[1], int(words[2]), []))
+    elif words[0] == 'property' and words[1] == 'list':
+      elements[-1][2].append((words[-1], None))
+    elif words[0] == 'property':
+      if words[1] not in PLY_TYPES:
+        raise ValueError("Unsupported PLY property type: {0}".format(words[1]))
+      elements[-1][2].append((words[2], PLY_TYPES[words[1]]))
+    elif words[0] == 'end_header':
+      return format, elements
+
+# reads a PCD (Point Cloud Library) file's points; ascii or binary (not binary_compressed)
+def readPcdFrame(path):
+  return next(readPcdFrameChunks(path, None))
+
+def readPcdFrameChunks(path, chunkSize):
+  with open(path, 'rb') as f:
+    header = _readPcdHeader(f)
+    offset = f.tell()
+
+    names = header.get('FIELDS', [])
+    sizes = [int(size) for size in header.get('SIZE', [])]
+    types = header.get('TYPE', [])
+    counts = [int(count) for count in header.get('COUNT', ['1'] * len(names))]
+    count = int(header['POINTS'][0]) if 'POINTS' in header else int(header['WIDTH'][0]) * int(header['HEIGHT'][0])
+    data = header['DATA'][0].lower()
+
+    # fields with a count > 1 (like a histogram) take multiple columns
+    fields = []
+    for name, size, type, fieldCount in zip(names, sizes, types, counts):
+      if (type.upper(), size) not in PCD_TYPES:
+        raise ValueError("Unsupported PCD field type: {0}{1}".format(type, size))
+      for i in range(fieldCount):
+        fields.append((name if fieldCount == 1 else "{0}_{1}".format(name, i), PCD_TYPES[(type.upper(), size)]))
+
+    if data == 'ascii':
+      lines = itertools.islice(io.TextIOWrapper(f, encoding='ascii'), count)
+      for chunk in _textColumnChunks(lines, chunkSize, [_fieldPosition([name for name, code in fields], axis) for axis in 'xyz']):
+        yield chunk
+      return
+
+  if data != 'binary':
+    raise ValueError("Unsupported PCD data format: {0} (convert it with pcl_convert_pcd_ascii_binary first)".format(data))
+  for chunk in _binaryVertexChunks(path, offset, fields, count, '<', chunkSize):
+    yield chunk
+
+# gives the PCD header (first word of every line -> the other words of the line),
+# and leaves the file positioned right after the header (the DATA line)
+def _readPcdHeader(f):
+  header = {}
+  while True:
+    line = f.readline()
+    if line == b"":
+      raise ValueError("PCD header has no DATA line")
+
+    words = line.decode('ascii', 'replace').split()
+    if len(words) == 0 or words[0].startswith('#'):
+      continue
+
+    header[words[0].upper()] = words[1:]
+    if words[0].upper() == 'DATA':
+      return header
+
+# reads a text file with one "x y z" (or "x,y,z") line per point; further columns (colors, normals) are ignored
+def readXyzFrame(path):
+  return next(readXyzFrameChunks(path, None))
+
+def readXyzFrameChunks(path, chunkSize):
+  with open(path) as f:
+    for chunk in _textColumnChunks(f, chunkSize, [0, 1, 2], comments='#'):
+      yield chunk
+
+def _fieldPosition(names, name):
+  if name not in names:
+    raise ValueError("Point cloud file has no {0} coordinates".format(name))
+  return names.index(name)
+
+# yields (indices, coords, scale) for chunks of (at most) chunkSize lines (see _readTextColumns)
+def _textColumnChunks(lines, chunkSize, columns, comments=None):
+  first = 0
+  for chunk in _lineChunks(lines, chunkSize):
+    coords = _readTextColumns(chunk, columns, comments)
+    yield _numberedFrame(coords, first)
+    first += len(coords)
+
+# gives the x,y,z of lines of whitespace (or comma) separated values,
+# taking the specified columns for x, y and z
+def _readTextColumns(lines, columns, comments=None):
+  lines = iter(lines)
+  firstLine = next(lines, '')
+  while comments != None and firstLine.lstrip().startswith(comments):
+    firstLine = next(lines, '')
+  if firstLine == '':
+    return numpy.zeros((0,3), dtype=numpy.float32) if numpy != None else []
+  delimiter = ',' if ',' in firstLine else None
+  lines = itertools.chain([firstLine], lines)
+
+  if numpy != None:
+    coords = numpy.loadtxt(lines, dtype=numpy.float32, delimiter=delimiter, usecols=columns, comments=comments, ndmin=2)
+    return coords.reshape(-1,3)
+
+  coords = []
+  for line in lines:
+    if line.strip() == '' or (comments != None and line.lstrip().startswith(comments)):
+      continue
+    values = line.split(delimiter)
+    coords.append(tuple([float(values[column]) for column in columns]))
+  return coords
+
+# yields (indices, coords, scale) for chunks of (at most) chunkSize records (see _readBinaryVertices)
+def _binaryVertexChunks(path, offset, fields, count, byteOrder, chunkSize):
+  step = chunkSize or max(count, 1)
+  for start in range(0, max(count, 1), step):
+    yield _numberedFrame(_readBinaryVertices(path, offset, fields, start, min(step, count - start), byteOrder), start)
+
+# gives the x,y,z coordinates of count fixed-size binary records (with the specified (name, struct type code)
+# fields), starting at record first of the records at offset in the file. With NumPy the file gets memory mapped;
+# when the records hold nothing but float x,y,z, the result is a view on the mapped file (nothing is copied)
+def _readBinaryVertices(path, offset, fields, first, count, byteOrder):
+  names = [name for name, code in fields]
+  positions = [_fieldPosition(names, axis) for axis in 'xyz']
+  recordFormat = byteOrder + ''.join([code for name, code in fields])
+  offset += first * struct.calcsize(recordFormat)
+
+  if numpy != None:
+    # numpy needs unique field names (PCD files can have multiple padding fields named "_")
+    dtype = numpy.dtype([("{0}{1}".format(i, name), byteOrder + code) for i, (name, code) in enumerate(fields)])
+    if count == 0:
+      return numpy.zeros((0,3), dtype=numpy.float32)
+    records = numpy.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+    if names == ['x', 'y', 'z'] and len(set([code for name, code in fields])) == 1:
+      return records.view(byteOrder + fields[0][1]).reshape(count, 3)
+    return numpy.stack([records[dtype.names[position]] for position in positions], axis=1)
+
+  size = struct.calcsize(recordFormat)
+  with open(path, 'rb') as f:
+    f.seek(offset)
+    data = f.read(count * size)
+  if len(data) != count * size:
+    raise ValueError("Point cloud file is truncated: " + path)
+  return [(record[positions[0]], record[positions[1]], record[positions[2]]) for record in struct.iter_unpack(recordFormat, data)]
+
+# gives (indices, coords, scale) for coordinates without indices; the points are numbered in file order (from first)
+def _numberedFrame(coords, first=0):
+  if numpy != None:
+    coords = numpy.asarray(coords).reshape(-1,3)
+    invalid = numpy.isnan(coords).any(axis=1)
+    if invalid.any():
+      coords = numpy.where(invalid[:,numpy.newaxis], 0, coords)
+    return numpy.arange(first, first + len(coords), dtype=numpy.uint32), coords, 1.0
+
+  coords = [(0.0, 0.0, 0.0) if math.isnan(x) or math.isnan(y) or math.isnan(z) else (x, y, z) for x, y, z in coords]
+  return list(range(first, first + len(coords))), coords, 1.0
+
+
+# Frame readers; name -> (read function, file name extensions, magic bytes, chunked read function). Read
+# functions take a path and return (indices, coords, scale); the coordinates get multiplied by scale at load-time.
+# Chunked read functions take a path and a chunk size, and yield (indices, coords, scale) per chunk
+_readers = collections.OrderedDict()
+
+# makes readFrameData read files with one of the specified extensions, or (when no reader has the file's
+# extension) starting with the specified magic bytes, using read. Without readChunks, readFrameChunks
+# reads those files whole (and then splits them up)
+def registerReader(name, read, extensions=(), magic=None, readChunks=None):
+  _readers[name] = (read, tuple([extension.lower() for extension in extensions]), magic, readChunks)
+
+# gives the name of the reader for the specified file; the one for the file's extension, or else the one with
+# matching magic bytes, or else 'text' (the recorder's text files). Only files with an extension no reader
+# has get opened for that; the others are only opened by their reader
+def frameReaderName(path):
+  extension = os.path.splitext(path)[1].lower()
+  for name, (read, extensions, magic, readChunks) in _readers.items():
+    if extension in extensions:
+      return name
+
+  with open(path, 'rb') as f:
+    head = f.read(16)
+
+  for name, (read, extensions, magic, readChunks) in _readers.items():
+    if magic != None and head.startswith(magic):
+      return name
+
+  return 'text'
+
+registerReader('binary', readBinaryFrame, extensions=(BINARY_FRAME_EXTENSION,), magic=BINARY_FRAME_MAGIC, readChunks=readBinaryFrameChunks)
+registerReader('text', readTextFrame, extensions=('.txt',), readChunks=readTextFrameChunks)
+registerReader('ply', readPlyFrame, extensions=('.ply',), magic=b"ply", readChunks=readPlyFrameChunks)
+registerReader('pcd', readPcdFrame, extensions=('.pcd',), readChunks=readPcdFrameChunks)
+registerReader('xyz', readXyzFrame, extensions=('.xyz',), readChunks=readXyzFrameChunks)
+
+# reads any supported frame file (or frame inside a sequence file); returns (indices, coords, scale)
+def readFrameData(path):
+  sequencePath, frame = splitSequenceFramePath(path)
+  if frame != None:
+    return openSequenceFile(sequencePath).frameData(frame)
+  return _readers[frameReaderName(path)][0](path)
+
+# reads any supported frame file (or frame inside a sequence file) in chunks of (at most) chunkSize points; yields
+# (indices, coords, scale) per chunk. Binary files get memory mapped and text files get read a chunk of lines
+# at a time, so (apart from the file system cache) only the chunk being processed is in memory
+def readFrameChunks(path, chunkSize):
+  sequencePath, frame = splitSequenceFramePath(path)
+  if frame != None:
+    return openSequenceFile(sequencePath).frameChunks(frame, chunkSize)
+
+  read, extensions, magic, readChunks = _readers[frameReaderName(path)]
+  if readChunks != None:
+    return readChunks(path, chunkSize)
+  return _slicedChunks(read(path), chunkSize)
+
+def _slicedChunks(frame, chunkSize):
+  indices, coords, scale = frame
+  step = chunkSize or max(len(indices), 1)
+  for start in range(0, max(len(indices), 1), step):
+    yield indices[start:start+step], coords[start:start+step], scale
+
+# gives the indices of the points that changed since the previous frame for (delta) frames inside
+# delta sequence files (see PointCloudSequenceFile.frameChanges), None for all other frames
+def readFrameChanges(path):
+  sequencePath, frame = splitSequenceFramePath(path)
+  if frame == None:
+    return None
+  return openSequenceFile(sequencePath).frameChanges(frame)
+
+
+# Index of the frame files matching a (absolute) file name pattern like "/captures/out33/frame%d.txt".
+# The directory gets listed once, and only again when its modification time changed (which
+# is checked at most once every SEQUENCE_INDEX_CHECK_INTERVAL seconds)
+SEQUENCE_INDEX_CHECK_INTERVAL = 1.0
+# called with the directory when an index finds its directory changed (files were added, removed or
+# replaced), like PointCloudFrameCache.revalidate, to drop frames loaded from files that changed
+directoryChangeListeners = []
+
+class PointCloudSequenceIndex:
+  def __init__(self, pattern):
+    self.pattern = pattern
+    self.directory, self.filePattern = os.path.split(pattern)
+    self.mtime = None
+    self.checked = None # time of the last modification time check
+    self.frames = set() # numbers of the frames that have a file
+    self.count = 0 # see frameCount; figured out when the directory gets listed
+
+  def refresh(self):
+    now = time.time()
+    if self.checked != None and now - self.checked < SEQUENCE_INDEX_CHECK_INTERVAL:
+      return
+    self.checked = now
+
+    try:
+      mtime = os.path.getmtime(self.directory or '.')
+    except OSError:
+      mtime = None
+
+    if mtime != None and mtime == self.mtime:
+      return
+
+    changed = self.mtime != None
+    self.mtime = mtime
+    self.frames = set()
+    self.count = 0
+    if changed:
+      for listener in directoryChangeListeners:
+        listener(self.directory or '.')
+    if mtime == None:
+      return # directory doesn't exist
+
+    regex = patternRegex(self.filePattern)
+    frames = set()
+    for name in os.listdir(self.directory or '.'):
+      match = regex.match(name)
+      # the pattern % frame number check filters out zero-padded numbers a "%d" pattern wouldn't produce
+      if match and self.filePattern % int(match.group(1)) == name:
+        frames.add(int(match.group(1)))
+    self.frames = frames
+    self.count = max(frames) + 1 if len(frames) > 0 else 0
+
+  def hasFrame(self, frame):
+    return frame in self.frames
+
+  # the number of frames, including frames missing somewhere in between (highest frame number + 1)
+  def frameCount(self):
+    return self.count
+# end of class PointCloudSequenceIndex
+
+_sequenceIndexes = {}
+
+# gives the (refreshed) index for the specified file name pattern,
+# or None for patterns that can't be indexed (like "out%d/frame.txt")
+def sequenceIndex(pattern):
+  if '%' in os.path.dirname(pattern):
+    return None
+
+  if pattern not in _sequenceIndexes:
+    _sequenceIndexes[pattern] = PointCloudSequenceIndex(pattern)
+  index = _sequenceIndexes[pattern]
+  index.refresh()
+  return index
+
+
+# gives the path that addresses a single frame inside a sequence file
+def sequenceFramePath(path, frame):
+  return path + SEQUENCE_FRAME_SEPARATOR + str(frame)
+
+# the opposite of sequenceFramePath; returns (sequence path, frame number),
+# or (path, None) if the path doesn't address a frame inside a sequence file
+def splitSequenceFramePath(path):
+  sequencePath, separator, frame = path.rpartition(SEQUENCE_FRAME_SEPARATOR)
+  if separator == '' or not frame.isdigit():
+    return path, None
+  return sequencePath, int(frame)
+
+# memory-mapped sequence file; frames are read straight from the
+# mapped file (with NumPy without copying anything) in any order
+class PointCloudSequenceFile:
+  def __init__(self, path):
+    self.path = path
+
+    with open(path, 'rb') as f:
+      self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+      self.mtime = os.fstat(f.fileno()).st_mtime # the modification time of the mapped file (see PointCloudFrameCache.put)
+
+    magic, version, self.flags, self.frameCount = SEQUENCE_HEADER.unpack_from(self.mmap, 0)
+    if magic != SEQUENCE_MAGIC:
+      raise ValueError("Not a point cloud sequence file: " + path)
+    if version > SEQUENCE_VERSION:
+      raise ValueError("Unsupported point cloud sequence file version: {0}".format(version))
+
+    self.offsets = struct.unpack_from("<{0}Q".format(self.frameCount+1), self.mmap, SEQUENCE_HEADER.size)
+    self.lock = threading.Lock() # frames can be loaded from prefetch threads
+    self.decoded = None # (frame number, indices, coords) of the last reconstructed delta frame
+
+  # returns (indices, coords, scale) of the specified frame
+  def frameData(self, frame):
+    if frame < 0 or frame >= self.frameCount:
+      raise IndexError("Frame {0} out of range; sequence has {1} frames".format(frame, self.frameCount))
+    if not self.isDeltaFrame(frame):
+      return parseBinaryFrame(self.mmap, self.offsets[frame])
+    return self._decodeFrame(frame)
+
+  # like frameData, but gives an iterator of (indices, coords, scale) of chunks of (at most) chunkSize points
+  def frameChunks(self, frame, chunkSize):
+    if frame < 0 or frame >= self.frameCount:
+      raise IndexError("Frame {0} out of range; sequence has {1} frames".format(frame, self.frameCount))
+    if not self.isDeltaFrame(frame):
+      return _binaryFrameChunks(self.mmap, self.offsets[frame], chunkSize)
+    return _slicedChunks(self._decodeFrame(frame), chunkSize)
+
+  def isDeltaFrame(self, frame):
+    return self.flags & SEQUENCE_DELTA != 0 and BINARY_FRAME_HEADER.unpack_from(self.mmap, self.offsets[frame])[4] & BINARY_FRAME_DELTA != 0
+
+  # gives the indices of the points that appeared, moved or disappeared since
+  # the previous frame for delta frames, None for all other frames
+  def frameChanges(self, frame):
+    if frame < 0 or frame >= self.frameCount or not self.isDeltaFrame(frame):
+      return None
+    return parseBinaryFrame(self.mmap, self.offsets[frame])[0]
+
+  # reconstructs a delta frame by applying all deltas since its keyframe to the keyframe. When
+  # the previously reconstructed frame lies in between, it starts from there instead (so
+  # playing a sequence forward only has to apply one delta per frame)
+  def _decodeFrame(self, frame):
+    header = BINARY_FRAME_HEADER.unpack_from(self.mmap, self.offsets[frame])
+    scale = 1.0 if header[4] & BINARY_FRAME_QUANTIZED else header[6] # quantized frames get dequantized when parsed
+
+    with self.lock:
+      start = frame
+      while self.isDeltaFrame(start):
+        start -= 1
+        if start < 0:
+          raise ValueError("Delta frame {0} of {1} has no keyframe".format(frame, self.path))
+
+      if self.decoded != None and start <= self.decoded[0] <= frame:
+        start, indices, coords = self.decoded
+      else:
+        indices, coords, unused = parseBinaryFrame(self.mmap, self.offsets[start])
+
+      for n in range(start+1, frame+1):
+        deltaIndices, deltaCoords, unused = parseBinaryFrame(self.mmap, self.offsets[n])
+        indices, coords = applyFrameDelta(indices, coords, deltaIndices, deltaCoords)
+
+      self.decoded = (frame, indices, coords)
+
+    return indices, coords, scale
+
+  def close(self):
+    try:
+      self.mmap.close()
+    except BufferError:
+      pass # there are still views on the mapped data around; the mapping is closed when those are gone
+# end of class PointCloudSequenceFile
+
+# writes a sequence file one frame at a time, so
+# the whole sequence never has to be in memory at once
+class PointCloudSequenceWriter:
+  flags = 0 # sequence header flags
+
+  def __init__(self, path, frameCount):
+    self.path = path
+    self.frameCount = frameCount
+    self.offsets = []
+    self.quantizationError = 0.0 # the largest quantization error of the (quantized) frames written so far
+    self.file = open(path, 'wb')
+    self.file.write(SEQUENCE_HEADER.pack(SEQUENCE_MAGIC, SEQUENCE_VERSION, self.flags, frameCount))
+    self.file.write(b'\0' * 8 * (frameCount+1)) # reserve space for the offset table
+
+  def addFrame(self, indices, coords, scale=1.0, coordType='f', indexType=None, flags=0):
+    if len(self.offsets) >= self.frameCount:
+      raise IndexError("Sequence already has all of its {0} frames".format(self.frameCount))
+    if coordType in QUANTIZED_TYPES and not isinstance(coords, QuantizedPoints):
+      coords = QuantizedPoints(_scaledCoordinates(coords, scale), coordType)
+    if isinstance(coords, QuantizedPoints):
+      self.quantizationError = max(self.quantizationError, coords.error)
+
+    self.offsets.append(self.file.tell())
+    self.file.write(packBinaryFrame(indices, coords, scale=scale, coordType=coordType, indexType=indexType, flags=flags))
+
+  def close(self):
+    if len(self.offsets) != self.frameCount:
+      self.file.close()
+      raise ValueError("Sequence has {0} frames, expected {1}".format(len(self.offsets), self.frameCount))
+
+    self.offsets.append(self.file.tell())
+    self.file.seek(SEQUENCE_HEADER.size)
+    self.file.write(struct.pack("<{0}Q".format(len(self.offsets)), *self.offsets))
+    self.file.close()
+    return self.offsets[-1]
+# end of class PointCloudSequenceWriter
+
+# writes a delta encoded sequence file; a keyframe every keyframeInterval frames and delta frames in
+# between. Points that moved less than tolerance (along every axis, in the frame's unscaled coordinates)
+# count as unchanged; deltas are taken against the frames as the reader reconstructs them, so errors don't add up
+class PointCloudDeltaSequenceWriter(PointCloudSequenceWriter):
+  flags = SEQUENCE_DELTA
+
+  def __init__(self, path, frameCount, keyframeInterval=30, tolerance=0.0):
+    PointCloudSequenceWriter.__init__(self, path, frameCount)
+    self.keyframeInterval = keyframeInterval
+    self.tolerance = tolerance
+    self.previous = None # (indices, coords, scale) of the previous frame, as the reader reconstructs it
+    self.sinceKeyframe = 0
+    self.keyframes = 0
+
+  def addFrame(self, indices, coords, scale=1.0, coordType='f', indexType=None):
+    indices, coords = _sortedByIndex(indices, coords)
+
+    if self.previous != None and self.sinceKeyframe + 1 < self.keyframeInterval and scale == self.previous[2]:
+      deltaIndices, deltaCoords = frameDelta(self.previous[0], self.previous[1], indices, coords, self.tolerance)
+      # when most points changed a keyframe is hardly any bigger, and much faster to read
+      if len(deltaIndices) * 2 < len(indices):
+        PointCloudSequenceWriter.addFrame(self, deltaIndices, deltaCoords, scale=scale, coordType=coordType, indexType=indexType, flags=BINARY_FRAME_DELTA)
+        self.previous = applyFrameDelta(self.previous[0], self.previous[1], deltaIndices, deltaCoords) + (scale,)
+        self.sinceKeyframe += 1
+        return
+
+    PointCloudSequenceWriter.addFrame(self, indices, coords, scale=scale, coordType=coordType, indexType=indexType)
+    self.previous = (indices, coords, scale)
+    self.sinceKeyframe = 0
+    self.keyframes += 1
+# end of class PointCloudDeltaSequenceWriter
+
+def _sortedByIndex(indices, coords):
+  if numpy != None:
+    indices = numpy.asarray(indices).ravel()
+    coords = numpy.asarray(coords).reshape(-1,3)
+    order = numpy.argsort(indices, kind='stable')
+    return indices[order], coords[order]
+
+  pairs = sorted(zip([int(i) for i in indices], [tuple(c) for c in coords]), key=lambda pair: pair[0])
+  return [idx for idx, coord in pairs], [coord for idx, coord in pairs]
+
+# gives (indices, coords) of the points of a frame (sorted by index) that appeared, moved (more than
+# tolerance) or disappeared (with coordinates 0,0,0) since the previous frame (also sorted by index)
+def frameDelta(previousIndices, previousCoords, indices, coords, tolerance=0.0):
+  if numpy != None:
+    previousIndices = numpy.asarray(previousIndices)
+    previousCoords = numpy.asarray(previousCoords).reshape(-1,3)
+    indices = numpy.asarray(indices)
+    coords = numpy.asarray(coords).reshape(-1,3)
+
+    common, previousPos, pos = numpy.intersect1d(previousIndices, indices, assume_unique=True, return_indices=True)
+    moved = pos[numpy.abs(previousCoords[previousPos] - coords[pos]).max(axis=1) > tolerance]
+    appeared = ~numpy.isin(indices, previousIndices, assume_unique=True)
+    disappeared = previousIndices[~numpy.isin(previousIndices, indices, assume_unique=True)]
+
+    deltaIndices = numpy.concatenate([indices[moved], indices[appeared], disappeared])
+    deltaCoords = numpy.concatenate([coords[moved], coords[appeared], numpy.zeros((len(disappeared),3), dtype=coords.dtype)])
+    order = numpy.argsort(deltaIndices, kind='stable')
+    return deltaIndices[order], deltaCoords[order]
+
+  previous = dict(zip(previousIndices, previousCoords))
+  current = dict(zip(indices, coords))
+  delta = {}
+  for idx, coord in current.items():
+    old = previous.get(idx)
+    if old == None or max([abs(old[i] - coord[i]) for i in range(3)]) > tolerance:
+      delta[idx] = tuple(coord)
+  for idx in previous:
+    if idx not in current:
+      delta[idx] = (0.0, 0.0, 0.0)
+
+  ordered = sorted(delta)
+  return ordered, [delta[idx] for idx in ordered]
+
+# the opposite of frameDelta; gives the (indices, coords) of the frame
+# that results from applying a delta to the previous frame
+def applyFrameDelta(indices, coords, deltaIndices, deltaCoords):
+  if numpy != None:
+    indices = numpy.asarray(indices)
+    coords = numpy.asarray(coords).reshape(-1,3)
+    deltaIndices = numpy.asarray(deltaIndices)
+    deltaCoords = numpy.asarray(deltaCoords).reshape(-1,3)
+
+    keep = ~numpy.isin(indices, deltaIndices, assume_unique=True)
+    present = (deltaCoords != 0).any(axis=1)
+    indices = numpy.concatenate([indices[keep], deltaIndices[present]])
+    coords = numpy.concatenate([coords[keep], deltaCoords[present]])
+    order = numpy.argsort(indices, kind='stable')
+    return indices[order], coords[order]
+
+  points = dict(zip(indices, coords))
+  for idx, coord in zip(deltaIndices, deltaCoords):
+    if coord[0] == 0 and coord[1] == 0 and coord[2] == 0:
+      points.pop(idx, None)
+    else:
+      points[idx] = tuple(coord)
+
+  ordered = sorted(points)
+  return ordered, [points[idx] for idx in ordered]
+
+# streams the points of frame files (PointCloudFrameFile instances, None for missing frames) into a sequence
+# file, one frame at a time; the frames get loaded (with their skip/bounds/modify/voxel settings) and written in
+# order, and are dropped right after, so the whole sequence is never in memory. The sequence gets written to a
+# temporary file first, which replaces dest when it's complete. progress (optional) gets called with
+# the number of every written frame. Returns the size of the sequence file
+def bakeSequence(dest, frameFiles, frameCount, progress=None):
+  tempPath = dest + ".tmp"
+  writer = PointCloudSequenceWriter(tempPath, frameCount)
+
+  try:
+    for frame, frameFile in enumerate(frameFiles):
+      if frameFile == None:
+        writer.addFrame([], [])
+      else:
+        frameFile.load()
+        # points are transformed already
+        writer.addFrame(frameFile.indices, frameFile.points, scale=1.0)
+
+      if progress != None:
+        progress(frame)
+
+    size = writer.close()
+  except:
+    writer.file.close()
+    os.remove(tempPath)
+    raise
+
+  os.replace(tempPath, dest)
+  return size
+
+# sequence files opened through openSequenceFile stay mapped, so switching
+# between frames of a sequence doesn't touch the file system at all
+_openSequenceFiles = {}
+_openSequenceFilesLock = threading.Lock() # sequence files get opened from prefetch threads
+
+def openSequenceFile(path):
+  with _openSequenceFilesLock:
+    if path not in _openSequenceFiles:
+      _openSequenceFiles[path] = PointCloudSequenceFile(path)
+    return _openSequenceFiles[path]
+
+# closes the sequence file at the specified path if it was opened through openSequenceFile, so it gets opened again
+def closeSequenceFile(path):
+  path = os.path.abspath(path)
+  with _openSequenceFilesLock:
+    for openPath in [openPath for openPath in _openSequenceFiles if os.path.abspath(openPath) == path]:
+      _openSequenceFiles.pop(openPath).close()
+
+# closes all sequence files opened through openSequenceFile (call this when a sequence file changed on disk)
+def closeSequenceFiles():
+  with _openSequenceFilesLock:
+    for sequence in _openSequenceFiles.values():
+      sequence.close()
+    _openSequenceFiles.clear()
+
+
+# gives the specified (x,y,z) points as one flat (x,y,z,x,y,z,...) float32 buffer; the format
+# blender's foreach_set takes fastest. NumPy arrays aren't copied if they're float32 and contiguous already
+def flatCoordinates(points):
+  if numpy != None and isinstance(points, numpy.ndarray):
+    return numpy.ascontiguousarray(points, dtype=numpy.float32).reshape(-1)
+  return array.array('f', itertools.chain.from_iterable(points))
+
+# copies the rows at the specified positions of points into buffer (flat coordinates of the same number of points,
+# see flatCoordinates), leaving the other coordinates as they are
+def writeCoordinateRows(buffer, points, positions):
+  if numpy != None and isinstance(buffer, numpy.ndarray):
+    positions = numpy.asarray(positions, dtype=numpy.int64)
+    buffer.reshape(-1,3)[positions] = numpy.asarray(points)[positions]
+    return
+
+  for position in positions:
+    buffer[position*3:position*3+3] = array.array('f', points[position])
+
+# reduces the specified points to one point per occupied (size x size x size) voxel; with mode
+# 'CENTROID' that's the average of all points in the voxel, with mode 'FIRST' the voxel's first point.
+# Resulting points are ordered by the first occurrence of their voxel. Returns (points, first), where
+# first has the positions (in the specified points) of the first point of every resulting voxel
+def voxelDownsample(points, size, mode='CENTROID'):
+  if numpy == None or not isinstance(points, numpy.ndarray):
+    return _voxelDownsamplePython(points, size, mode)
+
+  if len(points) == 0:
+    return points, numpy.zeros(0, dtype=numpy.int64)
+
+  cells = numpy.floor(points / numpy.float32(size)).astype(numpy.int64)
+  cells -= cells.min(axis=0)
+  dims = cells.max(axis=0) + 1
+
+  if float(dims[0]) * float(dims[1]) * float(dims[2]) < 2**62:
+    # turn the voxel coordinates into a single number per voxel, that's much faster to find unique values for
+    cellKeys = (cells[:,0] * dims[1] + cells[:,1]) * dims[2] + cells[:,2]
+    unused, first, inverse = numpy.unique(cellKeys, return_index=True, return_inverse=True)
+  else:
+    unused, first, inverse = numpy.unique(cells, axis=0, return_index=True, return_inverse=True)
+  inverse = inverse.reshape(-1)
+
+  # numpy.unique gives voxels sorted by their key; put them in order of first occurrence
+  order = numpy.argsort(first)
+
+  if mode == 'FIRST':
+    return points[first[order]], first[order]
+
+  counts = numpy.bincount(inverse, minlength=len(first))
+  centroids = numpy.empty((len(first), 3), dtype=numpy.float32)
+  for axis in range(3):
+    centroids[:,axis] = numpy.bincount(inverse, weights=points[:,axis], minlength=len(first)) / counts
+  return centroids[order], first[order]
+
+def _voxelDownsamplePython(points, size, mode):
+  voxels = collections.OrderedDict() # voxel coordinates -> [sum of x, y, z, number of points, first position]
+  for position, point in enumerate(points):
+    cell = (math.floor(point[0] / size), math.floor(point[1] / size), math.floor(point[2] / size))
+    voxel = voxels.get(cell)
+    if voxel == None:
+      voxels[cell] = [point[0], point[1], point[2], 1, position]
+    elif mode != 'FIRST':
+      voxel[0] += point[0]
+      voxel[1] += point[1]
+      voxel[2] += point[2]
+      voxel[3] += 1
+
+  return [(x/n, y/n, z/n) for x, y, z, n, first in voxels.values()], [voxel[4] for voxel in voxels.values()]
+
+# triangulates points by their position in the recorder's depth image grid (given by their indices); neighbouring
+# points in the grid are connected, so no spatial search is needed. Triangles with an edge longer than maxEdge
+# (depth discontinuities, like the edge of something in front of a wall) are dropped, unless maxEdge is 0.
+# Returns the triangles as rows of 3 positions (in points), all with the same winding
+def gridTriangles(indices, points, maxEdge=0.0, rows=RECORDER_GRID_ROWS):
+  if numpy == None or not isinstance(points, numpy.ndarray):
+    return _gridTrianglesPython(indices, points, maxEdge, rows)
+
+  if len(indices) == 0:
+    return numpy.zeros((0,3), dtype=numpy.int32)
+
+  # grid index -> position in points (-1 for grid cells without point)
+  indices = numpy.asarray(indices, dtype=numpy.int64)
+  positions = numpy.full(int(indices.max()) + rows + 2, -1, dtype=numpy.int64)
+  positions[indices] = numpy.arange(len(indices))
+
+  # every grid cell has corners a (top left), b (below a), c (right of a) and d (diagonally across from a);
+  # it's split into triangles abc and bdc, or (when b or c is missing) abd or adc
+  cells = indices[indices % rows != rows - 1]
+  a, b, c, d = positions[cells], positions[cells+1], positions[cells+rows], positions[cells+rows+1]
+  # cells without a are found through their b corner
+  corner = indices[(indices % rows != 0)] - 1
+  corner = corner[positions[corner] == -1]
+  cb, cc, cd = positions[corner+1], positions[corner+rows], positions[corner+rows+1]
+
+  triangles = numpy.concatenate([
+    numpy.stack([a, b, c], axis=1)[(b >= 0) & (c >= 0)],
+    numpy.stack([b, d, c], axis=1)[(b >= 0) & (c >= 0) & (d >= 0)],
+    numpy.stack([a, b, d], axis=1)[(b >= 0) & (c < 0) & (d >= 0)],
+    numpy.stack([a, d, c], axis=1)[(b < 0) & (c >= 0) & (d >= 0)],
+    numpy.stack([cb, cd, cc], axis=1)[(cc >= 0) & (cd >= 0)]])
+
+  if maxEdge > 0 and len(triangles) > 0:
+    longest = numpy.zeros(len(triangles), dtype=points.dtype)
+    for i in range(3):
+      edges = points[triangles[:,i]] - points[triangles[:,(i+1) % 3]]
+      longest = numpy.maximum(longest, numpy.einsum('ij,ij->i', edges, edges))
+    triangles = triangles[longest <= maxEdge * maxEdge]
+
+  return triangles.astype(numpy.int32)
+
+def _gridTrianglesPython(indices, points, maxEdge, rows):
+  positions = dict([(int(idx), position) for position, idx in enumerate(indices)])
+  cells = set([idx for idx in positions if idx % rows != rows - 1] + [idx - 1 for idx in positions if idx % rows != 0])
+  triangles = []
+
+  for cell in sorted(cells):
+    a, b, c, d = [positions.get(idx) for idx in (cell, cell+1, cell+rows, cell+rows+1)]
+    if b != None and c != None:
+      candidates = [(a, b, c), (b, d, c)]
+    else:
+      candidates = [(a, b, d), (a, d, c)]
+
+    for triangle in candidates:
+      if None in triangle:
+        continue
+      if maxEdge > 0 and max([_distance(points[triangle[i]], points[triangle[(i+1) % 3]]) for i in range(3)]) > maxEdge:
+        continue
+      triangles.append(triangle)
+
+  return triangles
+
+def _distance(a, b):
+  return math.sqrt((a[0]-b[0])**2 + (a[1]-b[1])**2 + (a[2]-b[2])**2)
+
+# gives the (vertex indices, loop starts, loop totals) of the specified triangles (see gridTriangles) as flat int32
+# buffers; the format blender's foreach_set takes fastest for the loops and polygons of a mesh
+def triangleLoops(triangles):
+  count = len(triangles)
+  if numpy != None and isinstance(triangles, numpy.ndarray):
+    return (numpy.ascontiguousarray(triangles, dtype=numpy.int32).reshape(-1),
+      numpy.arange(0, count*3, 3, dtype=numpy.int32), numpy.full(count, 3, dtype=numpy.int32))
+  return array.array('i', itertools.chain.from_iterable(triangles)), array.array('i', range(0, count*3, 3)), array.array('i', [3]) * count
+
+# gives the planes (a, b, c, d) of the frustum with the specified 8 corners (4 near ones, then the matching 4 far
+# ones, going around in the same direction); facing inward, so a*x + b*y + c*z + d is a point's distance inside
+def frustumPlanes(corners):
+  center = [sum([corner[axis] for corner in corners]) / len(corners) for axis in range(3)]
+  # near, far and the 4 sides (through a near corner and the far corners of that side)
+  faces = [(0, 1, 2), (4, 5, 6)] + [(i, 4+i, 4+(i+1) % 4) for i in range(4)]
+  planes = []
+
+  for i, j, k in faces:
+    p, q, r = corners[i], corners[j], corners[k]
+    u = (q[0]-p[0], q[1]-p[1], q[2]-p[2])
+    v = (r[0]-p[0], r[1]-p[1], r[2]-p[2])
+    normal = (u[1]*v[2] - u[2]*v[1], u[2]*v[0] - u[0]*v[2], u[0]*v[1] - u[1]*v[0])
+    length = math.sqrt(normal[0]**2 + normal[1]**2 + normal[2]**2)
+    if length == 0:
+      continue # degenerate face (like the near face of a frustum starting at the camera)
+
+    a, b, c = normal[0] / length, normal[1] / length, normal[2] / length
+    d = -(a*p[0] + b*p[1] + c*p[2])
+    if a*center[0] + b*center[1] + c*center[2] + d < 0:
+      a, b, c, d = -a, -b, -c, -d
+    planes.append((a, b, c, d))
+
+  return planes
+
+# leaves out the points outside the specified planes (see frustumPlanes; points up to margin outside a plane are
+# kept) and the points further than maxDistance from center (when given). Returns (points, keep); keep is None
+# when all points are kept, otherwise a mask (a bool per point) to pass to cullTriangles
+def cullPoints(points, planes=None, margin=0.0, center=None, maxDistance=None):
+  if numpy == None or not isinstance(points, numpy.ndarray):
+    return _cullPointsPython(points, planes, margin, center, maxDistance)
+
+  keep = _cullMask(points, planes or [], margin, center if maxDistance != None else None, maxDistance)
+  if keep.all():
+    return points, None
+  return points[keep], keep
+
+# the keep mask of cullPoints; a block of rows at a time, and a (copied) column at a time within the
+# block, so the intermediate distances stay in the CPU cache (several times faster than whole columns)
+def _cullMask(points, planes, margin, center, maxDistance, blockSize=65536):
+  keep = numpy.empty(len(points), dtype=bool)
+  limits = [(numpy.float32(a), numpy.float32(b), numpy.float32(c), numpy.float32(-d - margin)) for a, b, c, d in planes]
+  distance = numpy.empty(blockSize, dtype=numpy.float32)
+  term = numpy.empty(blockSize, dtype=numpy.float32)
+
+  for start in range(0, len(points), blockSize):
+    block = points[start:start+blockSize]
+    count = len(block)
+    columns = [numpy.ascontiguousarray(block[:,axis], dtype=numpy.float32) for axis in range(3)]
+    blockKeep = keep[start:start+count]
+    blockKeep[:] = True
+    d = distance[:count]
+    t = term[:count]
+
+    for a, b, c, limit in limits:
+      numpy.multiply(columns[0], a, out=d)
+      numpy.multiply(columns[1], b, out=t)
+      d += t
+      numpy.multiply(columns[2], c, out=t)
+      d += t
+      blockKeep &= d >= limit
+
+    if center != None:
+      d[:] = 0
+      for axis in range(3):
+        numpy.subtract(columns[axis], numpy.float32(center[axis]), out=t)
+        t *= t
+        d += t
+      blockKeep &= d <= numpy.float32(maxDistance * maxDistance)
+
+  return keep
+
+def _cullPointsPython(points, planes, margin, center, maxDistance):
+  keep = []
+  for x, y, z in points:
+    inside = all([a*x + b*y + c*z + d >= -margin for a, b, c, d in planes or []])
+    if inside and center != None and maxDistance != None:
+      inside = (x-center[0])**2 + (y-center[1])**2 + (z-center[2])**2 <= maxDistance * maxDistance
+    keep.append(inside)
+
+  if all(keep):
+    return points, None
+  return [point for point, inside in zip(points, keep) if inside], keep
+
+# gives the triangles (see gridTriangles) of which all corners were kept by cullPoints (with the keep it gave),
+# with their corners renumbered to the positions in the culled points
+def cullTriangles(triangles, keep):
+  if keep is None or triangles is None:
+    return triangles
+
+  if numpy != None and isinstance(triangles, numpy.ndarray):
+    keep = numpy.asarray(keep, dtype=bool)
+    positions = numpy.cumsum(keep) - 1
+    return positions[triangles[keep[triangles].all(axis=1)]].astype(numpy.int32)
+
+  positions = list(itertools.accumulate([1 if inside else 0 for inside in keep]))
+  return [tuple([positions[corner] - 1 for corner in triangle]) for triangle in triangles if all([keep[corner] for corner in triangle])]
+
+def _vectorKey(vector):
+  if vector is None:
+    return None
+  return tuple(float(v) for v in vector)
+
+# A class that represents one file (frame) of piont cloud data,
+# this class takes care of parsing the file's data into python data (arrays)
+class PointCloudFrameFile:
+  def __init__(self, path, skip=0, logger=None, minBounds=None, maxBounds=None, offset=None, multiply=None, voxelSize=None, voxelMode='CENTROID', gridMesh=False, gridMaxEdge=0.0, chunkSize=None, maxPoints=None, quantize=None):
+    self.path = path
+    self.logger = logger
+    self.minBounds = minBounds
+    self.maxBounds = maxBounds
+    self.offset = offset
+    self.multiply = multiply
+    self.voxelSize = voxelSize # when specified, the points are downsampled to one point per voxel (see voxelDownsample)
+    self.voxelMode = voxelMode
+    self.gridMesh = gridMesh # when True, the points get triangulated by their recorder grid index (see gridTriangles)
+    self.gridMaxEdge = gridMaxEdge
+    # when specified, the file is streamed in chunks of this number of points, only keeping the accepted points
+    # (all_points and rejected_points stay empty); for frames too big to load whole (see readFrameChunks)
+    self.chunkSize = chunkSize
+    self.maxPoints = maxPoints # when streaming; keep a uniform random sample of (at most) this number of accepted points
+    # when specified ('h' for int16 or 'i' for int32), the loaded points are kept as QuantizedPoints (2-4x smaller
+    # in the frame cache); get_points and get_all_points give them dequantized
+    self.quantize = quantize
+
+    self.skip = skip # after every read point, skip this number of points
+    self.loaded = False
+    # all points are kept in a single array (all_points), ordered: accepted points, rejected points, non-active points.
+    # points and rejected_points are slices of it (views with NumPy); nothing is stored twice
+    self.points = [] # for the points defined in the file
+    self.indices = [] # the (recorder grid) indices of the points in self.points
+    self.all_points = [] # for all points; also the non-active ones
+    self.rejected_points = [] # for all points which are reject because of ouf enforced bounds
+    self.changedIndices = None # for frames of delta sequences; indices of the points that changed since the previous frame
+    self.triangles = None # with gridMesh; triangles (rows of 3 positions in self.points)
+    self.pointsRead = 0 # the number of points read (after skipping)
+    self.quantizationError = 0.0 # with quantize; the largest difference of a dequantized coordinate from the original
+
+    if self.logger == None:
+      self.logger = logging.getLogger(__name__) # default to this module's logger
+
+    self.timings = [] # (stage name, start time, duration) of the stages of loading this file, see PointCloudProfiler
+
+  def get_all_points(self):
+    self.load()
+    return _dequantized(self.all_points)
+
+  def get_points(self):
+    self.load()
+    return _dequantized(self.points)
+
+  def get_rejected_points(self):
+    self.load()
+    return _dequantized(self.rejected_points)
+
+  def get_indices(self):
+    self.load()
+    return self.indices
+
+  # loads (and processes) the file's data if that didn't happen yet; returns self
+  def load(self):
+    if self.loaded != True:
+      self._loadFrameData()
+      self.loaded = True
+    return self
+
+  # the (approximate) amount of memory taken by the loaded points
+  def nbytes(self):
+    # points and rejected_points don't count when they're views of all_points
+    points = [self.all_points] + [p for p in (self.points, self.rejected_points) if not _sharesBuffer(p, self.all_points)]
+    if numpy != None and isinstance(self.indices, numpy.ndarray):
+      triangles = self.triangles.nbytes if self.triangles is not None else 0
+      return sum([_pointsBytes(p) for p in points]) + self.indices.nbytes + triangles
+    # a tuple of 3 python floats takes about 136 bytes, an int about 28, a tuple of 3 ints about 64
+    triangles = len(self.triangles) if self.triangles != None else 0
+    return sum([_pointsBytes(p) for p in points]) + 28 * len(self.indices) + 64 * triangles
+
+  # identifies the result of loading this file; frame
+  # files with equal keys produce the exact same points
+  def cacheKey(self):
+    return (self.path, self.skip, _vectorKey(self.minBounds), _vectorKey(self.maxBounds), _vectorKey(self.offset), _vectorKey(self.multiply), self.voxelSize, self.voxelMode,
+      self.gridMesh, self.gridMaxEdge, self.chunkSize, self.maxPoints, self.quantize)
+
+  # gives the positions (in points) of the points that changed since the specified previous frame file
+  # when that's the previous frame of the same delta sequence, loaded with the same settings and with exactly
+  # the same active points; only those points have to be updated then. Returns None otherwise
+  def changedPositions(self, previous):
+    sequencePath, frame = splitSequenceFramePath(self.path)
+    if previous == None or frame == None or previous.path != sequenceFramePath(sequencePath, frame-1):
+      return None
+    if previous.cacheKey()[1:] != self.cacheKey()[1:] or (self.voxelSize != None and self.voxelSize > 0):
+      return None # different settings, or voxel points (which represent multiple points)
+
+    self.load()
+    previous.load()
+    if self.changedIndices is None:
+      return None
+
+    if numpy != None and isinstance(self.indices, numpy.ndarray):
+      if not numpy.array_equal(previous.indices, self.indices):
+        return None
+      # indices of delta sequence frames are sorted
+      positions = numpy.searchsorted(self.indices, self.changedIndices)
+      found = positions < len(self.indices)
+      found[found] = self.indices[positions[found]] == self.changedIndices[found]
+      return positions[found]
+
+    if list(previous.indices) != list(self.indices):
+      return None
+    positions = dict([(idx, position) for position, idx in enumerate(self.indices)])
+    return [positions[idx] for idx in self.changedIndices if idx in positions]
+
+  def _loadFrameData(self):
+    self.logger.debug("Loading point cloud frame file: %s", self.path)
+    start = time.perf_counter()
+    self.changedIndices = readFrameChanges(self.path)
+
+    if self.chunkSize != None:
+      self._loadFrameChunks()
+      parsed = time.perf_counter()
+      self.timings = [('stream', start, parsed - start)]
+    else:
+      indices, coords, scale = readFrameData(self.path)
+      parsed = time.perf_counter()
+      self.timings = [('parse', start, parsed - start)]
+      self.points, self.indices, self.all_points, self.rejected_points = self._processFrameData(indices, coords, scale)
+      self.pointsRead = len(self.all_points)
+
+    if self.voxelSize != None and self.voxelSize > 0:
+      self.points, first = voxelDownsample(self.points, self.voxelSize, mode=self.voxelMode)
+      self.indices = self.indices[first] if numpy != None else [self.indices[i] for i in first]
+
+    transformed = time.perf_counter()
+    self.timings.append(('transform', parsed, transformed - parsed))
+
+    if self.gridMesh == True:
+      self.triangles = gridTriangles(self.indices, self.points, self.gridMaxEdge)
+      self.timings.append(('mesh', transformed, time.perf_counter() - transformed))
+
+    if self.quantize != None:
+      quantizing = time.perf_counter()
+      self._quantizePoints()
+      self.timings.append(('quantize', quantizing, time.perf_counter() - quantizing))
+    self.logger.debug('PointCloudFrameFile#_loadFrameData - points read (total/active): %d/%d', self.pointsRead, len(self.points))
+
+  # quantizes all_points (once), points and rejected_points stay views of it when they were
+  def _quantizePoints(self):
+    acceptedCount = len(self.points)
+    rejected = (acceptedCount, acceptedCount + len(self.rejected_points))
+    shared = [_sharesBuffer(self.points, self.all_points), _sharesBuffer(self.rejected_points, self.all_points)]
+
+    self.all_points = QuantizedPoints(self.all_points, self.quantize)
+    self.points = self.all_points.view(0, acceptedCount) if shared[0] else QuantizedPoints(self.points, self.quantize)
+    self.rejected_points = self.all_points.view(*rejected) if shared[1] else QuantizedPoints(self.rejected_points, self.quantize)
+    self.quantizationError = max(self.points.error, self.all_points.error, self.rejected_points.error)
+    self.logger.debug('PointCloudFrameFile#_quantizePoints - max quantization error: %g (scale %g)', self.quantizationError, self.points.scale)
+
+  # reads the file a chunk at a time and processes every chunk right away, so only a chunk of the file
+  # and the accepted points (or with maxPoints, a sample of them) are in memory at any time
+  def _loadFrameChunks(self):
+    reservoir = PointReservoir(self.maxPoints) if self.maxPoints != None else None
+    points = []
+    indices = []
+    position = 0 # the number of points before the chunk; to keep skipping every skip+1'th point across chunks
+
+    for chunkIndices, chunkCoords, scale in readFrameChunks(self.path, self.chunkSize):
+      chunkPoints, chunkIndices, all_points, rejected_points = self._processFrameData(chunkIndices, chunkCoords, scale, (-position) % (self.skip+1))
+      position += len(chunkCoords)
+      self.pointsRead += len(all_points)
+      if reservoir != None:
+        reservoir.add(chunkIndices, chunkPoints)
+      else:
+        points.append(chunkPoints)
+        indices.append(chunkIndices)
+
+    if reservoir != None:
+      self.indices, self.points = reservoir.sample()
+    elif numpy != None:
+      self.points = numpy.concatenate(points) if len(points) > 0 else numpy.zeros((0,3), dtype=numpy.float32)
+      self.indices = numpy.concatenate(indices) if len(indices) > 0 else numpy.zeros(0, dtype=numpy.uint32)
+    else:
+      self.points = [v for chunk in points for v in chunk]
+      self.indices = [idx for chunk in indices for idx in chunk]
+
+    if numpy != None:
+      self.all_points = numpy.zeros((0,3), dtype=numpy.float32)
+      self.rejected_points = numpy.zeros((0,3), dtype=numpy.float32)
+
+  # gives (points, indices, all_points, rejected_points) for the points in coords, starting at position start
+  def _processFrameData(self, indices, coords, scale, start=0):
+    if numpy == None:
+      return self._processFrameDataPython(indices, coords, scale, start)
+    return self._processFrameDataNumpy(indices, coords, scale, start)
+
+  # vectorized version of _processFrameDataPython; performs the transformations
+  # and filtering as array operations. Results are (N,3) float32 arrays instead of lists of tuples
+  def _processFrameDataNumpy(self, indices, coords, scale, start=0):
+    coords = numpy.asarray(coords).reshape(-1,3)
+    indices = numpy.asarray(indices, dtype=numpy.uint32)
+
+    # skip some points (if skip > 0)
+    if self.skip > 0 or start > 0:
+      coords = coords[start::self.skip+1]
+      indices = indices[start::self.skip+1]
+
+    if coords.dtype != numpy.float32:
+      coords = coords.astype(numpy.float32)
+    scale = numpy.float32(scale)
+    multiply = numpy.array(tuple(self.multiply), dtype=numpy.float32) if self.multiply != None else None
+    offset = numpy.array(tuple(self.offset), dtype=numpy.float32) if self.offset != None else None
+
+    # find the relevant (non-zero) and rejected points a column at a time, so there's no transformed copy
+    # of all coordinates yet (and column by column is a lot faster than along axis 1 of an (N,3) array)
+    active = numpy.ones(len(coords), dtype=bool)
+    reject = numpy.zeros(len(coords), dtype=bool)
+
+    for axis in range(3):
+      column = coords[:,axis] * scale
+      active &= column != 0
+      if multiply is not None:
+        column *= multiply[axis]
+      if offset is not None:
+        column += offset[axis]
+      if self.minBounds != None:
+        reject |= column < numpy.float32(self.minBounds[axis])
+      if self.maxBounds != None:
+        reject |= column > numpy.float32(self.maxBounds[axis])
+
+    accept = active & ~reject
+    acceptedCount = int(numpy.count_nonzero(accept))
+    rejectedCount = int(numpy.count_nonzero(reject))
+
+    # the one copy of the coordinates (coords can be a view on the file's data), partitioned (keeping their order):
+    # accepted points first, then the rejected ones, then the non-active ones, so points and rejected_points
+    # are slices (views) of all_points. The transformations happen in place
+    v = numpy.empty((len(coords),3), dtype=numpy.float32)
+    if acceptedCount == len(coords):
+      v[:] = coords
+    else:
+      _partitionRows(coords, [accept, reject, ~(accept | reject)], v)
+      indices = indices[accept]
+
+    v *= scale
+    if multiply is not None:
+      v *= multiply
+    if offset is not None:
+      v += offset
+
+    return v[:acceptedCount], indices, v, v[acceptedCount:acceptedCount+rejectedCount]
+
+  def _processFrameDataPython(self, indices, coords, scale, start=0):
+    points = []
+    acceptedIndices = []
+    rejected_points = []
+    inactive_points = []
+
+    # skip some points (if skip > 0)
+    for idx, coord in zip(indices[start::self.skip+1], coords[start::self.skip+1]):
+      x,y,z = [scale*c for c in coord]
+      reject = False
+
+      v = list((x,y,z)) #Vector(x,y,z) #c4d.Vector(x,y,z) # turn coordinates into c4d Vector object
+
+      if self.multiply != None:
+        for i in range(3):
+          v[i] = v[i] * self.multiply[i]
+
+      if self.offset != None:
+        for i in range(3):
+          v[i] += self.offset[i]
+
+      if self.minBounds != None:
+        for i in range(3):
+          if v[i] < self.minBounds[i]:
+            reject = True
+            break
+
+      if reject != True and self.maxBounds != None:
+        for i in range(3):
+          if v[i] > self.maxBounds[i]:
+            reject = True
+            break
+
+      v = (v[0], v[1], v[2]) # convert from list to immutable tuple
+
+      # create selection of relevant (non-zero) points
+      if reject == True:
+        rejected_points.append(v)
+      else:
+        if x*y*z != 0:
+          points.append(v)
+          acceptedIndices.append(int(idx))
+        else:
+          inactive_points.append(v)
+
+    # all_points in the same order as with NumPy (accepted, rejected, non-active points)
+    return points, acceptedIndices, points + rejected_points + inactive_points, rejected_points
+# end of class PointCloudFrameFile
+
+# copies the rows of coords selected by each of the masks into out, one selection after the other (keeping
+# their order); a block of rows at a time, so there's no temporary copy of all selected rows
+def _partitionRows(coords, masks, out, blockSize=65536):
+  positions = [0]
+  for mask in masks[:-1]:
+    positions.append(positions[-1] + int(numpy.count_nonzero(mask)))
+
+  for start in range(0, len(coords), blockSize):
+    block = coords[start:start+blockSize]
+    for i, mask in enumerate(masks):
+      selected = block[mask[start:start+blockSize]]
+      out[positions[i]:positions[i]+len(selected)] = selected
+      positions[i] += len(selected)
+
+def _dequantized(points):
+  return points.dequantize() if isinstance(points, QuantizedPoints) else points
+
+# True when points is a view of (part of) the NumPy array (or quantized points) buffer
+def _sharesBuffer(points, buffer):
+  if isinstance(points, QuantizedPoints) and isinstance(buffer, QuantizedPoints):
+    points, buffer = points.codes, buffer.codes
+  if numpy == None or not isinstance(points, numpy.ndarray) or not isinstance(buffer, numpy.ndarray):
+    return False
+  return len(points) > 0 and numpy.may_share_memory(points, buffer)
+
+# the (approximate) amount of memory taken by points (see PointCloudFrameFile.nbytes)
+def _pointsBytes(points):
+  if isinstance(points, QuantizedPoints):
+    return points.nbytes()
+  if numpy != None and isinstance(points, numpy.ndarray):
+    return points.nbytes
+  return 136 * len(points)
+
+
+# Keeps a uniform random sample of (at most) size of all points added to it, without keeping the
+# other points around (reservoir sampling, Algorithm R). The random generator is seeded, so the
+# same points give the same sample every time (frames don't flicker when they're loaded again)
+class PointReservoir:
+  def __init__(self, size, seed=0):
+    self.size = size
+    self.seen = 0 # the number of points added so far
+    if numpy != None:
+      self.random = numpy.random.RandomState(seed)
+      self.indices = None
+      self.points = None
+      self.order = numpy.zeros(size, dtype=numpy.int64) # the positions (among all added points) of the kept points
+    else:
+      self.random = random.Random(seed)
+      self.kept = [] # (position among all added points, index, point)
+
+  # adds points (and their indices); every added point has the same size/seen chance of being kept
+  def add(self, indices, points):
+    if numpy == None:
+      self._addPython(indices, points)
+      return
+
+    indices = numpy.asarray(indices)
+    points = numpy.asarray(points).reshape(-1,3)
+    if self.indices is None:
+      self.indices = numpy.zeros(self.size, dtype=indices.dtype)
+      self.points = numpy.zeros((self.size,3), dtype=points.dtype)
+
+    # fill the reservoir first
+    fill = max(0, min(len(points), self.size - self.seen))
+    self.indices[self.seen:self.seen+fill] = indices[:fill]
+    self.points[self.seen:self.seen+fill] = points[:fill]
+    self.order[self.seen:self.seen+fill] = numpy.arange(self.seen, self.seen+fill)
+
+    # then point n replaces a random kept point with a chance of size/(n+1)
+    order = numpy.arange(self.seen+fill, self.seen+len(points), dtype=numpy.int64)
+    slots = (self.random.random_sample(len(order)) * (order+1)).astype(numpy.int64)
+    replace = slots < self.size
+    if replace.any():
+      # when points replace the same slot, the last one wins (like when replacing one at a time)
+      slots = slots[replace][::-1]
+      positions = fill + numpy.flatnonzero(replace)[::-1]
+      slots, last = numpy.unique(slots, return_index=True)
+      positions = positions[last]
+      self.indices[slots] = indices[positions]
+      self.points[slots] = points[positions]
+      self.order[slots] = order[positions - fill]
+
+    self.seen += len(points)
+
+  def _addPython(self, indices, points):
+    for idx, v in zip(indices, points):
+      if self.seen < self.size:
+        self.kept.append((self.seen, idx, v))
+      else:
+        slot = self.random.randint(0, self.seen)
+        if slot < self.size:
+          self.kept[slot] = (self.seen, idx, v)
+      self.seen += 1
+
+  # gives (indices, points) of the kept points, in the order they were added
+  def sample(self):
+    if numpy == None:
+      kept = sorted(self.kept)
+      return [idx for position, idx, v in kept], [v for position, idx, v in kept]
+
+    count = min(self.seen, self.size)
+    if self.indices is None:
+      return numpy.zeros(0, dtype=numpy.uint32), numpy.zeros((0,3), dtype=numpy.float32)
+    order = numpy.argsort(self.order[:count], kind='stable')
+    return self.indices[:count][order], self.points[:count][order]
+# end of class PointReservoir
+
+
+# Keeps loaded frame files around (least recently used ones are dropped first when the
+# cached frames take more than budget bytes), so frames don't have to be loaded again
+# cached frames are checked for changes of their file at most once every FRAME_CACHE_CHECK_INTERVAL seconds
+# per file; for files written again in place, which doesn't change their directory (see directoryChangeListeners)
+FRAME_CACHE_CHECK_INTERVAL = 2.0
+
+class PointCloudFrameCache:
+  def __init__(self, budget=1024*1024*1024):
+    self.budget = budget
+    self.entries = collections.OrderedDict() # cache keys -> loaded frame files, least recently used first
+    self.mtimes = {} # cache keys -> (path, modification time) of the file when it was cached (see revalidate)
+    self.checked = {} # paths -> time of the last modification time check of the file
+    self.bytes = 0
+    self.hits = 0
+    self.misses = 0
+    # preloaded frame files; kept (outside the budget) until unpinAll and found by their
+    # cacheKey alone, so getting them doesn't look at the file system at all
+    self.pinned = {} # frame file cache keys -> loaded frame files
+    self.pinnedBytes = 0
+
+  # gives the cache key for the specified frame file; its cacheKey with the absolute path of the file.
+  # Doesn't look at the file; changed files are found by get (now and then) and revalidate
+  def key(self, frameFile):
+    return (os.path.abspath(splitSequenceFramePath(frameFile.path)[0]),) + frameFile.cacheKey()
+
+  def contains(self, key):
+    return key in self.entries
+
+  # gives the cached frame file, or None (also when its file changed since it was cached)
+  def get(self, key):
+    frameFile = self.entries.get(key)
+    if frameFile == None:
+      self.misses += 1
+      return None
+
+    path, mtime = self.mtimes[key]
+    now = time.time()
+    if now - self.checked.get(path, 0) >= FRAME_CACHE_CHECK_INTERVAL:
+      self.checked[path] = now
+      if _modificationTime(path) != mtime:
+        for changed in [changed for changed, (changedPath, changedTime) in self.mtimes.items() if changedPath == path]:
+          self._remove(changed)
+        closeSequenceFile(path) # a sequence file gets mapped again
+        self.misses += 1
+        return None
+
+    self.hits += 1
+    self.entries.move_to_end(key)
+    return frameFile
+
+  # adds a loaded frame file to the cache
+  def put(self, key, frameFile):
+    if key == None or key in self.entries:
+      return
+
+    size = frameFile.nbytes()
+    if size > self.budget:
+      return
+
+    mtime = self._frameFileTime(frameFile)
+    if mtime == None:
+      return # the file is gone already
+
+    self.entries[key] = frameFile
+    self.mtimes[key] = (key[0], mtime)
+    self.checked[key[0]] = time.time()
+    self.bytes += size
+    self._evict()
+
+  # drops the cached frames of files that changed (or are gone) since they were cached;
+  # only of the files in the specified directory, if any (see directoryChangeListeners)
+  def revalidate(self, directory=None):
+    if directory != None:
+      directory = os.path.abspath(directory)
+
+    for key, (path, mtime) in list(self.mtimes.items()):
+      if directory != None and os.path.dirname(path) != directory:
+        continue
+      if _modificationTime(path) != mtime:
+        self._remove(key)
+
+  # keeps a loaded frame file in memory until unpinAll
+  def pin(self, frameFile):
+    key = frameFile.cacheKey()
+    if key in self.pinned:
+      return
+    self.pinned[key] = frameFile
+    self.pinnedBytes += frameFile.nbytes()
+
+  # gives the pinned frame file with the specified cache key (PointCloudFrameFile.cacheKey), or None
+  def getPinned(self, key):
+    frameFile = self.pinned.get(key)
+    if frameFile != None:
+      self.hits += 1
+    return frameFile
+
+  def isPinned(self, key):
+    return key in self.pinned
+
+  def unpinAll(self):
+    self.pinned.clear()
+    self.pinnedBytes = 0
+
+  def setBudget(self, budget):
+    self.budget = budget
+    self._evict()
+
+  def clear(self):
+    self.entries.clear()
+    self.mtimes.clear()
+    self.checked.clear()
+    self.bytes = 0
+
+  # the modification time of the frame file's file; for frames of sequence files
+  # the one of the mapped sequence file (stat'ed once, when it was opened)
+  def _frameFileTime(self, frameFile):
+    sequencePath, frame = splitSequenceFramePath(frameFile.path)
+    if frame == None:
+      return _modificationTime(sequencePath)
+    try:
+      return openSequenceFile(sequencePath).mtime
+    except (OSError, ValueError):
+      return None
+
+  def _remove(self, key):
+    self.bytes -= self.entries.pop(key).nbytes()
+    del self.mtimes[key]
+
+  def _evict(self):
+    while self.bytes > self.budget and len(self.entries) > 0:
+      self._remove(next(iter(self.entries)))
+# end of class PointCloudFrameCache
+
+# the modification time of the file, or None if it's gone
+def _modificationTime(path):
+  try:
+    return os.path.getmtime(path)
+  except OSError:
+    return None
+
+
+# Times the stages of point cloud frame updates per object (or any other name), keeps rolling
+# statistics of the last <window> durations of every stage and records the timings
+# as Chrome trace events (to be viewed in chrome://tracing or https://ui.perfetto.dev)
+class PointCloudProfiler:
+  def __init__(self, window=100, maxEvents=100000):
+    self.window = window
+    self.samples = collections.OrderedDict() # (name, stage) -> deque of the latest durations (seconds)
+    self.events = collections.deque(maxlen=maxEvents) # (name, stage, start, duration, thread id)
+    self.lock = threading.Lock() # stages can be recorded from worker threads
+
+  # gives a context manager that times a stage, like:
+  #   with profiler.stage(obj.name, 'upload'):
+  #     ...
+  def stage(self, name, stage):
+    return _ProfilerStage(self, name, stage)
+
+  # records a stage's timing (start and duration in time.perf_counter seconds)
+  def record(self, name, stage, start, duration):
+    with self.lock:
+      key = (name, stage)
+      if key not in self.samples:
+        self.samples[key] = collections.deque(maxlen=self.window)
+      self.samples[key].append(duration)
+      self.events.append((name, stage, start, duration, threading.get_ident()))
+
+  # gives (stage, count, mean, p95, max) tuples (durations in seconds) for all stages recorded for name
+  def stats(self, name):
+    result = []
+    with self.lock:
+      for (sampleName, stage), samples in self.samples.items():
+        if sampleName != name or len(samples) == 0:
+          continue
+        durations = sorted(samples)
+        p95 = durations[min(len(durations)-1, int(math.ceil(0.95 * len(durations))) - 1)]
+        result.append((stage, len(durations), sum(durations) / len(durations), p95, durations[-1]))
+    return result
+
+  # writes all recorded events as a Chrome trace-format JSON file, with one track per name
+  def exportChromeTrace(self, path):
+    with self.lock:
+      events = list(self.events)
+
+    tracks = {}
+    trace = []
+    for name, stage, start, duration, thread in events:
+      if name not in tracks:
+        tracks[name] = len(tracks) + 1
+        trace.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tracks[name], 'args': {'name': name}})
+      trace.append({'name': stage, 'cat': 'pointcloud', 'ph': 'X', 'pid': 1, 'tid': tracks[name],
+        'ts': start * 1000000.0, 'dur': duration * 1000000.0, 'args': {'thread': thread}})
+
+    with open(path, 'w') as f:
+      json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+    return len(events)
+
+  def clear(self):
+    with self.lock:
+      self.samples.clear()
+      self.events.clear()
+# end of class PointCloudProfiler
+
+class _ProfilerStage:
+  def __init__(self, profiler, name, stage):
+    self.profiler = profiler
+    self.name = name
+    self.stage = stage
+
+  def __enter__(self):
+    self.start = time.perf_counter()
+    return self
+
+  def __exit__(self, excType, excValue, traceback):
+    self.profiler.record(self.name, self.stage, self.start, time.perf_counter() - self.start)
+    return False
+
+# does nothing; used instead of a profiler stage when profiling is disabled
+class _NoStage:
+  def __enter__(self):
+    return self
+
+  def __exit__(self, excType, excValue, traceback):
+    return False
+
+NO_STAGE = _NoStage()
+
+
+# Picks the number of points to skip so frame updates stay within a time budget (seconds), from the mean
+# duration of the last <window> updates; assuming the update time is proportional to the number of points,
+# it aims for <target> of the budget. It skips more as soon as updates go over budget, and fewer only when
+# that's predicted to stay under the target (hysteresis, so the density doesn't flicker between two levels).
+# After every change it waits for <window> updates at the new level
+class PointCloudAdaptiveDecimation:
+  def __init__(self, budget, window=5, target=0.7, minSkip=0, maxSkip=100):
+    self.budget = budget
+    self.window = window
+    self.target = target
+    self.minSkip = minSkip
+    self.maxSkip = maxSkip
+    self.skip = minSkip
+    self.durations = collections.deque(maxlen=window)
+    self.lastDuration = None
+
+  # the number of points to skip after every used point (within minSkip and maxSkip)
+  def skipPoints(self):
+    return min(max(self.skip, self.minSkip), max(self.maxSkip, self.minSkip))
+
+  # records the duration (seconds) of a frame update done with the current skipPoints,
+  # returns True when that changed the level
+  def record(self, duration):
+    self.lastDuration = duration
+    self.durations.append(duration)
+    if len(self.durations) < self.window or self.budget <= 0:
+      return False
+
+    mean = sum(self.durations) / len(self.durations)
+    step = self.skipPoints() + 1 # every step'th point is used
+    # the smallest step that's predicted to take at most target of the budget
+    wanted = int(math.ceil(step * mean / (self.budget * self.target)))
+
+    if mean <= self.budget and wanted >= step:
+      return False # within budget, and using more points would probably go over the target
+
+    previous = self.skipPoints()
+    self.skip = wanted - 1
+    if self.skipPoints() == previous:
+      return False
+
+    self.skip = self.skipPoints()
+    self.durations.clear()
+    return True
+
+  def reset(self):
+    self.skip = self.minSkip
+    self.durations.clear()
+    self.lastDuration = None
+# end of class PointCloudAdaptiveDecimation
+
+
+# Loads point cloud frame files in the background, in a pool of worker threads,
+# so they're ready by the time they're needed. Worker threads (instead of processes)
+# because this runs inside blender, and the loaded arrays don't have to be copied between processes
+class PointCloudFramePrefetcher:
+  def __init__(self, workers=2):
+    self.workers = workers
+    self.executor = None
+    self.futures = {} # frame file cache keys -> futures of loaded frame files
+
+  def setWorkers(self, workers):
+    if workers != self.workers:
+      self.shutdown()
+      self.workers = workers
+
+  # starts loading the specified (PointCloudFrameFile) frame file in the background
+  def prefetch(self, frameFile):
+    key = frameFile.cacheKey()
+    if key in self.futures:
+      return
+
+    if self.executor == None:
+      self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.workers))
+    self.futures[key] = self.executor.submit(frameFile.load)
+
+  def isPrefetching(self, key):
+    return key in self.futures
+
+  # True when the file with the specified cache key is done loading (or failed to), so take won't have to wait
+  def isDone(self, key):
+    future = self.futures.get(key)
+    return future != None and future.done()
+
+  # gives the prefetched frame file with the specified cache key, waits for it if it's still loading.
+  # Returns None if the file isn't being prefetched, or if loading it failed
+  def take(self, key):
+    future = self.futures.pop(key, None)
+    if future == None:
+      return None
+
+    try:
+      return future.result()
+    except Exception as err:
+      logger.warning("PointCloudFramePrefetcher#take - prefetching %s failed: %s", key[0], err)
+      return None
+
+  # forgets about all prefetches except the ones with the specified cache keys
+  def retain(self, keys):
+    keys = set(keys)
+    for key in list(self.futures.keys()):
+      if key not in keys:
+        self.futures.pop(key).cancel()
+
+  def shutdown(self):
+    for future in self.futures.values():
+      future.cancel()
+    self.futures = {}
+
+    if self.executor != None:
+      self.executor.shutdown(wait=False)
+      self.executor = None
+# end of class PointCloudFramePrefetcher
+
+
+# Command-line tools
+#
+# converts all (recorder text, PLY, PCD or XYZ) frames (matching pattern) in the source directory into binary frames
+def convertSequence(source, dest=None, pattern="frame%d.txt", indexType=None, coordType='f'):
+  if dest == None:
+    dest = source
+  if not os.path.isdir(dest):
+    os.makedirs(dest)
+
+  names = _sequenceFileNames(source, pattern)
+  sourceSize = 0
+  binarySize = 0
+  quantizationError = 0.0
+
+  for name in names:
+    path = os.path.join(source, name)
+    indices, coords, scale = readFrameData(path)
+    if coordType in QUANTIZED_TYPES:
+      coords = QuantizedPoints(_scaledCoordinates(coords, scale), coordType)
+      quantizationError = max(quantizationError, coords.error)
+    destPath = os.path.join(dest, os.path.splitext(name)[0] + BINARY_FRAME_EXTENSION)
+    binarySize += writeBinaryFrame(destPath, indices, coords, scale=scale, coordType=coordType, indexType=indexType)
+    sourceSize += os.path.getsize(path)
+    print("Converted {0} -> {1} ({2} points)".format(path, destPath, len(indices)))
+
+  print("Converted {0} frames; {1} bytes -> {2} bytes".format(len(names), sourceSize, binarySize))
+  if coordType in QUANTIZED_TYPES:
+    print("Max quantization error: {0:g}".format(quantizationError))
+  return len(names)
+
+# finds the files matching pattern in the source directory, sorted by frame number
+def _sequenceFileNames(source, pattern):
+  regex = patternRegex(pattern)
+  return sorted([name for name in os.listdir(source) if regex.match(name)], key=lambda name: int(regex.match(name).group(1)))
+
+# packs all (text or binary) frames (matching pattern) in the source directory into a single sequence file;
+# a delta encoded one (see PointCloudDeltaSequenceWriter) when keyframeInterval is specified
+def packSequence(source, dest, pattern="frame%d.txt", indexType=None, keyframeInterval=None, tolerance=0.0, coordType='f'):
+  names = _sequenceFileNames(source, pattern)
+  if keyframeInterval != None and keyframeInterval > 0:
+    writer = PointCloudDeltaSequenceWriter(dest, len(names), keyframeInterval=keyframeInterval, tolerance=tolerance)
+  else:
+    writer = PointCloudSequenceWriter(dest, len(names))
+
+  for name in names:
+    indices, coords, scale = readFrameData(os.path.join(source, name))
+    writer.addFrame(indices, coords, scale=scale, coordType=coordType, indexType=indexType)
+
+  size = writer.close()
+  print("Packed {0} frames into {1} ({2} bytes)".format(len(names), dest, size))
+  if coordType in QUANTIZED_TYPES:
+    print("Max quantization error: {0:g}".format(writer.quantizationError))
+  if isinstance(writer, PointCloudDeltaSequenceWriter):
+    print("{0} keyframes, {1} delta frames".format(writer.keyframes, len(names) - writer.keyframes))
+  return len(names)
+
+# loads a single frame file (with the same skip/multiply/offset/bounds/voxel processing the addon performs
+# at load-time) and writes the resulting points. Runs in batchProcess's worker processes. Returns (points read, points written,
+# quantization error)
+def _batchFrame(job):
+  source, dest, format, options = job
+  file = PointCloudFrameFile(source, **options).load()
+
+  if format == 'text':
+    writeTextFrame(dest, file.indices, file.get_points())
+  else:
+    # the points are scaled already (and quantized points are written as they are)
+    writeBinaryFrame(dest, file.indices, file.points, scale=1.0)
+
+  return file.pointsRead, len(file.points), file.quantizationError
+
+# processes all frames (matching pattern) in the source directory in a pool of worker processes
+# and writes the results (as text or binary frames) to the dest directory. Options are passed on
+# to PointCloudFrameFile (skip, minBounds, maxBounds, offset, multiply, voxelSize, voxelMode, chunkSize, maxPoints, quantize)
+def batchProcess(source, dest, pattern="frame%d.txt", format='binary', workers=None, **options):
+  if not os.path.isdir(dest):
+    os.makedirs(dest)
+
+  workers = workers or os.cpu_count() or 1
+  extension = BINARY_FRAME_EXTENSION if format == 'binary' else '.txt'
+  names = _sequenceFileNames(source, pattern)
+  jobs = [(os.path.join(source, name), os.path.join(dest, os.path.splitext(name)[0] + extension), format, options) for name in names]
+
+  start = time.time()
+  # a few jobs per worker process at a time; frames are independent, so this scales with the number of cores
+  with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+    results = list(executor.map(_batchFrame, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+  elapsed = max(time.time() - start, 1e-9)
+
+  pointsRead = sum([read for read, written, error in results])
+  pointsWritten = sum([written for read, written, error in results])
+  quantizationError = max([error for read, written, error in results] or [0.0])
+  print("Processed {0} frames with {1} workers in {2:.2f} seconds; {3:.1f} frames/s, {4:.0f} points/s ({5} points read, {6} points written)".format(
+    len(jobs), workers, elapsed, len(jobs) / elapsed, pointsRead / elapsed, pointsRead, pointsWritten))
+  if options.get('quantize') != None:
+    print("Max quantization error: {0:g}".format(quantizationError))
+
+  return {'frames': len(jobs), 'seconds': elapsed, 'pointsRead': pointsRead, 'pointsWritten': pointsWritten, 'quantizationError': quantizationError}
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Point cloud data tools")
+  commands = parser.add_subparsers(dest="command")
+
+  convert = commands.add_parser("convert", help="convert a directory of (recorder text, PLY, PCD or XYZ) frames into binary ({0}) frames".format(BINARY_FRAME_EXTENSION))
+  convert.add_argument("source", help="directory containing the frames")
+  convert.add_argument("--dest", default=None, help="output directory (default: the source directory)")
+  convert.add_argument("--pattern", default="frame%d.txt", help="file name pattern of the frames (default: frame%%d.txt)")
+  convert.add_argument("--quantize", default=None, choices=sorted(QUANTIZED_TYPE_NAMES), help="store the coordinates as quantized integers (with a per-frame scale and offset)")
+
+  pack = commands.add_parser("pack", help="pack a directory of (text or binary) frames into a single sequence ({0}) file".format(SEQUENCE_EXTENSION))
+  pack.add_argument("source", help="directory containing the frames")
+  pack.add_argument("dest", help="sequence file to create")
+  pack.add_argument("--pattern", default="frame%d.txt", help="file name pattern of the frames (default: frame%%d.txt)")
+  pack.add_argument("--keyframe-interval", type=int, default=None, help="delta encode the sequence, with a keyframe (at least) every this number of frames")
+  pack.add_argument("--tolerance", type=float, default=0.0, help="with --keyframe-interval; points that moved less than this (in the frames' unscaled coordinates) count as unchanged (default: 0)")
+  pack.add_argument("--quantize", default=None, choices=sorted(QUANTIZED_TYPE_NAMES), help="store the coordinates as quantized integers (with a per-frame scale and offset)")
+
+  batch = commands.add_parser("batch", help="process (crop, transform, skip and clean up) a directory of frames in parallel")
+  batch.add_argument("source", help="directory containing the frames")
+  batch.add_argument("dest", help="output directory")
+  batch.add_argument("--pattern", default="frame%d.txt", help="file name pattern of the frames (default: frame%%d.txt)")
+  batch.add_argument("--format", default="binary", choices=["binary", "text"], help="output format (default: binary)")
+  batch.add_argument("--workers", type=int, default=None, help="number of worker processes (default: number of cores)")
+  batch.add_argument("--skip", type=int, default=0, help="after every read point, skip this number of points")
+  batch.add_argument("--multiply", type=float, nargs=3, default=None, metavar=('X', 'Y', 'Z'), help="multiply vertex positions by this vector")
+  batch.add_argument("--offset", type=float, nargs=3, default=None, metavar=('X', 'Y', 'Z'), help="offset vertex positions by this vector (after multiplying)")
+  batch.add_argument("--min", type=float, nargs=3, default=None, metavar=('X', 'Y', 'Z'), help="reject vertices below these bounds")
+  batch.add_argument("--max", type=float, nargs=3, default=None, metavar=('X', 'Y', 'Z'), help="reject vertices above these bounds")
+  batch.add_argument("--voxel", type=float, default=None, help="reduce points to one point per voxel of this size")
+  batch.add_argument("--voxel-mode", default="CENTROID", choices=["CENTROID", "FIRST"], help="point that represents a voxel (default: CENTROID)")
+  batch.add_argument("--chunk-size", type=int, default=None, help="stream the frames in chunks of this number of points (for frames that don't fit in memory)")
+  batch.add_argument("--max-points", type=int, default=None, help="with --chunk-size; keep a random sample of (at most) this number of points per frame")
+  batch.add_argument("--quantize", default=None, choices=sorted(QUANTIZED_TYPE_NAMES), help="quantize the points (in memory and, with --format binary, in the output)")
+
+  args = parser.parse_args(argv)
+
+  if args.command == "convert":
+    convertSequence(args.source, dest=args.dest, pattern=args.pattern, coordType=QUANTIZED_TYPE_NAMES.get(args.quantize, 'f'))
+  elif args.command == "pack":
+    packSequence(args.source, args.dest, pattern=args.pattern, keyframeInterval=args.keyframe_interval, tolerance=args.tolerance,
+      coordType=QUANTIZED_TYPE_NAMES.get(args.quantize, 'f'))
+  elif args.command == "batch":
+    batchProcess(args.source, args.dest, pattern=args.pattern, format=args.format, workers=args.workers,
+      skip=args.skip, multiply=args.multiply, offset=args.offset, minBounds=args.min, maxBounds=args.max,
+      voxelSize=args.voxel, voxelMode=args.voxel_mode, chunkSize=args.chunk_size, maxPoints=args.max_points,
+      quantize=QUANTIZED_TYPE_NAMES.get(args.quantize))
+  else:
+    parser.print_help()
+
+if __name__ == "__main__":
+  main()
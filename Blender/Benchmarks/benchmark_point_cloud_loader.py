@@ -0,0 +1,409 @@
+# Headless benchmarks for the Point Cloud Loader addon.
+#
+# Runs PointCloudFrameFile (also with grid meshing), ObjectFileManager and PointCloudObjectFrameLoader.createPoints
+# outside of blender, against a minimal stand-in for the bpy module, on synthetic frames:
+#   kinect - 19200 grid points in the layout of the Processing KinectPointCloudRecorder
+#   1m     - 1 million points
+#   10m    - 10 million points (not run by default; its text frame alone takes ~450 MB)
+#
+# Reports points per second (of the fastest of --repeat runs) and peak (python/numpy) memory per benchmark, and
+# compares the results with baseline.json (next to this file) to show regressions. A benchmark regressed when it's
+# more than --threshold slower and that's more than --noise-floor milliseconds (timer and scheduling noise
+# dominates the sub-millisecond benchmarks):
+#
+#   python Blender/Benchmarks/benchmark_point_cloud_loader.py
+#   python Blender/Benchmarks/benchmark_point_cloud_loader.py --sizes kinect,1m,10m
+#   python Blender/Benchmarks/benchmark_point_cloud_loader.py --save-baseline
+#
+# Save the baseline from the latest commit (with the default sizes), so it has a result for every benchmark.
+# Results of every run are written to results/<git commit>.json (next to this file).
+# Generating the synthetic frames requires NumPy; use --no-numpy to benchmark
+# the addon's pure python fallbacks.
+
+# system stuff
+import argparse
+import array
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR = os.path.join(os.path.dirname(BENCHMARK_DIR), 'Addons')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+SIZES = {'kinect': 19200, '1m': 1000000, '10m': 10000000}
+
+
+# Minimal stand-in for blender's bpy module; just enough to import the addon and to run
+# its frame loading and mesh updating code. Properties declared by the addon's
+# PointCloudLoaderConfig are recorded, so configs with their default values can be created
+class FakeProperty:
+  def __init__(self, kind, **kwargs):
+    self.kind = kind
+    self.default = kwargs.get('default', {'BoolProperty': False, 'IntProperty': 0, 'FloatProperty': 0.0, 'StringProperty': ''}.get(kind))
+
+class FakeVertices:
+  def __init__(self):
+    self.count = 0
+    self.co = array.array('f')
+
+  def __len__(self):
+    return self.count
+
+  def add(self, count):
+    self.count += count
+
+  # copies the data, like blender does
+  def foreach_set(self, attr, seq):
+    if len(seq) != self.count * 3:
+      raise ValueError("foreach_set: expected {0} values, got {1}".format(self.count * 3, len(seq)))
+    self.co = seq.copy() if hasattr(seq, 'copy') else array.array('f', seq)
+
+# mesh loops and polygons
+class FakeElements:
+  def __init__(self):
+    self.count = 0
+    self.values = {}
+
+  def __len__(self):
+    return self.count
+
+  def add(self, count):
+    self.count += count
+
+  def foreach_set(self, attr, seq):
+    self.values[attr] = seq.copy() if hasattr(seq, 'copy') else array.array('i', seq)
+
+class FakeMesh:
+  def __init__(self, name):
+    self.name = name
+    self.vertices = FakeVertices()
+    self.loops = FakeElements()
+    self.polygons = FakeElements()
+    self.materials = []
+    self.users = 0
+
+  def update(self, *args, **kwargs):
+    pass
+
+class FakeCollection(list):
+  def new(self, name, data=None):
+    item = FakeMesh(name) if data == None else FakeObject(name, data)
+    self.append(item)
+    return item
+
+  def remove(self, item):
+    list.remove(self, item)
+
+  def get(self, name, default=None):
+    for item in self:
+      if item.name == name:
+        return item
+    return default
+
+class FakeObject:
+  def __init__(self, name, data=None, config=None):
+    self.name = name
+    self.data = data
+    self.type = 'MESH'
+    self.parent = None
+    self.children = []
+    self.constraints = []
+    self.animation_data = None
+    self.matrix_world = None
+    self.pointCloudLoaderConfig = config or makeConfig(enabled=False)
+
+class FakeSceneObjects(list):
+  active = None
+
+  def link(self, obj):
+    self.append(obj)
+    if obj.parent != None:
+      obj.parent.children.append(obj)
+
+  def unlink(self, obj):
+    self.remove(obj)
+    if obj.parent != None:
+      obj.parent.children.remove(obj)
+
+class FakeScene:
+  def __init__(self):
+    self.objects = FakeSceneObjects()
+    self.frame_current = 0
+    self.camera = None
+
+  def update(self):
+    pass
+
+def installFakeBpy():
+  bpy = types.ModuleType('bpy')
+  bpy.props = types.ModuleType('bpy.props')
+  for kind in ['BoolProperty', 'IntProperty', 'FloatProperty', 'StringProperty', 'EnumProperty', 'FloatVectorProperty', 'PointerProperty']:
+    setattr(bpy.props, kind, (lambda kind: lambda **kwargs: FakeProperty(kind, **kwargs))(kind))
+
+  base = type('FakeBpyStruct', (object,), {})
+  bpy.types = types.SimpleNamespace(Panel=base, PropertyGroup=base, Operator=base, Object=type('Object', (object,), {}))
+  bpy.app = types.ModuleType('bpy.app')
+  bpy.app.handlers = types.ModuleType('bpy.app.handlers')
+  bpy.app.handlers.persistent = lambda func: func
+  bpy.app.timers = None
+  bpy.path = types.SimpleNamespace(abspath=lambda path: os.path.abspath(path.replace('//', '', 1)))
+  bpy.utils = types.SimpleNamespace(register_module=lambda name: None, unregister_module=lambda name: None)
+  bpy.data = types.SimpleNamespace(meshes=FakeCollection(), objects=FakeCollection(), materials=FakeCollection())
+  bpy.context = types.SimpleNamespace(scene=FakeScene())
+
+  sys.modules['bpy'] = bpy
+  sys.modules['bpy.app'] = bpy.app
+  sys.modules['bpy.app.handlers'] = bpy.app.handlers
+  sys.modules['bmesh'] = types.ModuleType('bmesh')
+  sys.modules['mathutils'] = types.ModuleType('mathutils')
+  return bpy
+
+# creates a config object with the defaults of all properties of the addon's PointCloudLoaderConfig
+def makeConfig(**overrides):
+  import point_cloud_loader.addon as addon
+  if not hasattr(addon.PointCloudLoaderConfig, 'enabled'):
+    addon.PointCloudLoaderConfig.register()
+
+  config = types.SimpleNamespace()
+  for name, value in vars(addon.PointCloudLoaderConfig).items():
+    if isinstance(value, FakeProperty):
+      setattr(config, name, value.default)
+
+  for name, value in overrides.items():
+    setattr(config, name, value)
+  return config
+
+
+# Synthetic frames
+#
+# a frame like the Processing recorder writes them; every 4th pixel of the 640x480 depth image, column by
+# column, converted to world coordinates (meters). Pixels without depth reading aren't written
+def kinectFrame(numpy, seed=0):
+  random = numpy.random.RandomState(seed)
+  xs, ys = numpy.meshgrid(numpy.arange(0, 640, 4), numpy.arange(0, 480, 4), indexing='ij')
+  xs = xs.ravel()
+  ys = ys.ravel()
+  # a wobbly wall with a blob in front of it, and some pixels without depth reading
+  rawDepth = 800 + 60 * numpy.sin(xs / 60.0) + 40 * numpy.cos(ys / 45.0) + random.normal(0, 2, len(xs))
+  rawDepth -= 150 * (((xs - 320) ** 2 + (ys - 240) ** 2) < 100 ** 2)
+  rawDepth[random.rand(len(xs)) < 0.1] = 2047
+
+  depth = numpy.where(rawDepth < 2047, 1.0 / (rawDepth * -0.0030711016 + 3.3309495161), 0.0)
+  coords = numpy.empty((len(xs), 3), dtype=numpy.float32)
+  coords[:,0] = (xs - 3.3930780975300314e+02) * depth / 5.9421434211923247e+02
+  coords[:,1] = (ys - 2.4273913761751615e+02) * depth / 5.9104053696870778e+02
+  coords[:,2] = depth
+
+  keep = (coords[:,0] * coords[:,1] * coords[:,2]) != 0
+  return numpy.arange(len(xs))[keep], coords[keep]
+
+# random points in a room-sized (10x3x10 meters) box
+def randomFrame(numpy, count, seed=0):
+  random = numpy.random.RandomState(seed)
+  coords = (random.rand(count, 3) * numpy.array([10.0, 3.0, 10.0]) - numpy.array([5.0, 0.0, 5.0])).astype(numpy.float32)
+  return numpy.arange(count), coords
+
+# the frustum planes (see point_cloud_data.frustumPlanes) of a camera behind the points' bounding box, looking
+# at its center along -z with a narrow view (of about a quarter of the points), and the camera's position
+def cameraFrustum(numpy, points):
+  from point_cloud_loader import point_cloud_data as data
+  points = numpy.asarray(points)
+  low, high = points.min(axis=0), points.max(axis=0)
+  camera = (low + high) / 2
+  camera[2] = high[2] + (high[2] - low[2])
+  frame = [(0.15, 0.15), (0.15, -0.15), (-0.15, -0.15), (-0.15, 0.15)]
+  corners = [tuple(camera + numpy.array((x, y, -1.0)) * clip) for clip in (0.01, 1000.0) for x, y in frame]
+  return data.frustumPlanes(corners), tuple(camera)
+
+def writeFrames(data, directory, size, numpy):
+  indices, coords = kinectFrame(numpy) if size == 'kinect' else randomFrame(numpy, SIZES[size])
+  textPath = os.path.join(directory, size + '.txt')
+  binaryPath = os.path.join(directory, size + data.BINARY_FRAME_EXTENSION)
+  data.writeTextFrame(textPath, indices, coords, scale=1.0)
+  data.writeBinaryFrame(binaryPath, indices, coords, scale=data.TEXT_FRAME_SCALE)
+  return textPath, binaryPath, len(indices)
+
+# a directory with count kinect frames (hard links to the same file when possible)
+def writeSequence(directory, source, count):
+  os.makedirs(directory)
+  for frame in range(count):
+    path = os.path.join(directory, 'frame{0}.txt'.format(frame))
+    try:
+      os.link(source, path)
+    except OSError:
+      shutil.copy(source, path)
+  return os.path.join(directory, 'frame%d.txt')
+
+
+# Benchmarks
+#
+# runs func repeat times, gives (fastest duration, peak traced memory). Memory is traced
+# in a separate run, tracing slows down (python object heavy) code too much to time it
+def measure(func, repeat):
+  durations = []
+  for i in range(repeat):
+    start = time.perf_counter()
+    func()
+    durations.append(time.perf_counter() - start)
+
+  tracemalloc.start()
+  func()
+  peak = tracemalloc.get_traced_memory()[1]
+  tracemalloc.stop()
+  return min(durations), peak
+
+def runBenchmarks(sizes, repeat, workDir, numpy, useNumpy):
+  from point_cloud_loader import point_cloud_data as data
+  import point_cloud_loader.addon as addon
+
+  results = {}
+  def report(name, count, duration, peak, unit='points'):
+    results[name] = {'seconds': duration, 'count': count, 'perSecond': count / duration, 'unit': unit, 'peakBytes': peak}
+    print("{0:<28} {1:>14,.0f} {2}/s {3:>10.1f} ms {4:>10.1f} MB peak".format(name, count / duration, unit, duration * 1000, peak / (1024.0 * 1024.0)))
+
+  for size in sizes:
+    textPath, binaryPath, count = writeFrames(data, workDir, size, numpy)
+    if not useNumpy:
+      data.numpy = None
+
+    duration, peak = measure(lambda: data.PointCloudFrameFile(textPath).load(), repeat)
+    report('parse text ' + size, count, duration, peak)
+    duration, peak = measure(lambda: data.PointCloudFrameFile(binaryPath).load(), repeat)
+    report('parse binary ' + size, count, duration, peak)
+
+    points = data.PointCloudFrameFile(binaryPath).get_points()
+    obj = FakeObject('benchmark', config=makeConfig(enabled=True))
+    scene = FakeScene()
+    scene.objects.link(obj)
+    addon.PointCloudObjectFrameLoader(obj, points, scene=scene).createPoints() # creates the mesh
+    duration, peak = measure(lambda: addon.PointCloudObjectFrameLoader(obj, points, scene=scene).createPoints(), repeat)
+    report('createPoints ' + size, len(points), duration, peak)
+
+    duration, peak = measure(lambda: data.PointCloudFrameFile(binaryPath, quantize='h').load(), repeat)
+    report('parse binary int16 ' + size, count, duration, peak)
+    quantized = data.PointCloudFrameFile(binaryPath, quantize='h').load()
+    duration, peak = measure(quantized.get_points, repeat)
+    report('dequantize int16 ' + size, len(points), duration, peak)
+    planes, camera = cameraFrustum(numpy, points)
+    duration, peak = measure(lambda: data.cullPoints(points, planes, 0.1, camera, 100.0), repeat)
+    report('cull frustum ' + size, len(points), duration, peak)
+
+    if size == 'kinect':
+      # the recorder's grid indices only mean something for kinect frames
+      duration, peak = measure(lambda: data.PointCloudFrameFile(binaryPath, gridMesh=True, gridMaxEdge=5.0).load(), repeat)
+      report('grid mesh kinect', count, duration, peak)
+      file = data.PointCloudFrameFile(binaryPath, gridMesh=True, gridMaxEdge=5.0).load()
+      duration, peak = measure(lambda: addon.PointCloudObjectFrameLoader(obj, file.points, scene=scene).createPoints(triangles=file.triangles), repeat)
+      report('createPoints faces kinect', len(file.points), duration, peak)
+
+    data.numpy = numpy
+
+  if 'kinect' in sizes:
+    pattern = writeSequence(os.path.join(workDir, 'sequence'), os.path.join(workDir, 'kinect.txt'), 200)
+    obj = FakeObject('benchmark', config=makeConfig(enabled=True, fileName=pattern, numFiles=0))
+    def lookups():
+      for frame in range(1000):
+        addon.ObjectFileManager(obj).frameFilePath(frame)
+    duration, peak = measure(lookups, repeat)
+    report('frameFilePath 200 files', 1000, duration, peak, unit='frames')
+
+    # objects showing the same frames (with the frame cache off) share a single load per frame change
+    scene = FakeScene()
+    for i in range(5):
+      scene.objects.link(FakeObject('shared{0}'.format(i), config=makeConfig(enabled=True, fileName=pattern, numFiles=0, cacheSize=0, prefetchDepth=0)))
+    duration, peak = measure(lambda: addon.PointCloudLoader(scene=scene).loadFrame(force=True), repeat)
+    report('loadFrame 5 objects 1 file', 5, duration, peak, unit='objects')
+
+  return results
+
+def gitCommit():
+  try:
+    return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARK_DIR, stderr=subprocess.DEVNULL).decode().strip()
+  except (OSError, subprocess.CalledProcessError):
+    return 'unknown'
+
+# prints how the results compare to the baseline; gives the names of the benchmarks that are slower than the
+# baseline by more than the threshold (fraction) and by more than noiseFloor seconds (per run, for the same work)
+def compare(results, baseline, threshold, noiseFloor):
+  regressions = []
+  print("\nCompared to baseline (commit {0}):".format(baseline.get('commit')))
+  for name, result in results.items():
+    base = baseline['results'].get(name)
+    if base == None:
+      print("{0:<28}   (not in the baseline)".format(name))
+      continue
+    ratio = result['perSecond'] / base['perSecond']
+    slower = result['count'] / base['perSecond'] # the run's duration at the baseline's speed
+    difference = result['seconds'] - slower
+    regressed = ratio < 1.0 - threshold and difference > noiseFloor
+    if regressed:
+      regressions.append(name)
+    print("{0:<28} {1:>6.2f}x {2:>+9.2f} ms{3}".format(name, ratio, difference * 1000, "  REGRESSION" if regressed else ""))
+  return regressions
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Point Cloud Loader benchmarks")
+  parser.add_argument("--sizes", default="kinect,1m", help="comma separated frame sizes to benchmark ({0}; default: kinect,1m)".format(", ".join(SIZES.keys())))
+  parser.add_argument("--repeat", type=int, default=5, help="number of runs per benchmark, the fastest counts (default: 5)")
+  parser.add_argument("--no-numpy", action="store_true", help="benchmark the pure python fallbacks")
+  parser.add_argument("--threshold", type=float, default=0.25, help="slow-down (fraction) that counts as regression (default: 0.25)")
+  parser.add_argument("--noise-floor", type=float, default=2.0, help="slow-down (milliseconds per run) below which nothing counts as regression (default: 2.0)")
+  parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+  parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 when there are regressions")
+  args = parser.parse_args(argv)
+
+  sizes = [size.strip() for size in args.sizes.split(',') if size.strip() != '']
+  for size in sizes:
+    if size not in SIZES:
+      parser.error("unknown size: " + size)
+
+  try:
+    import numpy
+  except ImportError:
+    parser.error("generating the synthetic frames requires NumPy")
+
+  installFakeBpy()
+  sys.path.insert(0, ADDON_DIR)
+
+  workDir = tempfile.mkdtemp(prefix='point_cloud_benchmark_')
+  try:
+    results = runBenchmarks(sizes, args.repeat, workDir, numpy, not args.no_numpy)
+  finally:
+    shutil.rmtree(workDir)
+
+  commit = gitCommit()
+  report = {'commit': commit, 'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+    'numpy': numpy.__version__ if not args.no_numpy else None, 'machine': platform.machine(), 'results': results}
+
+  if not os.path.isdir(RESULTS_DIR):
+    os.makedirs(RESULTS_DIR)
+  with open(os.path.join(RESULTS_DIR, commit + '.json'), 'w') as f:
+    json.dump(report, f, indent=2)
+
+  regressions = []
+  if os.path.isfile(BASELINE_PATH) and not args.save_baseline:
+    with open(BASELINE_PATH) as f:
+      baseline = json.load(f)
+    if (baseline.get('numpy') == None) != args.no_numpy:
+      print("\nNot comparing to baseline; it was {0} NumPy".format("run without" if baseline.get('numpy') == None else "run with"))
+    else:
+      regressions = compare(results, baseline, args.threshold, args.noise_floor / 1000.0)
+
+  if args.save_baseline:
+    with open(BASELINE_PATH, 'w') as f:
+      json.dump(report, f, indent=2)
+    print("\nSaved baseline: " + BASELINE_PATH)
+
+  if args.fail_on_regression and len(regressions) > 0:
+    sys.exit(1)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,1263 @@
+# Tests of the Point Cloud Loader addon, run outside of blender against the bpy stand-in of the benchmarks:
+#
+#   python -m pytest Blender/Tests
+#
+# Needs NumPy (for the synthetic frames, like the benchmarks).
+
+# system stuff
+import array
+import contextlib
+import io
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+import warnings
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'Benchmarks'))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'Addons'))
+
+import numpy
+from benchmark_point_cloud_loader import installFakeBpy, makeConfig, randomFrame, FakeObject, FakeScene
+bpy = installFakeBpy()
+import point_cloud_loader.addon as addon
+from point_cloud_loader import point_cloud_data as data
+
+# the parts of mathutils culling uses (4x4 matrices and 3d vectors, blender 2.7x style * products)
+class Vector:
+  def __init__(self, values):
+    self.values = numpy.array(values, dtype=float)
+
+  x = property(lambda self: self.values[0])
+  y = property(lambda self: self.values[1])
+  z = property(lambda self: self.values[2])
+
+  def __mul__(self, factor):
+    return Vector(self.values * factor)
+
+  def __iter__(self):
+    return iter(self.values.tolist())
+# end of class Vector
+
+class Matrix:
+  def __init__(self, rows):
+    self.rows = numpy.array(rows, dtype=float)
+
+  @staticmethod
+  def Identity(size):
+    return Matrix(numpy.eye(size))
+
+  @staticmethod
+  def Translation(vector):
+    matrix = numpy.eye(4)
+    matrix[:3, 3] = list(vector)
+    return Matrix(matrix)
+
+  def __getitem__(self, row):
+    return self.rows[row]
+
+  def inverted(self):
+    return Matrix(numpy.linalg.inv(self.rows))
+
+  def to_translation(self):
+    return Vector(self.rows[:3, 3])
+
+  def to_4x4(self):
+    matrix = numpy.eye(4)
+    matrix[:3, :3] = self.rows[:3, :3]
+    return Matrix(matrix)
+
+  def __mul__(self, other):
+    if isinstance(other, Matrix):
+      return Matrix(self.rows.dot(other.rows))
+    return Vector(self.rows.dot(numpy.append(other.values, 1.0))[:3])
+# end of class Matrix
+
+class Euler:
+  def __init__(self, angles, order='XYZ'):
+    self.angles = angles
+
+  def to_matrix(self):
+    x, y, z = self.angles
+    rx = [[1, 0, 0], [0, numpy.cos(x), -numpy.sin(x)], [0, numpy.sin(x), numpy.cos(x)]]
+    ry = [[numpy.cos(y), 0, numpy.sin(y)], [0, 1, 0], [-numpy.sin(y), 0, numpy.cos(y)]]
+    rz = [[numpy.cos(z), -numpy.sin(z), 0], [numpy.sin(z), numpy.cos(z), 0], [0, 0, 1]]
+    return Matrix(numpy.dot(rz, numpy.dot(ry, rx)))
+# end of class Euler
+
+sys.modules['mathutils'].Vector = Vector
+sys.modules['mathutils'].Matrix = Matrix
+sys.modules['mathutils'].Euler = Euler
+bpy.app.version = (2, 75, 0)
+
+# a fresh scene (and temporary directory for frame files) for every test
+class AddonTestCase(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp(prefix='point_cloud_test_')
+    self.scene = FakeScene()
+    bpy.context.scene = self.scene
+    bpy.data.objects[:] = []
+
+  def tearDown(self):
+    data.closeSequenceFiles()
+    addon.frameCache.clear()
+    addon.loadedFrames.clear()
+    addon.pendingLoads.clear()
+    addon.releasePreload()
+    shutil.rmtree(self.directory)
+
+  # writes count binary frames of random points; gives the pattern of their paths
+  def writeFrames(self, count, points=1000):
+    for frame in range(count):
+      indices, coords = randomFrame(numpy, points, seed=frame)
+      data.writeBinaryFrame(os.path.join(self.directory, 'frame{0}.pcb'.format(frame)), indices, coords)
+    return os.path.join(self.directory, 'frame%d.pcb')
+
+  def addObject(self, name='cloud', **config):
+    obj = FakeObject(name, config=makeConfig(enabled=True, prefetchDepth=0, **config))
+    bpy.data.objects.append(obj)
+    self.scene.objects.link(obj)
+    return obj
+
+  def vertexCount(self, obj):
+    return len(obj.children[0].data.vertices)
+
+  # records the (path, skip) of every frame file loaded from here on
+  def recordFrameLoads(self):
+    loads = []
+    loadFrameData = data.PointCloudFrameFile._loadFrameData
+    def recordedLoad(file):
+      loads.append((file.path, file.skip))
+      return loadFrameData(file)
+    data.PointCloudFrameFile._loadFrameData = recordedLoad
+    self.addCleanup(setattr, data.PointCloudFrameFile, '_loadFrameData', loadFrameData)
+    return loads
+# end of class AddonTestCase
+
+
+class SequenceFileTest(AddonTestCase):
+  def test_frames_past_the_end_of_a_sequence_file_are_not_loaded(self):
+    pattern = self.writeFrames(10)
+    sequencePath = os.path.join(self.directory, 'take.pcs')
+    data.packSequence(self.directory, sequencePath, pattern='frame%d.pcb')
+    obj = self.addObject(fileName=sequencePath, numFiles=100) # more files than the sequence has frames
+
+    fileManager = addon.ObjectFileManager(obj)
+    self.assertEqual(fileManager.numberOfFiles(), 10)
+    self.assertEqual(fileManager.frameFilePath(12), data.sequenceFramePath(sequencePath, 2)) # loops
+    obj.pointCloudLoaderConfig.pointCloudFrame = 12
+    self.assertEqual(fileManager.frameFilePath(0), None)
+
+    obj.pointCloudLoaderConfig.pointCloudFrame = -1
+    self.scene.frame_current = 12
+    addon.frameHandler(self.scene)
+    self.assertEqual(self.vertexCount(obj), 1000)
+
+  def test_delta_frames_upload_all_vertices_at_once_or_nothing(self):
+    indices, coords = randomFrame(numpy, 1000)
+    moved = coords.copy()
+    moved[:10] += 1.0
+    for frame, frameCoords in enumerate([coords, coords, moved]):
+      data.writeBinaryFrame(os.path.join(self.directory, 'frame{0}.pcb'.format(frame)), indices, frameCoords)
+    sequencePath = os.path.join(self.directory, 'take.pcs')
+    data.packSequence(self.directory, sequencePath, pattern='frame%d.pcb', keyframeInterval=30)
+    obj = self.addObject(fileName=sequencePath, numFiles=0)
+
+    uploads = []
+    for frame in range(3):
+      self.scene.frame_current = frame
+      addon.frameHandler(self.scene)
+      vertices = obj.children[0].data.vertices
+      uploads.append(len(vertices.co))
+      coordinates = numpy.asarray(vertices.co).reshape(-1,3)
+      vertices.co = array.array('f')
+
+    # the unchanged frame isn't uploaded; the one with 10 moved points writes them into the object's
+    # coordinates buffer, which gets uploaded in one go
+    self.assertEqual(uploads, [3000, 0, 3000])
+    self.assertTrue(numpy.allclose(coordinates, moved))
+
+  def test_delta_frames_only_write_their_changed_rows(self):
+    indices, coords = randomFrame(numpy, 1000)
+    moved = coords.copy()
+    moved[:10] += 1.0
+    for frame, frameCoords in enumerate([coords, moved]):
+      data.writeBinaryFrame(os.path.join(self.directory, 'frame{0}.pcb'.format(frame)), indices, frameCoords)
+    sequencePath = os.path.join(self.directory, 'take.pcs')
+    data.packSequence(self.directory, sequencePath, pattern='frame%d.pcb', keyframeInterval=30)
+    obj = self.addObject(fileName=sequencePath, numFiles=0)
+
+    addon.frameHandler(self.scene)
+    buffer = addon.vertexBuffers['cloud']
+    written = []
+    writeCoordinateRows = addon.writeCoordinateRows
+    addon.writeCoordinateRows = lambda buffer, points, positions: written.append(list(positions)) or writeCoordinateRows(buffer, points, positions)
+    try:
+      self.scene.frame_current = 1
+      addon.frameHandler(self.scene)
+    finally:
+      addon.writeCoordinateRows = writeCoordinateRows
+
+    self.assertEqual(written, [list(range(10))])
+    self.assertTrue(addon.vertexBuffers['cloud'] is buffer)
+    self.assertTrue(numpy.allclose(numpy.asarray(obj.children[0].data.vertices.co).reshape(-1,3), moved))
+    # the buffer is a copy, the cached frame's points stay as they are
+    self.assertTrue(numpy.allclose(addon.loadedFrames['cloud'].get_points(), moved))
+
+  def test_sequence_files_opened_from_several_threads_are_mapped_once(self):
+    sequencePath = os.path.join(self.directory, 'take.pcs')
+    data.packSequence(self.directory, sequencePath, pattern=os.path.basename(self.writeFrames(2)))
+
+    # opening takes a while, so without the lock every thread would map the file
+    opened = []
+    init = data.PointCloudSequenceFile.__init__
+    def slowInit(sequence, path):
+      time.sleep(0.05)
+      init(sequence, path)
+      opened.append(sequence)
+    data.PointCloudSequenceFile.__init__ = slowInit
+    try:
+      threads = [threading.Thread(target=data.openSequenceFile, args=(sequencePath,)) for i in range(4)]
+      for thread in threads:
+        thread.start()
+      for thread in threads:
+        thread.join()
+    finally:
+      data.PointCloudSequenceFile.__init__ = init
+
+    self.assertEqual(len(opened), 1)
+    self.assertTrue(data.openSequenceFile(sequencePath) is opened[0])
+# end of class SequenceFileTest
+
+
+class DeltaEncodingTest(AddonTestCase):
+  # a frame and the next one: 10 points moved by a lot, 10 by less than the tolerance, 10 gone, 10 new
+  def frames(self):
+    indices, coords = randomFrame(numpy, 1000)
+    nextIndices = numpy.concatenate([indices[10:], numpy.arange(1000, 1010)])
+    nextCoords = numpy.concatenate([coords[10:], numpy.ones((10,3), dtype=numpy.float32)])
+    nextCoords[:10] += 0.5
+    nextCoords[10:20] += 0.001
+    return indices, coords, nextIndices, nextCoords
+
+  def assertRoundTrips(self, tolerance):
+    indices, coords, nextIndices, nextCoords = self.frames()
+    if data.numpy == None:
+      indices, coords = indices.tolist(), [tuple(coord) for coord in coords.tolist()]
+    deltaIndices, deltaCoords = data.frameDelta(indices, coords, nextIndices.tolist(), [tuple(coord) for coord in nextCoords.tolist()], tolerance)
+    self.assertEqual(len(deltaIndices), 30 if tolerance > 0 else 40)
+
+    decodedIndices, decodedCoords = data.applyFrameDelta(indices, coords, deltaIndices, deltaCoords)
+    self.assertEqual(list(decodedIndices), list(nextIndices))
+    difference = numpy.abs(numpy.asarray(decodedCoords).reshape(-1,3) - nextCoords).max()
+    self.assertTrue(difference <= tolerance + 1e-6)
+
+  def test_deltas_round_trip_within_the_tolerance(self):
+    self.assertRoundTrips(0.0)
+    self.assertRoundTrips(0.002)
+
+  def test_deltas_round_trip_without_numpy(self):
+    self.addCleanup(setattr, data, 'numpy', data.numpy)
+    data.numpy = None
+    self.assertRoundTrips(0.0)
+    self.assertRoundTrips(0.002)
+
+  def test_quantized_delta_sequences_round_trip_within_the_tolerance_and_quantization_error(self):
+    indices, coords, nextIndices, nextCoords = self.frames()
+    frames = [(indices, coords), (nextIndices, nextCoords), (indices, coords)]
+    for coordType in ('h', 'i'):
+      path = os.path.join(self.directory, 'take{0}.pcs'.format(coordType))
+      writer = data.PointCloudDeltaSequenceWriter(path, len(frames), keyframeInterval=30, tolerance=0.002)
+      for frameIndices, frameCoords in frames:
+        writer.addFrame(frameIndices, frameCoords, coordType=coordType)
+      writer.close()
+
+      sequence = data.openSequenceFile(path)
+      self.assertEqual([sequence.isDeltaFrame(frame) for frame in range(3)], [False, True, True])
+      for frame, (frameIndices, frameCoords) in enumerate(frames):
+        decodedIndices, decodedCoords, scale = sequence.frameData(frame)
+        self.assertEqual(list(decodedIndices), list(frameIndices))
+        difference = numpy.abs(numpy.asarray(decodedCoords).reshape(-1,3) * scale - frameCoords).max()
+        self.assertTrue(difference <= 0.002 + writer.quantizationError + 1e-6, (coordType, frame, difference))
+      data.closeSequenceFiles()
+# end of class DeltaEncodingTest
+
+
+
+# the line parser PointCloudFrameFile had before NumPy; gives (points, indices of the points, rejected points, all points)
+def originalFrameData(path, skip=0, minBounds=None, maxBounds=None, offset=None, multiply=None):
+  points, indices, rejected_points, all_points = [], [], [], []
+  f = open(path)
+
+  while f:
+    line = f.readline()
+    try:
+      idx,x,y,z = [100*float(v) for v in line.split(",")]
+      reject = False
+      v = list((x,y,z))
+
+      if multiply != None:
+        for i in range(3):
+          v[i] = v[i] * multiply[i]
+
+      if offset != None:
+        for i in range(3):
+          v[i] += offset[i]
+
+      if minBounds != None:
+        for i in range(3):
+          if v[i] < minBounds[i]:
+            reject = True
+            break
+
+      if reject != True and maxBounds != None:
+        for i in range(3):
+          if v[i] > maxBounds[i]:
+            reject = True
+            break
+
+      v = (v[0], v[1], v[2])
+      all_points.append(v)
+
+      if reject == True:
+        rejected_points.append(v)
+      else:
+        if x*y*z != 0:
+          points.append(v)
+          indices.append(int(round(idx / 100)))
+
+    except ValueError:
+      break
+
+    for i in range(skip):
+      f.readline()
+
+  f.close()
+  return points, indices, rejected_points, all_points
+
+class TextParserTest(AddonTestCase):
+  OPTIONS = [{}, {'skip': 2}, {'minBounds': (-3.0, 0.5, -3.0), 'maxBounds': (3.0, 2.5, 3.0)},
+    {'multiply': (2.0, 1.0, -1.0), 'offset': (0.5, -1.0, 0.0), 'minBounds': (-4.0, -1.0, -4.0), 'skip': 1}]
+
+  # a recorder text frame with all-zero rows, and rows with a single 0 coordinate (also not active)
+  def writeTextFrame(self, name='frame0.txt'):
+    indices, coords = randomFrame(numpy, 600)
+    coords[::7] = 0.0
+    coords[3::11, 1] = 0.0
+    path = os.path.join(self.directory, name)
+    data.writeTextFrame(path, indices, coords)
+    return path
+
+  def assertSameAsOriginal(self, path):
+    for options in self.OPTIONS:
+      points, indices, rejected, everything = originalFrameData(path, **options)
+      file = data.PointCloudFrameFile(path, **options).load()
+      self.assertTrue(numpy.allclose(numpy.asarray(file.get_points()).reshape(-1,3), numpy.asarray(points).reshape(-1,3), atol=1e-5), options)
+      self.assertEqual(list(file.get_indices()), indices)
+      self.assertTrue(numpy.allclose(numpy.asarray(file.get_rejected_points()).reshape(-1,3), numpy.asarray(rejected).reshape(-1,3), atol=1e-5), options)
+      self.assertEqual(len(file.get_all_points()), len(everything))
+
+  def test_numpy_parser_gives_the_points_of_the_original_parser(self):
+    self.assertSameAsOriginal(self.writeTextFrame())
+
+  def test_pure_python_parser_gives_the_points_of_the_original_parser(self):
+    path = self.writeTextFrame()
+    self.addCleanup(setattr, data, 'numpy', data.numpy)
+    data.numpy = None
+    self.assertSameAsOriginal(path)
+
+  def test_parsing_stops_at_the_first_malformed_line_like_the_original_parser(self):
+    path = self.writeTextFrame()
+    with open(path) as f:
+      lines = f.readlines()
+    with open(path, 'w') as f:
+      f.writelines(lines[:300] + ["not a point\n"] + lines[300:])
+    self.assertSameAsOriginal(path)
+
+  # all_points holds the accepted points, then the rejected ones, then the non-active ones (each in file order)
+  def assertPartitioned(self, path):
+    for options in self.OPTIONS:
+      points, indices, rejected, everything = originalFrameData(path, **options)
+      inactive = []
+      p, r = 0, 0
+      for v in everything:
+        if p < len(points) and v == points[p]:
+          p += 1
+        elif r < len(rejected) and v == rejected[r]:
+          r += 1
+        else:
+          inactive.append(v)
+
+      file = data.PointCloudFrameFile(path, **options).load()
+      expected = numpy.asarray(points + rejected + inactive).reshape(-1,3)
+      self.assertTrue(numpy.allclose(numpy.asarray(file.get_all_points()).reshape(-1,3), expected, atol=1e-5), options)
+      if data.numpy != None:
+        self.assertTrue(numpy.shares_memory(file.points, file.all_points), options)
+        self.assertTrue(len(rejected) == 0 or numpy.shares_memory(file.rejected_points, file.all_points), options)
+
+  def test_all_points_are_partitioned_into_accepted_rejected_and_inactive(self):
+    self.assertPartitioned(self.writeTextFrame())
+
+  def test_all_points_are_partitioned_into_accepted_rejected_and_inactive_without_numpy(self):
+    path = self.writeTextFrame()
+    self.addCleanup(setattr, data, 'numpy', data.numpy)
+    data.numpy = None
+    self.assertPartitioned(path)
+
+  def test_empty_frame_files_have_no_points_and_dont_warn(self):
+    path = os.path.join(self.directory, 'empty.txt')
+    open(path, 'w').close()
+    with warnings.catch_warnings(record=True) as caught:
+      warnings.simplefilter('always')
+      file = data.PointCloudFrameFile(path).load()
+      chunked = data.PointCloudFrameFile(path, chunkSize=100).load()
+    self.assertEqual(caught, [])
+    self.assertEqual((len(file.get_points()), len(file.get_all_points()), len(chunked.get_points())), (0, 0, 0))
+# end of class TextParserTest
+
+
+class FrameReaderTest(AddonTestCase):
+  # (property name, PLY type, struct code) of vertices with more than just coordinates
+  EXTRA_PROPERTIES = [('confidence', 'uchar', 'B'), ('x', 'float', 'f'), ('y', 'float', 'f'), ('z', 'float', 'f'),
+    ('red', 'uchar', 'B'), ('intensity', 'double', 'd')]
+
+  def setUp(self):
+    AddonTestCase.setUp(self)
+    self.coords = randomFrame(numpy, 20)[1].astype(numpy.float64)
+
+  def writePly(self, name, format, properties=(('x', 'float', 'f'), ('y', 'float', 'f'), ('z', 'float', 'f'))):
+    header = ["ply", "format {0} 1.0".format(format), "comment made by the tests",
+      # an element before the vertices, which gets skipped
+      "element camera 2", "property float view_px", "property float view_py",
+      "element vertex {0}".format(len(self.coords))]
+    header += ["property {0} {1}".format(plyType, name) for name, plyType, code in properties]
+    header += ["element face 0", "property list uchar int vertex_indices", "end_header"]
+
+    rows = [[{'x': x, 'y': y, 'z': z}.get(name, 7) for name, plyType, code in properties] for x, y, z in self.coords]
+    path = os.path.join(self.directory, name)
+    with open(path, 'wb') as f:
+      f.write(("\n".join(header) + "\n").encode('ascii'))
+      if format == 'ascii':
+        f.write(b"1 2\n3 4\n")
+        for row in rows:
+          f.write((" ".join([repr(float(value)) if code in 'fd' else str(value) for value, (name, plyType, code) in zip(row, properties)]) + "\n").encode('ascii'))
+      else:
+        byteOrder = '<' if format == 'binary_little_endian' else '>'
+        f.write(struct.pack(byteOrder + 'ffff', 1, 2, 3, 4))
+        recordFormat = byteOrder + ''.join([code for name, plyType, code in properties])
+        for row in rows:
+          f.write(struct.pack(recordFormat, *row))
+    return path
+
+  def writePcd(self, name, nan=()):
+    coords = self.coords.copy()
+    coords[list(nan)] = numpy.nan
+    header = ["# .PCD v0.7", "VERSION 0.7", "FIELDS x y z rgb", "SIZE 4 4 4 4", "TYPE F F F U", "COUNT 1 1 1 1",
+      "WIDTH {0}".format(len(coords)), "HEIGHT 1", "VIEWPOINT 0 0 0 1 0 0 0", "POINTS {0}".format(len(coords)), "DATA binary"]
+    path = os.path.join(self.directory, name)
+    with open(path, 'wb') as f:
+      f.write(("\n".join(header) + "\n").encode('ascii'))
+      for x, y, z in coords:
+        f.write(struct.pack('<fffI', x, y, z, 0xff0000))
+    return path
+
+  def writeXyz(self, name, delimiter=' '):
+    path = os.path.join(self.directory, name)
+    with open(path, 'w') as f:
+      f.write("# x y z r g b\n")
+      for x, y, z in self.coords:
+        f.write(delimiter.join([repr(float(x)), repr(float(y)), repr(float(z)), '255', '0', '0']) + "\n")
+    return path
+
+  def assertFrame(self, frame, coords=None):
+    indices, frameCoords, scale = frame
+    self.assertEqual(list(indices), list(range(len(self.coords))))
+    self.assertEqual(scale, 1.0)
+    self.assertTrue(numpy.allclose(numpy.asarray(frameCoords, dtype=numpy.float64).reshape(-1,3), self.coords if coords is None else coords, atol=1e-6))
+
+  # runs check with NumPy and with the pure python fallbacks
+  def withAndWithoutNumpy(self, check):
+    check()
+    self.addCleanup(setattr, data, 'numpy', data.numpy)
+    data.numpy = None
+    check()
+
+  def test_ply_files(self):
+    def check():
+      for format in ('binary_little_endian', 'binary_big_endian', 'ascii'):
+        self.assertFrame(data.readFrameData(self.writePly(format + '.ply', format)))
+        self.assertFrame(data.readFrameData(self.writePly(format + '_extra.ply', format, self.EXTRA_PROPERTIES)))
+    self.withAndWithoutNumpy(check)
+
+  def test_binary_pcd_files_drop_nan_points(self):
+    def check():
+      path = self.writePcd('scan.pcd', nan=(3, 4, 17))
+      coords = self.coords.copy()
+      coords[[3, 4, 17]] = 0.0
+      self.assertFrame(data.readFrameData(path), coords)
+      self.assertEqual(len(data.PointCloudFrameFile(path).load().get_points()), 17)
+    self.withAndWithoutNumpy(check)
+
+  def test_xyz_files(self):
+    def check():
+      self.assertFrame(data.readFrameData(self.writeXyz('scan.xyz')))
+      self.assertFrame(data.readFrameData(self.writeXyz('comma.xyz', delimiter=',')))
+    self.withAndWithoutNumpy(check)
+
+  def test_chunks_split_the_frame_at_chunk_boundaries(self):
+    def check():
+      paths = [self.writePly('little.ply', 'binary_little_endian', self.EXTRA_PROPERTIES), self.writePly('big.ply', 'binary_big_endian'),
+        self.writePly('ascii.ply', 'ascii'), self.writePcd('scan.pcd'), self.writeXyz('scan.xyz')]
+      for path in paths:
+        chunks = list(data.readFrameChunks(path, 7))
+        sizes = [len(indices) for indices, coords, scale in chunks]
+        # chunks of text files are chunks of lines; comment lines count too
+        self.assertEqual(sizes, [7, 7, 6] if not path.endswith('.xyz') else [6, 7, 7], path)
+        self.assertFrame((numpy.concatenate([numpy.asarray(indices) for indices, coords, scale in chunks]),
+          numpy.concatenate([numpy.asarray(coords, dtype=numpy.float64).reshape(-1,3) for indices, coords, scale in chunks]), 1.0))
+    self.withAndWithoutNumpy(check)
+
+  def test_readers_are_found_by_extension_without_opening_the_file(self):
+    missing = os.path.join(self.directory, 'missing')
+    for extension, name in [('.ply', 'ply'), ('.PCD', 'pcd'), ('.xyz', 'xyz'), ('.txt', 'text'), ('.pcb', 'binary')]:
+      self.assertEqual(data.frameReaderName(missing + extension), name)
+
+  def test_files_with_other_extensions_are_recognized_by_their_magic_bytes(self):
+    ply = self.writePly('scan.ply', 'binary_little_endian')
+    os.rename(ply, os.path.join(self.directory, 'scan.dat'))
+    data.writeBinaryFrame(os.path.join(self.directory, 'frame.dat2'), numpy.arange(20), self.coords)
+    data.writeTextFrame(os.path.join(self.directory, 'frame.csv'), numpy.arange(20), self.coords)
+
+    self.assertEqual(data.frameReaderName(os.path.join(self.directory, 'scan.dat')), 'ply')
+    self.assertEqual(data.frameReaderName(os.path.join(self.directory, 'frame.dat2')), 'binary')
+    self.assertEqual(data.frameReaderName(os.path.join(self.directory, 'frame.csv')), 'text')
+    self.assertFrame(data.readFrameData(os.path.join(self.directory, 'scan.dat')))
+# end of class FrameReaderTest
+
+
+class QuantizationTest(AddonTestCase):
+  # a frame with all-zero (inactive) rows
+  def frame(self):
+    indices, coords = randomFrame(numpy, 1000)
+    coords[::9] = 0.0
+    return indices, coords
+
+  def assertWithinError(self, quantized, coords):
+    bits = data.QUANTIZED_TYPES[quantized.typeCode]
+    extent = float(coords.max() - coords.min())
+    self.assertTrue(0 < quantized.error <= extent / (2**bits - 1), (quantized.typeCode, quantized.error))
+    decoded = numpy.asarray(quantized.dequantize(), dtype=numpy.float64).reshape(-1,3)
+    self.assertTrue(numpy.abs(decoded - coords).max() <= quantized.error + 1e-7)
+    self.assertTrue((decoded[::9] == 0).all()) # zero rows stay zero, so they stay inactive
+
+  def test_dequantized_coordinates_are_within_the_reported_error(self):
+    indices, coords = self.frame()
+    for typeCode in ('h', 'i'):
+      self.assertWithinError(data.QuantizedPoints(coords, typeCode), coords)
+
+  def test_dequantized_coordinates_are_within_the_reported_error_without_numpy(self):
+    indices, coords = self.frame()
+    self.addCleanup(setattr, data, 'numpy', data.numpy)
+    data.numpy = None
+    for typeCode in ('h', 'i'):
+      self.assertWithinError(data.QuantizedPoints([tuple(coord) for coord in coords.tolist()], typeCode), coords)
+
+  def test_quantized_frames_keep_their_inactive_points_inactive(self):
+    indices, coords = self.frame()
+    for quantize in ('h', 'i'):
+      path = os.path.join(self.directory, 'frame_{0}.pcb'.format(quantize))
+      data.writeBinaryFrame(path, indices, coords, coordType=quantize)
+      for fileQuantize in (None, quantize):
+        file = data.PointCloudFrameFile(path, quantize=fileQuantize).load()
+        self.assertEqual(len(file.get_points()), 1000 - len(coords[::9]))
+        self.assertEqual(list(file.get_indices()), [idx for idx in indices if idx % 9 != 0])
+        error = file.quantizationError if fileQuantize != None else 0.0
+        self.assertTrue(numpy.abs(numpy.asarray(file.get_points()) - coords[indices % 9 != 0]).max() <= data.QuantizedPoints(coords, quantize).error + error + 1e-6)
+# end of class QuantizationTest
+
+
+class StreamingTest(AddonTestCase):
+  OPTIONS = {'skip': 2, 'minBounds': (-4.0, 0.2, -4.0), 'maxBounds': (4.0, 2.8, 4.0), 'multiply': (1.0, 1.0, -1.0)}
+
+  def writeFrame(self):
+    indices, coords = randomFrame(numpy, 5000)
+    coords[::13] = 0.0
+    data.writeBinaryFrame(os.path.join(self.directory, 'frame.pcb'), indices, coords)
+    data.writeTextFrame(os.path.join(self.directory, 'frame.txt'), indices, coords)
+    return [os.path.join(self.directory, name) for name in ('frame.pcb', 'frame.txt')]
+
+  def assertChunksLikeWhole(self):
+    for path in self.writeFrame():
+      whole = data.PointCloudFrameFile(path, **self.OPTIONS).load()
+      # chunks of 334 points don't line up with skipping every 3rd point
+      chunked = data.PointCloudFrameFile(path, chunkSize=334, **self.OPTIONS).load()
+      self.assertEqual(list(chunked.get_indices()), list(whole.get_indices()), path)
+      self.assertTrue(numpy.allclose(numpy.asarray(chunked.get_points()).reshape(-1,3), numpy.asarray(whole.get_points()).reshape(-1,3)), path)
+      self.assertEqual(chunked.pointsRead, whole.pointsRead)
+
+  def test_chunked_frames_have_the_points_of_whole_frames(self):
+    self.assertChunksLikeWhole()
+
+  def test_chunked_frames_have_the_points_of_whole_frames_without_numpy(self):
+    self.addCleanup(setattr, data, 'numpy', data.numpy)
+    data.numpy = None
+    self.assertChunksLikeWhole()
+
+  def assertSampled(self):
+    path = self.writeFrame()[0]
+    whole = data.PointCloudFrameFile(path, **self.OPTIONS).load()
+    points = dict(zip([int(idx) for idx in whole.get_indices()], [tuple(point) for point in numpy.asarray(whole.get_points()).tolist()]))
+    sampled = data.PointCloudFrameFile(path, chunkSize=334, maxPoints=300, **self.OPTIONS).load()
+
+    indices = [int(idx) for idx in sampled.get_indices()]
+    self.assertEqual(len(indices), 300)
+    self.assertEqual(indices, sorted(set(indices))) # distinct, in file order
+    for idx, point in zip(indices, numpy.asarray(sampled.get_points()).tolist()):
+      self.assertTrue(numpy.allclose(point, points[idx]))
+    # drawn from all chunks, not just the first ones
+    self.assertEqual(sorted(set([idx // 334 for idx in indices])), list(range(15)))
+
+    everything = data.PointCloudFrameFile(path, chunkSize=334, maxPoints=len(points) + 10, **self.OPTIONS).load()
+    self.assertEqual([int(idx) for idx in everything.get_indices()], sorted(points))
+
+  def test_the_reservoir_keeps_at_most_max_points_from_all_chunks(self):
+    self.assertSampled()
+
+  def test_the_reservoir_keeps_at_most_max_points_from_all_chunks_without_numpy(self):
+    self.addCleanup(setattr, data, 'numpy', data.numpy)
+    data.numpy = None
+    self.assertSampled()
+# end of class StreamingTest
+
+
+class SequenceIndexTest(AddonTestCase):
+  def test_frame_count_is_figured_out_when_the_directory_changes(self):
+    self.addCleanup(setattr, data, 'SEQUENCE_INDEX_CHECK_INTERVAL', data.SEQUENCE_INDEX_CHECK_INTERVAL)
+    data.SEQUENCE_INDEX_CHECK_INTERVAL = 0.0
+    pattern = self.writeFrames(3, points=10)
+    indices, coords = randomFrame(numpy, 10)
+    data.writeBinaryFrame(pattern % 10, indices, coords)
+    os.utime(self.directory, (1000000000, 1000000000))
+
+    index = data.sequenceIndex(pattern)
+    self.assertEqual(index.frameCount(), 11) # frames missing in between count too
+    self.assertEqual((index.hasFrame(2), index.hasFrame(5)), (True, False))
+
+    os.remove(pattern % 10)
+    index.refresh()
+    self.assertEqual(index.frameCount(), 3)
+
+    # between directory changes, the count is looked up, not computed from the frames
+    index.frames = None
+    index.refresh()
+    self.assertEqual(index.frameCount(), 3)
+# end of class SequenceIndexTest
+
+
+class VoxelDownsampleTest(unittest.TestCase):
+  # three voxels (of size 1) with 3, 1 and 2 points, in order of their first point
+  POINTS = [(0.1, 0.1, 0.1), (1.2, 0.2, 0.2), (0.5, 0.5, 0.5), (-0.5, 2.5, 0.5), (0.9, 0.3, 0.3), (-0.1, 2.1, 0.1)]
+
+  def assertVoxels(self, points):
+    centroids, first = data.voxelDownsample(points, 1.0, 'CENTROID')
+    self.assertEqual(list(first), [0, 1, 3]) # one point per occupied voxel
+    expected = [numpy.mean([self.POINTS[i] for i in voxel], axis=0) for voxel in ([0, 2, 4], [1], [3, 5])]
+    self.assertTrue(numpy.allclose(numpy.asarray(centroids, dtype=numpy.float64), expected, atol=1e-6))
+
+    firstPoints, first = data.voxelDownsample(points, 1.0, 'FIRST')
+    self.assertEqual(list(first), [0, 1, 3])
+    self.assertTrue(numpy.allclose(numpy.asarray(firstPoints, dtype=numpy.float64), [self.POINTS[i] for i in (0, 1, 3)], atol=1e-6))
+
+  def test_voxels_keep_the_centroid_or_the_first_point(self):
+    self.assertVoxels(numpy.array(self.POINTS, dtype=numpy.float32))
+
+  def test_voxels_keep_the_centroid_or_the_first_point_without_numpy(self):
+    self.addCleanup(setattr, data, 'numpy', data.numpy)
+    data.numpy = None
+    self.assertVoxels(list(self.POINTS))
+
+  def test_a_voxel_per_point_keeps_all_points(self):
+    points = randomFrame(numpy, 100)[1]
+    downsampled, first = data.voxelDownsample(points, 1e-4)
+    self.assertEqual(list(first), list(range(100)))
+    self.assertTrue(numpy.allclose(downsampled, points))
+# end of class VoxelDownsampleTest
+
+
+class GridMeshTest(unittest.TestCase):
+  ROWS = 4
+
+  # a flat 4x4 recorder grid (one unit between neighbours), without the points at the listed grid indices
+  def grid(self, missing=()):
+    indices = [column*self.ROWS + row for column in range(4) for row in range(self.ROWS) if column*self.ROWS + row not in missing]
+    points = [(float(idx // self.ROWS), float(idx % self.ROWS), 0.0) for idx in indices]
+    return indices, points
+
+  def triangles(self, indices, points, maxEdge=0.0):
+    if data.numpy != None:
+      points = numpy.array(points, dtype=numpy.float32)
+    return sorted(tuple(sorted(int(i) for i in triangle)) for triangle in data.gridTriangles(indices, points, maxEdge, self.ROWS))
+
+  def assertGridTriangles(self):
+    indices, points = self.grid()
+    full = self.triangles(indices, points)
+    self.assertEqual(len(full), 3*3*2) # two triangles per grid cell
+    self.assertEqual(self.triangles(indices, points, maxEdge=1.5), full) # cell diagonals are ~1.41
+
+    # pushing one point away in depth drops (only) the triangles using it
+    far = indices.index(1*self.ROWS + 1)
+    points[far] = (1.0, 1.0, 10.0)
+    self.assertEqual(self.triangles(indices, points), full)
+    kept = self.triangles(indices, points, maxEdge=1.5)
+    self.assertEqual(kept, [triangle for triangle in full if far not in triangle])
+    self.assertEqual(len(kept), len(full) - 6)
+
+    # a cell with a missing corner keeps the one triangle of the other three
+    indices, points = self.grid(missing=(3*self.ROWS + 3,))
+    self.assertEqual(len(self.triangles(indices, points)), len(full) - 1)
+
+  def test_long_triangles_are_dropped(self):
+    self.assertGridTriangles()
+
+  def test_long_triangles_are_dropped_without_numpy(self):
+    self.addCleanup(setattr, data, 'numpy', data.numpy)
+    data.numpy = None
+    self.assertGridTriangles()
+# end of class GridMeshTest
+
+
+class FrustumCullTest(unittest.TestCase):
+  # a box from (0,0,0) to (2,2,2); near corners (z=0) going around, then the far ones (z=2)
+  CORNERS = [(0,0,0), (2,0,0), (2,2,0), (0,2,0), (0,0,2), (2,0,2), (2,2,2), (0,2,2)]
+  POINTS = [(-0.5,1,1), (-0.05,1,1), (0.5,1,1), (1.5,1,1), (2.05,1,1), (2.5,1,1)]
+  TRIANGLES = [(0, 1, 2), (1, 2, 3), (2, 3, 4), (3, 4, 5)]
+
+  def cull(self, points, **options):
+    if data.numpy != None:
+      points = numpy.array(points, dtype=numpy.float32)
+    culled, keep = data.cullPoints(points, data.frustumPlanes(self.CORNERS), **options)
+    triangles = numpy.array(self.TRIANGLES, dtype=numpy.int32) if data.numpy != None else self.TRIANGLES
+    triangles = data.cullTriangles(triangles, keep)
+    return [tuple(round(float(v), 2) for v in point) for point in culled], [tuple(int(i) for i in triangle) for triangle in triangles]
+
+  def assertCulled(self):
+    self.assertEqual(self.cull(self.POINTS), ([(0.5,1,1), (1.5,1,1)], []))
+    # points up to margin outside the planes are kept
+    self.assertEqual(self.cull(self.POINTS, margin=0.1), ([(-0.05,1,1), (0.5,1,1), (1.5,1,1), (2.05,1,1)], [(0, 1, 2), (1, 2, 3)]))
+    # and the ones further than maxDistance from center aren't
+    self.assertEqual(self.cull(self.POINTS, margin=0.1, center=(0.5,1,1), maxDistance=1.1), ([(-0.05,1,1), (0.5,1,1), (1.5,1,1)], [(0, 1, 2)]))
+
+    inside = self.POINTS[2:4]
+    culled, keep = data.cullPoints(numpy.array(inside, dtype=numpy.float32) if data.numpy != None else inside, data.frustumPlanes(self.CORNERS))
+    self.assertEqual((len(culled), keep), (2, None))
+    self.assertEqual(data.cullTriangles(self.TRIANGLES, keep), self.TRIANGLES)
+
+  def test_margin_and_max_distance(self):
+    self.assertCulled()
+
+  def test_margin_and_max_distance_without_numpy(self):
+    self.addCleanup(setattr, data, 'numpy', data.numpy)
+    data.numpy = None
+    self.assertCulled()
+# end of class FrustumCullTest
+
+
+class BatchTest(AddonTestCase):
+  def test_batch_reports_its_throughput(self):
+    self.writeFrames(4)
+    dest = os.path.join(self.directory, 'out')
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+      data.main(['batch', self.directory, dest, '--pattern', 'frame%d.pcb', '--workers', '2', '--skip', '1'])
+
+    self.assertRegex(output.getvalue(), r"Processed 4 frames with 2 workers in [0-9.]+ seconds; [0-9.]+ frames/s, [0-9]+ points/s \(2000 points read, [0-9]+ points written\)")
+    self.assertEqual(sorted(os.listdir(dest)), ['frame{0}.pcb'.format(frame) for frame in range(4)])
+
+  def test_batch_gives_its_throughput(self):
+    self.writeFrames(3)
+    with contextlib.redirect_stdout(io.StringIO()):
+      result = data.batchProcess(self.directory, os.path.join(self.directory, 'out'), pattern='frame%d.pcb', workers=1, quantize='h')
+
+    written = sum(len(data.PointCloudFrameFile(os.path.join(self.directory, 'out', 'frame{0}.pcb'.format(frame))).get_points()) for frame in range(3))
+    self.assertEqual((result['frames'], result['pointsRead'], result['pointsWritten']), (3, 3000, written))
+    self.assertTrue(result['seconds'] > 0)
+    self.assertTrue(0 < result['quantizationError'] < 0.01)
+# end of class BatchTest
+
+
+class SharedLoadTest(AddonTestCase):
+  def test_every_distinct_frame_file_is_loaded_once_per_frame_change(self):
+    pattern = self.writeFrames(3)
+    # no frame cache, so every frame change has to load the frame files
+    objs = [self.addObject('cloud{0}'.format(i), fileName=pattern, numFiles=0, cacheSize=0, skipPoints=i // 2) for i in range(3)]
+    loads = self.recordFrameLoads()
+
+    for frame in range(3):
+      self.scene.frame_current = frame
+      addon.frameHandler(self.scene)
+      self.assertEqual(sorted(loads), [(pattern % frame, 0), (pattern % frame, 1)])
+      self.assertEqual([self.vertexCount(obj) for obj in objs], [1000, 1000, 500])
+      self.assertTrue(objs[0].children[0].data is not objs[1].children[0].data) # the points are shared, not the meshes
+      del loads[:]
+# end of class SharedLoadTest
+
+
+class ProfilerTest(AddonTestCase):
+  def test_chrome_traces_have_a_track_with_the_stages_of_every_object(self):
+    self.addCleanup(addon.profiler.clear)
+    pattern = self.writeFrames(3)
+    for name in ('cloud', 'other'):
+      self.addObject(name, fileName=pattern, numFiles=0, profile=True)
+    for frame in range(3):
+      self.scene.frame_current = frame
+      addon.frameHandler(self.scene)
+
+    path = os.path.join(self.directory, 'trace.json')
+    count = addon.profiler.exportChromeTrace(path)
+    with open(path) as f:
+      trace = json.load(f)
+
+    tracks = dict([(event['args']['name'], event['tid']) for event in trace['traceEvents'] if event['ph'] == 'M'])
+    self.assertEqual(sorted(tracks), ['cloud', 'other'])
+    events = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+    self.assertEqual(len(events), count)
+    for name, track in tracks.items():
+      stages = [event['name'] for event in events if event['tid'] == track]
+      self.assertEqual(stages.count('frame'), 3, name)
+      self.assertTrue(set(['load', 'upload']) <= set(stages), name)
+    for event in events:
+      self.assertTrue(event['dur'] >= 0 and event['ts'] > 0, event)
+# end of class ProfilerTest
+
+
+class FrameCacheTest(AddonTestCase):
+  def setUp(self):
+    AddonTestCase.setUp(self)
+    data.directoryChangeListeners.append(addon.frameCache.revalidate) # like addon.register
+    self.checkInterval = data.SEQUENCE_INDEX_CHECK_INTERVAL
+    data.SEQUENCE_INDEX_CHECK_INTERVAL = 0.0
+
+  def tearDown(self):
+    data.SEQUENCE_INDEX_CHECK_INTERVAL = self.checkInterval
+    data.directoryChangeListeners.remove(addon.frameCache.revalidate)
+    AddonTestCase.tearDown(self)
+
+  def test_cached_frames_are_used_without_looking_at_their_files(self):
+    obj = self.addObject(fileName=self.writeFrames(3), numFiles=0)
+    for frame in range(3):
+      self.scene.frame_current = frame
+      addon.frameHandler(self.scene)
+
+    checked = []
+    getmtime = os.path.getmtime
+    os.path.getmtime = lambda path: checked.append(path) or getmtime(path)
+    try:
+      for frame in range(3):
+        self.scene.frame_current = frame
+        addon.frameHandler(self.scene)
+    finally:
+      os.path.getmtime = getmtime
+
+    self.assertEqual([path for path in checked if os.path.isfile(path)], [])
+    self.assertEqual(addon.frameCache.hits, 3)
+
+  def test_frames_of_sequence_files_are_cached_without_looking_at_the_file(self):
+    sequencePath = os.path.join(self.directory, 'take.pcs')
+    data.packSequence(self.directory, sequencePath, pattern=os.path.basename(self.writeFrames(3)))
+    obj = self.addObject(fileName=sequencePath, numFiles=0)
+
+    checked = []
+    getmtime = os.path.getmtime
+    os.path.getmtime = lambda path: checked.append(path) or getmtime(path)
+    try:
+      for frame in range(3):
+        self.scene.frame_current = frame
+        addon.frameHandler(self.scene)
+    finally:
+      os.path.getmtime = getmtime
+
+    self.assertEqual(len(addon.frameCache.entries), 3)
+    self.assertEqual([path for path in checked if path.endswith('.pcs')], [])
+    self.assertEqual(set(mtime for path, mtime in addon.frameCache.mtimes.values()), set([getmtime(sequencePath)]))
+
+  def test_frames_of_replaced_files_are_loaded_again(self):
+    pattern = self.writeFrames(2)
+    os.utime(self.directory, (1000000000, 1000000000)) # so the change below can't happen within the same mtime tick
+    obj = self.addObject(fileName=pattern, numFiles=0)
+    addon.frameHandler(self.scene)
+    self.assertEqual(self.vertexCount(obj), 1000)
+
+    # replacing a file (like tools writing a new version of it) changes the directory
+    indices, coords = randomFrame(numpy, 500)
+    data.writeBinaryFrame(pattern % 0 + '.new', indices, coords)
+    os.replace(pattern % 0 + '.new', pattern % 0)
+    self.scene.frame_current = 1
+    addon.frameHandler(self.scene)
+    self.scene.frame_current = 0
+    addon.frameHandler(self.scene)
+    self.assertEqual(self.vertexCount(obj), 500)
+
+  def test_frames_of_files_written_again_in_place_are_loaded_again(self):
+    self.addCleanup(setattr, data, 'FRAME_CACHE_CHECK_INTERVAL', data.FRAME_CACHE_CHECK_INTERVAL)
+    pattern = self.writeFrames(2)
+    os.utime(pattern % 0, (1000000000, 1000000000)) # so the change below can't happen within the same mtime tick
+    obj = self.addObject(fileName=pattern, numFiles=0)
+    addon.frameHandler(self.scene)
+    self.scene.frame_current = 1
+    addon.frameHandler(self.scene)
+    directoryTime = os.path.getmtime(self.directory)
+
+    # like running convert again into the same directory; the directory doesn't change
+    indices, coords = randomFrame(numpy, 500)
+    data.writeBinaryFrame(pattern % 0, indices, coords)
+    self.assertEqual(os.path.getmtime(self.directory), directoryTime)
+
+    # within the check interval the cached frame is used as it is
+    self.scene.frame_current = 0
+    addon.frameHandler(self.scene)
+    self.assertEqual(self.vertexCount(obj), 1000)
+
+    data.FRAME_CACHE_CHECK_INTERVAL = 0.0
+    self.scene.frame_current = 1
+    addon.frameHandler(self.scene)
+    self.scene.frame_current = 0
+    addon.frameHandler(self.scene)
+    self.assertEqual(self.vertexCount(obj), 500)
+# end of class FrameCacheTest
+
+
+
+# just enough of blender's window manager to run the addon's modal operators
+class FakeWindowManager:
+  def __init__(self):
+    self.windows = [types.SimpleNamespace(screen=None)]
+    self.timers = []
+    self.modalOperators = []
+
+  def event_timer_add(self, interval, window):
+    self.timers.append(interval)
+    return interval
+
+  def event_timer_remove(self, timer):
+    self.timers.remove(timer)
+
+  def modal_handler_add(self, operator):
+    self.modalOperators.append(operator)
+
+  def progress_begin(self, low, high):
+    pass
+
+  def progress_update(self, value):
+    pass
+
+  def progress_end(self):
+    pass
+
+  # sends timer events to the running modal operators until they're done (or timeout seconds passed)
+  def runModalOperators(self, context, timeout=5.0):
+    end = time.time() + timeout
+    while len(self.modalOperators) > 0 and time.time() < end:
+      for operator in list(self.modalOperators):
+        if operator.modal(context, types.SimpleNamespace(type='TIMER')) != {'PASS_THROUGH'}:
+          self.modalOperators.remove(operator)
+      time.sleep(0.005)
+
+  # like blender does with the running modal operators when a file gets loaded or their window is closed
+  def cancelModalOperators(self, context):
+    for operator in self.modalOperators:
+      operator.cancel(context)
+    self.modalOperators = []
+# end of class FakeWindowManager
+
+
+class AsyncLoadTest(AddonTestCase):
+  def setUp(self):
+    AddonTestCase.setUp(self)
+    self.windowManager = FakeWindowManager()
+    self.context = types.SimpleNamespace(scene=self.scene, window_manager=self.windowManager, window=self.windowManager.windows[0])
+    bpy.context.window_manager = self.windowManager
+    bpy.context.window = None # like in frame change handlers
+    bpy.ops = types.SimpleNamespace(object=types.SimpleNamespace(apply_loaded_point_clouds=self.invokeApplyLoaded))
+
+  def tearDown(self):
+    del bpy.context.window_manager
+    del bpy.context.window
+    del bpy.ops
+    AddonTestCase.tearDown(self)
+
+  def invokeApplyLoaded(self, override, mode):
+    self.assertEqual(override['window'], self.windowManager.windows[0])
+    return addon.PointCloudLoaderApplyLoadedOperator().invoke(self.context, None)
+
+  def test_frames_load_in_the_background_and_get_applied_by_the_modal_operator(self):
+    pattern = self.writeFrames(2)
+    objs = [self.addObject('cloud{0}'.format(i), fileName=pattern, numFiles=0, asyncLoad=True, skipPoints=i // 2) for i in range(3)]
+    self.assertTrue(addon.canLoadAsync())
+
+    self.scene.frame_current = 1
+    addon.frameHandler(self.scene)
+    self.assertEqual(sorted(addon.pendingLoads.keys()), ['cloud0', 'cloud1', 'cloud2'])
+    self.assertEqual(len(self.windowManager.modalOperators), 1) # one operator applies the frames of all objects
+    self.assertEqual([len(obj.children) for obj in objs], [0, 0, 0]) # nothing's applied while loading
+
+    self.windowManager.runModalOperators(self.context)
+    self.assertEqual(len(self.windowManager.modalOperators), 0)
+    self.assertEqual(self.windowManager.timers, [])
+    self.assertFalse(addon.PointCloudLoaderApplyLoadedOperator.running)
+    self.assertEqual(addon.pendingLoads, {})
+    self.assertEqual([self.vertexCount(obj) for obj in objs], [1000, 1000, 500])
+    self.assertEqual([obj.pointCloudLoaderConfig.currentFrameLoaded for obj in objs], [pattern % 1] * 3)
+
+  def test_objects_waiting_for_the_same_frame_file_share_one_load(self):
+    pattern = self.writeFrames(3)
+    objs = [self.addObject('cloud{0}'.format(i), fileName=pattern, numFiles=0, asyncLoad=True, cacheSize=0, skipPoints=i // 2) for i in range(3)]
+    loads = self.recordFrameLoads()
+
+    for frame in range(3):
+      self.scene.frame_current = frame
+      addon.frameHandler(self.scene)
+      self.windowManager.runModalOperators(self.context)
+      self.assertEqual(sorted(loads), [(pattern % frame, 0), (pattern % frame, 1)])
+      self.assertEqual([self.vertexCount(obj) for obj in objs], [1000, 1000, 500])
+      del loads[:]
+
+  def test_cancelled_operators_are_removed_and_started_again(self):
+    pattern = self.writeFrames(2)
+    obj = self.addObject(fileName=pattern, numFiles=0, asyncLoad=True)
+    self.scene.frame_current = 1
+    addon.frameHandler(self.scene)
+    self.assertEqual(len(self.windowManager.modalOperators), 1)
+
+    self.windowManager.cancelModalOperators(self.context)
+    self.assertEqual(self.windowManager.timers, [])
+    self.assertFalse(addon.PointCloudLoaderApplyLoadedOperator.running)
+
+    # the frame that was on its way gets applied by a new operator
+    addon.frameHandler(self.scene)
+    self.assertEqual(len(self.windowManager.modalOperators), 1)
+    self.assertEqual(len(self.windowManager.timers), 1)
+    self.windowManager.runModalOperators(self.context)
+    self.assertEqual(self.windowManager.timers, [])
+    self.assertFalse(addon.PointCloudLoaderApplyLoadedOperator.running)
+    self.assertEqual(obj.pointCloudLoaderConfig.currentFrameLoaded, pattern % 1)
+    self.assertEqual(self.vertexCount(obj), 1000)
+
+  def test_frames_load_synchronously_without_a_window(self):
+    self.windowManager.windows = []
+    obj = self.addObject(fileName=self.writeFrames(1), numFiles=0, asyncLoad=True)
+    addon.frameHandler(self.scene)
+    self.assertEqual(self.vertexCount(obj), 1000)
+    self.assertEqual(self.windowManager.modalOperators, [])
+# end of class AsyncLoadTest
+
+
+
+class FakeArea:
+  def __init__(self):
+    self.headerText = None
+
+  def header_text_set(self, text=None):
+    self.headerText = text
+# end of class FakeArea
+
+
+class PreloadTest(AddonTestCase):
+  def setUp(self):
+    AddonTestCase.setUp(self)
+    self.scene.frame_start = 0
+    self.scene.frame_end = 3
+    self.windowManager = FakeWindowManager()
+    self.area = FakeArea()
+    self.context = types.SimpleNamespace(scene=self.scene, window_manager=self.windowManager, window=self.windowManager.windows[0], area=self.area)
+    self.reports = []
+
+  def preload(self):
+    operator = addon.PointCloudLoaderPreloadOperator()
+    operator.report = lambda kind, message: self.reports.append((kind, message))
+    return operator, operator.invoke(self.context, None)
+
+  def test_downsampling_to_fit_the_limit_leaves_the_skip_points_setting_alone(self):
+    obj = self.addObject(fileName=self.writeFrames(4, points=100000), numFiles=4, preloadLimit=2, preloadDownsample=True)
+    operator, result = self.preload()
+    self.assertEqual(result, {'RUNNING_MODAL'})
+    self.windowManager.runModalOperators(self.context)
+
+    self.assertEqual(obj.pointCloudLoaderConfig.skipPoints, 0)
+    skip = addon.preloadSkipPoints['cloud']
+    self.assertTrue(skip > 0)
+    self.assertTrue(addon.frameCache.pinnedBytes <= 2 * 1024 * 1024)
+    addon.ObjectPointObjectLoader(obj, scene=self.scene, force=True).loadFrame()
+    self.assertEqual(self.vertexCount(obj), len(range(0, 100000, skip + 1)))
+
+    addon.releasePreload()
+    self.assertEqual(addon.preloadSkipPoints, {})
+    addon.ObjectPointObjectLoader(obj, scene=self.scene, force=True).loadFrame()
+    self.assertEqual(self.vertexCount(obj), 100000)
+
+  def test_a_preload_limit_of_0_means_no_limit(self):
+    self.addObject(fileName=self.writeFrames(4, points=100000), numFiles=4, preloadLimit=0, preloadDownsample=True)
+    operator, result = self.preload()
+    self.assertEqual(result, {'RUNNING_MODAL'})
+    self.windowManager.runModalOperators(self.context)
+    self.assertEqual(len(addon.frameCache.pinned), 4)
+    self.assertEqual(addon.preloadSkipPoints, {})
+    self.assertEqual(addon.preloadedSequences['cloud'][2], set([0, 1, 2, 3]))
+
+  def test_cancelling_records_only_the_frames_that_were_loaded(self):
+    self.addObject(fileName=self.writeFrames(4), numFiles=4)
+    operator, result = self.preload()
+    self.assertEqual(operator.modal(self.context, types.SimpleNamespace(type='ESC')), {'CANCELLED'})
+    # only the frame loaded for the memory estimate made it in
+    self.assertEqual(len(addon.frameCache.pinned), 1)
+    self.assertEqual(addon.preloadedSequences['cloud'][2], set([0]))
+    self.assertEqual(self.windowManager.timers, [])
+
+  def test_preloaded_frames_of_objects_with_adaptive_decimation_are_used_without_reading_files(self):
+    obj = self.addObject(fileName=self.writeFrames(4), numFiles=4, adaptive=True, adaptiveBudget=1.0)
+    for duration in [1.0] * 10:
+      addon.adaptiveDecimation(obj).record(duration) # way over the budget; adaptive decimation would skip points
+    self.assertTrue(addon.adaptiveDecimation(obj).skipPoints() > 0)
+
+    operator, result = self.preload()
+    self.windowManager.runModalOperators(self.context)
+    self.assertEqual(len(addon.frameCache.pinned), 4)
+
+    loads = []
+    loadFrameData = data.PointCloudFrameFile._loadFrameData
+    data.PointCloudFrameFile._loadFrameData = lambda file: loads.append(file.path) or loadFrameData(file)
+    try:
+      for frame in range(4):
+        self.scene.frame_current = frame
+        addon.frameHandler(self.scene)
+        self.assertEqual(self.vertexCount(obj), 1000)
+    finally:
+      data.PointCloudFrameFile._loadFrameData = loadFrameData
+    self.assertEqual(loads, [])
+
+    # after releasing the preload adaptive decimation takes over again
+    addon.releasePreload()
+    addon.frameHandler(self.scene)
+    self.assertTrue(self.vertexCount(obj) < 1000)
+
+  def test_progress_shows_in_the_area_header(self):
+    self.addObject(fileName=self.writeFrames(4), numFiles=4)
+    operator, result = self.preload()
+    operator.modal(self.context, types.SimpleNamespace(type='TIMER'))
+    self.assertTrue(self.area.headerText.startswith("Preloading point cloud frames"))
+    self.windowManager.runModalOperators(self.context)
+    self.assertEqual(self.area.headerText, None) # restored
+# end of class PreloadTest
+
+
+class CullTest(AddonTestCase):
+  def setUp(self):
+    AddonTestCase.setUp(self)
+    self.scene.frame_current = 1
+    self.scene.camera = self.addCamera((0.0, 1.5, 6.0))
+    self.pattern = self.writeFrames(2, points=20000)
+
+  # a perspective camera at the location looking down -z
+  def addCamera(self, location):
+    camera = FakeObject('camera', data=types.SimpleNamespace(type='PERSP', clip_start=0.1, clip_end=100.0,
+      view_frame=lambda scene: [Vector(corner) for corner in [(0.3, 0.3, -1.0), (0.3, -0.3, -1.0), (-0.3, -0.3, -1.0), (-0.3, 0.3, -1.0)]]))
+    camera.type = 'CAMERA'
+    camera.matrix_world = Matrix.Translation(location)
+    return camera
+
+  def addCullingObject(self):
+    obj = self.addObject(fileName=self.pattern, numFiles=2, cull=True, cullMargin=0.1)
+    obj.matrix_world = Matrix.Identity(4)
+    return obj
+
+  def test_a_scene_camera_that_isnt_a_camera_culls_nothing(self):
+    self.scene.camera.type = 'EMPTY'
+    obj = self.addCullingObject()
+    addon.frameHandler(self.scene)
+    self.assertEqual(self.vertexCount(obj), 20000)
+
+  def test_moving_the_camera_culls_the_frame_again(self):
+    obj = self.addCullingObject()
+    addon.frameHandler(self.scene)
+    count = self.vertexCount(obj)
+    self.assertTrue(0 < count < 20000)
+
+    culled = []
+    cullPoints = addon.cullPoints
+    addon.cullPoints = lambda *args: culled.append(args) or cullPoints(*args)
+    try:
+      addon.frameHandler(self.scene)
+      self.assertEqual(culled, []) # same frame, same view
+      self.scene.camera.matrix_world = Matrix.Translation((1.0, 1.5, 3.0))
+      addon.frameHandler(self.scene)
+      self.assertEqual(len(culled), 1)
+    finally:
+      addon.cullPoints = cullPoints
+    self.assertNotEqual(self.vertexCount(obj), count)
+
+  def test_an_animated_camera_culls_with_its_pose_of_the_new_frame(self):
+    camera = self.scene.camera
+    camera.location, camera.rotation_euler, camera.rotation_mode, camera.scale = [0.0, 1.5, 6.0], [0.0, 0.0, 0.0], 'XYZ', [1.0, 1.0, 1.0]
+    camera.rotation_quaternion, camera.rotation_axis_angle = [1.0, 0.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0]
+    # moves along x by a meter per frame; matrix_world still has the pose of frame 0, like at frame_change_pre
+    curve = types.SimpleNamespace(data_path='location', array_index=0, mute=False, evaluate=lambda frame: float(frame))
+    camera.animation_data = types.SimpleNamespace(action=types.SimpleNamespace(fcurves=[curve]))
+
+    obj = self.addCullingObject()
+    self.scene.frame_current = 1
+    corners, eye = addon.ObjectPointObjectLoader(obj, scene=self.scene)._cullFrustum()
+    self.assertEqual(eye, (1.0, 1.5, 6.0))
+# end of class CullTest
+
+
+class RenderLevelOfDetailTest(AddonTestCase):
+  def tearDown(self):
+    addon.PointCloudLoader.rendering = False
+    AddonTestCase.tearDown(self)
+
+  def test_objects_go_back_to_the_viewport_level_of_detail_after_rendering(self):
+    obj = self.addObject(fileName=self.writeFrames(1), numFiles=1, skipPoints=3, lod=True, renderSkipPoints=0)
+    addon.frameHandler(self.scene)
+    self.assertEqual(self.vertexCount(obj), 250)
+
+    addon.renderPreHandler(self.scene)
+    self.assertEqual(self.vertexCount(obj), 1000)
+    addon.renderPreHandler(self.scene) # every frame of an animation render
+    addon.frameHandler(self.scene)
+    self.assertEqual(self.vertexCount(obj), 1000)
+
+    addon.renderEndHandler(self.scene)
+    self.assertFalse(addon.PointCloudLoader.rendering)
+    self.assertEqual(self.vertexCount(obj), 250)
+# end of class RenderLevelOfDetailTest
+
+
+class BakeTest(AddonTestCase):
+  def bake(self, obj):
+    context = types.SimpleNamespace(object=obj, scene=self.scene, window_manager=FakeWindowManager())
+    operator = addon.PointCloudLoaderBakeOperator()
+    operator.report = lambda kind, message: None
+    self.assertEqual(operator.execute(context), {'FINISHED'})
+    data.closeSequenceFiles()
+    bake = data.openSequenceFile(os.path.join(self.directory, 'bake.pcs'))
+    return [len(bake.frameData(frame)[1]) for frame in range(bake.frameCount)]
+
+  def test_baking_again_while_playing_back_the_bake_applies_the_load_time_settings(self):
+    obj = self.addObject(fileName=self.writeFrames(3), numFiles=3, bakeFile=os.path.join(self.directory, 'bake.pcs'), skipPoints=3,
+      bounds=True, boundsMin=(-2.0, 0.0, -2.0), boundsMax=(2.0, 3.0, 2.0))
+
+    counts = self.bake(obj)
+    self.assertTrue(obj.pointCloudLoaderConfig.useBake)
+    self.assertTrue(all([0 < count < 250 for count in counts]))
+    self.assertEqual(self.bake(obj), counts)
+# end of class BakeTest
+
+
+if __name__ == "__main__":
+  unittest.main()